@@ -0,0 +1,231 @@
+"""
+End-to-end pipeline benchmark against a local fake Scryfall server.
+
+Generates a synthetic card world, decklist and collection of configurable
+size, serves the cards from benchmarks/fake_scryfall.py (with configurable
+latency and rate limit) and runs the real pipeline stages: load_inputs,
+build_needs, compute_pool_sizes, wildcard_plan and rank_sets. For each stage
+it records the wall time (median of --repeat cold runs), the Scryfall requests
+made and the peak traced memory, and compares them with a saved baseline.
+
+    python benchmarks/bench_pipeline.py
+    python benchmarks/bench_pipeline.py --deck-cards 250 --collection-cards 8000 --latency-ms 40 --rate-limit 10
+    python benchmarks/bench_pipeline.py --save-baseline benchmarks/baseline.json
+    python benchmarks/bench_pipeline.py --baseline benchmarks/baseline.json    # exit code 1 on regression
+"""
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import best_pack as bp  # noqa: E402
+from fake_scryfall import FakeScryfall, make_world  # noqa: E402
+
+STAGES = ("load_inputs", "build_needs", "compute_pool_sizes", "wildcard_plan", "rank_sets")
+
+
+def write_inputs(cards, directory, deck_cards, collection_cards, seed=0):
+    """Name,Qty CSVs: a decklist of mostly rares/mythics and a collection partly covering it."""
+    rnd = random.Random(seed)
+    names = list(dict.fromkeys(c["name"] for c in cards))
+    rares = list(dict.fromkeys(c["name"] for c in cards if c["rarity"] in ("rare", "mythic")))
+    deck = rnd.sample(rares, min(int(deck_cards * 0.9), len(rares)))
+    deck += rnd.sample(names, min(deck_cards - len(deck), len(names)))
+    deck = list(dict.fromkeys(deck))
+    owned = rnd.sample(deck, len(deck) * 2 // 5)
+    owned += rnd.sample(names, min(max(collection_cards - len(owned), 0), len(names)))
+    owned = list(dict.fromkeys(owned))[:max(collection_cards, len(deck) * 2 // 5)]
+
+    paths = {"deck": os.path.join(directory, "deck.csv"), "collection": os.path.join(directory, "collection.csv")}
+    for key, rows in (("deck", deck), ("collection", owned)):
+        with open(paths[key], "w", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            w.writerow(["Name", "Qty"])
+            w.writerows((name, rnd.randint(1, 4)) for name in rows)
+    return paths
+
+
+def reset_state(cache_dir):
+    """Forget everything best_pack keeps in memory; on-disk caches live in `cache_dir`."""
+    bp._CATALOG = None
+    bp._POOL_CACHE.clear()
+    bp._SET_CATALOG_CACHE.clear()
+    bp._HTTP_CACHE = None
+    bp._SESSION = None
+    bp._RATE_LIMITER = None
+    bp.INPUT_CACHE_DIR = os.path.join(cache_dir, "inputs")
+    bp.HTTP_CACHE_PATH = os.path.join(cache_dir, "scryfall_cache.sqlite")
+
+
+def run_pipeline(paths, arena_sets, fake, cache_dir, trace_memory=False):
+    """{stage: {"wall_ms", "requests", "peak_kb"}} for one run of the pipeline."""
+    reset_state(cache_dir)
+    results = {}
+
+    def stage(name, func):
+        before = fake.stats()["requests"]
+        if trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            out = func()
+        wall = time.perf_counter() - start
+        peak = 0
+        if trace_memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        results[name] = {"wall_ms": 1000.0 * wall, "requests": fake.stats()["requests"] - before,
+                         "peak_kb": peak / 1024.0}
+        return out
+
+    deck_rows, owned = stage("load_inputs", lambda: (bp.load_decklist(paths["deck"]),
+                                                     bp.load_owned(paths["collection"])))
+    missing_by_card, printings_by_card, craft_rarity_by_card, need_names_by_set = stage(
+        "build_needs", lambda: bp.build_needs(deck_rows, owned, arena_sets))
+    pool_sizes = stage("compute_pool_sizes", lambda: bp.compute_pool_sizes(need_names_by_set))
+    _, need_after, _ = stage("wildcard_plan", lambda: bp.wildcard_plan(
+        missing_by_card.copy(),
+        printings_by_card,
+        craft_rarity_by_card,
+        {s: {"rare": set(need_names_by_set[s]["rare"]),
+             "mythic": set(need_names_by_set[s]["mythic"])}
+         for s in need_names_by_set},
+        pool_sizes,
+        bp.RARE_WILDCARDS,
+        bp.MYTHIC_WILDCARDS,
+        top_k_protect=bp.TOP_K_PROTECT,
+    ))
+    stage("rank_sets", lambda: bp.rank_sets(need_after, pool_sizes, arena_sets))
+    return results
+
+
+def summarize(runs, memory_run):
+    stages = {}
+    for name in STAGES:
+        stages[name] = {
+            "wall_ms": statistics.median(r[name]["wall_ms"] for r in runs),
+            "requests": runs[0][name]["requests"],
+            "peak_kb": memory_run[name]["peak_kb"],
+        }
+    stages["total"] = {
+        "wall_ms": statistics.median(sum(r[n]["wall_ms"] for n in STAGES) for r in runs),
+        "requests": sum(stages[n]["requests"] for n in STAGES),
+        "peak_kb": max(stages[n]["peak_kb"] for n in STAGES),
+    }
+    return stages
+
+
+def compare(current, baseline, tolerance, min_ms):
+    """Print current vs baseline per stage; returns the list of regressions."""
+    regressions = []
+    print(f"\n{'stage':<20}{'wall ms':>10}{'base':>10}{'Δ%':>8}{'requests':>10}{'base':>7}"
+          f"{'peak KB':>11}{'base':>11}")
+    for name, cur in current.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        dt = 100.0 * (cur["wall_ms"] / base["wall_ms"] - 1) if base["wall_ms"] else 0.0
+        print(f"{name:<20}{cur['wall_ms']:>10.1f}{base['wall_ms']:>10.1f}{dt:>+8.0f}"
+              f"{cur['requests']:>10}{base['requests']:>7}{cur['peak_kb']:>11.0f}{base['peak_kb']:>11.0f}")
+        if cur["wall_ms"] > base["wall_ms"] * (1 + tolerance) and cur["wall_ms"] - base["wall_ms"] > min_ms:
+            regressions.append(f"{name}: wall time {base['wall_ms']:.1f} -> {cur['wall_ms']:.1f} ms")
+        if cur["requests"] > base["requests"]:
+            regressions.append(f"{name}: requests {base['requests']} -> {cur['requests']}")
+        if cur["peak_kb"] > base["peak_kb"] * (1 + tolerance) and cur["peak_kb"] - base["peak_kb"] > 256:
+            regressions.append(f"{name}: peak memory {base['peak_kb']:.0f} -> {cur['peak_kb']:.0f} KB")
+    return regressions
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sets", type=int, default=0, help="number of Arena sets in the world (0 = all)")
+    ap.add_argument("--cards-per-set", type=int, default=120)
+    ap.add_argument("--deck-cards", type=int, default=60, help="distinct cards in the decklist")
+    ap.add_argument("--collection-cards", type=int, default=2000, help="distinct cards in the collection")
+    ap.add_argument("--latency-ms", type=float, default=5.0, help="fake server delay per request")
+    ap.add_argument("--rate-limit", type=float, default=0.0, help="fake server requests/second before 429 (0 = off)")
+    ap.add_argument("--client-rate", type=float, default=100.0,
+                    help="best_pack's own request rate (1 / SCRYFALL_SLEEP)")
+    ap.add_argument("--workers", type=int, default=bp.SCRYFALL_MAX_WORKERS)
+    ap.add_argument("--repeat", type=int, default=3, help="cold runs timed (the median is reported)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--output", help="write the results as JSON")
+    ap.add_argument("--baseline", help="compare against this saved result (exit code 1 on regression)")
+    ap.add_argument("--save-baseline", metavar="FILE", help="save the results as the new baseline")
+    ap.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown / memory growth")
+    ap.add_argument("--min-ms", type=float, default=5.0, help="ignore wall time differences below this")
+    args = ap.parse_args()
+
+    import numpy  # noqa: F401  (imported up front: start-up cost is bench_startup.py's business)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        arena_sets = bp.get_arena_sets()
+    set_codes = list(arena_sets)[:args.sets or None]
+    config = {k: v for k, v in vars(args).items()
+              if k in ("sets", "cards_per_set", "deck_cards", "collection_cards", "latency_ms",
+                       "rate_limit", "client_rate", "workers", "seed")}
+
+    cards = make_world(set_codes, args.cards_per_set, seed=args.seed)
+    workdir = tempfile.mkdtemp(prefix="best_pack_bench_")
+    try:
+        paths = write_inputs(cards, workdir, args.deck_cards, args.collection_cards, seed=args.seed)
+        bp.SCRYFALL_SLEEP = 1.0 / args.client_rate if args.client_rate > 0 else 0
+        bp.SCRYFALL_MAX_WORKERS = args.workers
+
+        with FakeScryfall(cards, latency=args.latency_ms / 1000.0, rate_limit=args.rate_limit) as fake:
+            bp.SCRYFALL_API = fake.base_url
+            runs = []
+            for i in range(args.repeat):
+                runs.append(run_pipeline(paths, arena_sets, fake, os.path.join(workdir, f"cold{i}")))
+            memory_run = run_pipeline(paths, arena_sets, fake, os.path.join(workdir, "memory"), trace_memory=True)
+            server = fake.stats()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    stages = summarize(runs, memory_run)
+    result = {"config": config, "stages": stages, "server": server, "python": sys.version.split()[0]}
+
+    print(f"{len(cards)} printings in {len(set_codes)} sets, deck of {args.deck_cards} cards, "
+          f"collection of {args.collection_cards} cards, {args.latency_ms:g} ms latency, "
+          f"{server['throttled']} throttled responses")
+    print(f"\n{'stage':<20}{'wall ms':>10}{'requests':>10}{'peak KB':>11}")
+    for name, s in stages.items():
+        print(f"{name:<20}{s['wall_ms']:>10.1f}{s['requests']:>10}{s['peak_kb']:>11.0f}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        print(f"\nBaseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("config") != config:
+            print("\n⚠️  Baseline was recorded with different settings:", baseline.get("config"))
+        regressions = compare(stages, baseline["stages"], args.tolerance, args.min_ms)
+        if regressions:
+            print("\nREGRESSIONS:")
+            for line in regressions:
+                print(" ", line)
+            return 1
+        print("\nNo regressions against the baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
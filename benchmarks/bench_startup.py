@@ -0,0 +1,81 @@
+"""
+Start-up check for best_pack.py.
+
+Measures `import best_pack` with `python -X importtime` (median over several
+fresh interpreters), and the wall time of `--help` next to a bare interpreter. Fails (exit code 1) when the import takes longer than the
+target or when a heavy dependency is imported at module load: numpy, requests
+and openpyxl must only be imported by the code paths that use them.
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --runs 10 --target-ms 40
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ("numpy", "requests", "urllib3", "openpyxl", "pandas")
+
+
+def run_python(args):
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)  # measure with a warm .pyc, as a normal install would
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable] + args, cwd=ROOT, env=env, capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        sys.exit(f"{' '.join(args)} failed:\n{proc.stderr}")
+    return wall, proc.stderr
+
+
+def parse_importtime(stderr):
+    """{module: cumulative microseconds} from -X importtime output."""
+    out = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        out[name.strip()] = int(cumulative)
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--runs", type=int, default=7)
+    ap.add_argument("--target-ms", type=float, default=50.0,
+                    help="maximum median cumulative import time of best_pack")
+    args = ap.parse_args()
+
+    run_python(["-c", "import best_pack"])  # writes the .pyc
+
+    import_ms, heavy = [], set()
+    for _ in range(args.runs):
+        _, stderr = run_python(["-X", "importtime", "-c", "import best_pack"])
+        modules = parse_importtime(stderr)
+        import_ms.append(modules["best_pack"] / 1000.0)
+        heavy.update(m.split(".")[0] for m in modules if m.split(".")[0] in HEAVY_MODULES)
+
+    _, stderr = run_python(["-X", "importtime", "best_pack.py", "--help"])
+    heavy.update(m.split(".")[0] for m in parse_importtime(stderr) if m.split(".")[0] in HEAVY_MODULES)
+
+    bare = statistics.median(run_python(["-c", "pass"])[0] for _ in range(args.runs))
+    help_wall = statistics.median(run_python(["-m", "best_pack", "--help"])[0] for _ in range(args.runs))
+    script_wall = statistics.median(run_python(["best_pack.py", "--help"])[0] for _ in range(args.runs))
+
+    median = statistics.median(import_ms)
+    print(f"import best_pack        : {median:7.1f} ms median (min {min(import_ms):.1f}, target {args.target_ms:.0f})")
+    print(f"python -m best_pack -h  : {1000 * help_wall:7.1f} ms wall")
+    print(f"python best_pack.py -h  : {1000 * script_wall:7.1f} ms wall (the script itself is recompiled every run)")
+    print(f"python -c pass          : {1000 * bare:7.1f} ms wall")
+    print(f"heavy modules at startup: {', '.join(sorted(heavy)) or 'none'}")
+
+    ok = median <= args.target_ms and not heavy
+    print("OK" if ok else "FAIL")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+"""
+Scaling benchmark for the wildcard planner.
+
+Builds synthetic want-lists (thousands of cards spread over the Arena sets),
+runs the heap-based `wildcard_plan` next to the previous sort-every-craft
+implementation, checks that both produce the same usage log, and prints timings.
+
+    python benchmarks/bench_wildcard_plan.py
+    python benchmarks/bench_wildcard_plan.py --cards 500 2000 8000 --wildcards 100 400 --skip-legacy-above 2000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import best_pack as bp  # noqa: E402
+
+
+def make_wantlist(n_cards, n_sets=40, seed=0):
+    rnd = random.Random(seed)
+    sets = [f"s{i:02d}" for i in range(n_sets)]
+    pool_sizes = {s: {"rare": rnd.randint(50, 110), "mythic": rnd.randint(15, 30)} for s in sets}
+    rows, printings_by_card = [], {}
+    for i in range(n_cards):
+        name = f"Card {i}"
+        rarity = "mythic" if rnd.random() < 0.25 else "rare"
+        prints = [(s, rarity) for s in rnd.sample(sets, rnd.choice((1, 1, 1, 2, 3)))]
+        rows.append((name, rnd.randint(1, 4)))
+        printings_by_card[name] = prints
+    # Same compact structures (interned ids, bitsets) as the real pipeline
+    missing_by_card, printings_by_card, craft_rarity_by_card, need_names_by_set = bp.needs_from_rows(
+        rows, printings_by_card, verbose=False)
+    return missing_by_card, printings_by_card, craft_rarity_by_card, need_names_by_set, pool_sizes
+
+
+def legacy_wildcard_plan(missing_by_card, printings_by_card, craft_rarity_by_card,
+                         need_names_by_set, pool_sizes, rare_wildcards, mythic_wildcards, top_k_protect=3):
+    """The planner as it was before the priority queues (re-sorts candidates on every craft)."""
+    usage_log = []
+    base_scores_map = {s: bp.direct_pack_hit_prob_for_set(s, need_names_by_set, pool_sizes)
+                       for s in need_names_by_set}
+    protected_sets = set([s for s, _ in
+                          sorted(base_scores_map.items(), key=lambda kv: kv[1], reverse=True)[:top_k_protect]])
+    rarity_prob = {"rare": bp.P_RARE, "mythic": bp.P_MYTHIC}
+
+    def ev_loss_if_eliminate(card_name):
+        loss = 0.0
+        for s, rar in printings_by_card[card_name]:
+            if card_name in need_names_by_set.get(s, {}).get(rar, set()):
+                denom = pool_sizes.get(s, {}).get(rar, 0)
+                if denom > 0:
+                    loss += rarity_prob[rar] * (1.0 / denom)
+        return loss
+
+    def protected_affinity(card_name):
+        return sum(base_scores_map.get(s, 0.0) for (s, _) in printings_by_card[card_name] if s in protected_sets)
+
+    def pick_and_craft_one(rarity, wc_left, ignore_protection=False):
+        if wc_left <= 0:
+            return False, wc_left
+        candidates = [n for n, miss in missing_by_card.items()
+                      if miss > 0 and craft_rarity_by_card.get(n) == rarity]
+        if not candidates:
+            return False, wc_left
+        not_eliminate = [n for n in candidates if missing_by_card[n] > 1]
+        eliminate = [n for n in candidates if missing_by_card[n] == 1]
+        chosen = None
+        if not_eliminate:
+            not_eliminate.sort(key=lambda n: (protected_affinity(n), ev_loss_if_eliminate(n)))
+            chosen = not_eliminate[0]
+        elif eliminate and not ignore_protection:
+            eliminate.sort(key=lambda n: (ev_loss_if_eliminate(n), protected_affinity(n)))
+            chosen = eliminate[0]
+        elif candidates:
+            candidates.sort(key=lambda n: sum(base_scores_map.get(s, 0.0) for (s, _) in printings_by_card[n]))
+            chosen = candidates[0]
+        if chosen is None:
+            return False, wc_left
+        missing_by_card[chosen] -= 1
+        usage_log.append(f"Crafted 1x {rarity.capitalize()} '{chosen}' (remaining need: {missing_by_card[chosen]})")
+        if missing_by_card[chosen] == 0:
+            for s, rar in printings_by_card[chosen]:
+                if chosen in need_names_by_set.get(s, {}).get(rar, set()):
+                    need_names_by_set[s][rar].remove(chosen)
+        return True, wc_left - 1
+
+    progress = True
+    toggle = "mythic"
+    while progress and (rare_wildcards > 0 or mythic_wildcards > 0):
+        progress = False
+        if toggle == "mythic" and mythic_wildcards > 0:
+            did, mythic_wildcards = pick_and_craft_one("mythic", mythic_wildcards)
+            progress = progress or did
+        if toggle == "rare" and rare_wildcards > 0:
+            did, rare_wildcards = pick_and_craft_one("rare", rare_wildcards)
+            progress = progress or did
+        toggle = "rare" if toggle == "mythic" else "mythic"
+        if not any(missing_by_card.get(n, 0) > 0 for n in missing_by_card):
+            break
+    while rare_wildcards > 0 or mythic_wildcards > 0:
+        progress = False
+        if mythic_wildcards > 0:
+            did, mythic_wildcards = pick_and_craft_one("mythic", mythic_wildcards, ignore_protection=True)
+            progress = progress or did
+        if rare_wildcards > 0:
+            did, rare_wildcards = pick_and_craft_one("rare", rare_wildcards, ignore_protection=True)
+            progress = progress or did
+        if not progress:
+            break
+    return missing_by_card, need_names_by_set, usage_log
+
+
+def run_once(planner, wantlist, rare_wc, mythic_wc):
+    missing, prints, craft, need, pools = wantlist
+    need_copy = bp.copy_needs(need)
+    t0 = time.perf_counter()
+    _, _, log = planner(missing.copy(), prints, craft, need_copy, pools, rare_wc, mythic_wc)
+    return time.perf_counter() - t0, log
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--cards", type=int, nargs="+", default=[250, 1000, 4000])
+    ap.add_argument("--wildcards", type=int, nargs="+", default=[50, 200, 800],
+                    help="rare wildcards per run (mythic wildcards = 1/4 of it)")
+    ap.add_argument("--skip-legacy-above", type=int, default=4000,
+                    help="don't time the legacy planner above this many cards")
+    args = ap.parse_args()
+
+    print(f"{'cards':>6} {'rare WC':>8} {'mythic WC':>9} {'heap (ms)':>10} {'legacy (ms)':>12} {'speedup':>8}")
+    for n_cards in args.cards:
+        wantlist = make_wantlist(n_cards)
+        for rare_wc in args.wildcards:
+            mythic_wc = rare_wc // 4
+            t_new, log_new = run_once(bp.wildcard_plan, wantlist, rare_wc, mythic_wc)
+            if n_cards <= args.skip_legacy_above:
+                t_old, log_old = run_once(legacy_wildcard_plan, wantlist, rare_wc, mythic_wc)
+                assert log_new == log_old, f"usage_log mismatch at {n_cards} cards / {rare_wc} rare WC"
+                old_str, speed = f"{1000 * t_old:12.1f}", f"{t_old / t_new:7.1f}x"
+            else:
+                old_str, speed = f"{'-':>12}", f"{'-':>8}"
+            print(f"{n_cards:>6} {rare_wc:>8} {mythic_wc:>9} {1000 * t_new:10.1f} {old_str} {speed}")
+
+
+if __name__ == "__main__":
+    main()
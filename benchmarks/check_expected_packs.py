@@ -0,0 +1,88 @@
+"""
+Checks that the closed-form packs-to-completion (--expected-packs) agrees with
+the Monte Carlo simulation (--simulate).
+
+Builds a few synthetic want-lists (Standard and non-Standard sets, with and
+without the wildcard track and wildcards in hand), runs both methods on each
+and compares the mean packs to finish the deck. The closed form passes when it
+is within --sigmas standard errors of the simulated mean (plus --slack packs for
+the cards it treats as independent). Exits with code 1 on any failure.
+
+    python benchmarks/check_expected_packs.py
+    python benchmarks/check_expected_packs.py --trials 200000 --sigmas 3
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import best_pack as bp  # noqa: E402
+
+
+def make_wantlist(set_code, n_cards, seed=0):
+    """Missing cards printed in `set_code`, an older Standard set and a non-Standard set."""
+    rnd = random.Random(seed)
+    standard = sorted(bp.STANDARD_OR_ALCHEMY_LEGAL_SETS)
+    sets = list(dict.fromkeys([set_code, standard[0], "xln"]))
+    pool_sizes = {s: {"rare": rnd.randint(50, 70), "mythic": rnd.randint(15, 22)}
+                  for s in sorted(set(sets) | set(standard))}
+    missing, printings, craft_rarity = {}, {}, {}
+    for i in range(n_cards):
+        name = f"Card {i}"
+        rarity = "mythic" if rnd.random() < 0.3 else "rare"
+        # Every card can be opened from set_code, so the deck can be finished without crafting
+        others = rnd.sample(sets[1:], rnd.choice((0, 0, 1)))
+        printings[name] = [(s, rarity) for s in [set_code] + others]
+        missing[name] = rnd.randint(1, 4)
+        craft_rarity[name] = rarity
+    return missing, printings, craft_rarity, pool_sizes
+
+
+CASES = [
+    # (label, set, cards, wildcard track, rare / mythic wildcards in hand)
+    ("latest Standard set, no track", bp.LATEST_STANDARD_SET, 12, False, (0, 0)),
+    ("latest Standard set, track", bp.LATEST_STANDARD_SET, 25, True, (0, 0)),
+    ("latest Standard set, wildcards in hand", bp.LATEST_STANDARD_SET, 25, True, (20, 6)),
+    ("older Standard set, track", sorted(bp.STANDARD_OR_ALCHEMY_LEGAL_SETS)[0], 20, True, (4, 1)),
+    ("non-Standard set, track", "xln", 20, True, (5, 1)),
+]
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--trials", type=int, default=50_000)
+    ap.add_argument("--sigmas", type=float, default=4.0, help="allowed difference in standard errors")
+    ap.add_argument("--slack", type=float, default=0.5, help="allowed difference in packs on top of that")
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+
+    failures = 0
+    track = bp.INCLUDE_WILDCARD_EV
+    print(f"{'case':<42}{'closed form':>12}{'simulated':>11}{'± s.e.':>8}{'z':>7}{'ms':>7}")
+    try:
+        for i, (label, set_code, n_cards, with_track, (rare_wc, mythic_wc)) in enumerate(CASES):
+            bp.INCLUDE_WILDCARD_EV = with_track
+            needs = make_wantlist(set_code, n_cards, seed=args.seed + i)
+            start = time.perf_counter()
+            closed = bp.expected_packs_to_completion(set_code, *needs, rare_wildcards=rare_wc,
+                                                     mythic_wildcards=mythic_wc)
+            ms = 1000.0 * (time.perf_counter() - start)
+            sim = bp.simulate_packs_to_completion(set_code, *needs, n_trials=args.trials, seed=args.seed + i,
+                                                  rare_wildcards=rare_wc, mythic_wildcards=mythic_wc, workers=1)
+            se = sim["std"] / sim["trials"] ** 0.5
+            diff = closed["mean"] - sim["mean"]
+            ok = sim["finished"] == 1.0 and abs(diff) <= args.sigmas * se + args.slack
+            failures += not ok
+            print(f"{label:<42}{closed['mean']:>12.2f}{sim['mean']:>11.2f}{se:>8.2f}{diff / se:>+7.1f}{ms:>7.0f}"
+                  f"{'' if ok else '  FAIL'}")
+    finally:
+        bp.INCLUDE_WILDCARD_EV = track
+    print(f"\n{failures} failed" if failures else "\nAll checks passed.")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
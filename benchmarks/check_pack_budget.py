@@ -0,0 +1,70 @@
+"""
+Checks for the pack budget planner (optimize_pack_budget) on small synthetic
+want-lists.
+
+Uses two non-Standard sets, so the golden pack term stays out of the way: a
+set whose only card is a 4-of from a tiny pool, next to a set with several
+single copies missing. With one copy missing the tiny set is opened once and
+then loses to the other set; with four copies missing it has to stay on top
+for more than one allocation. Also checks that a single copy's expected hits
+follow 1 - (1 - hazard)^n and that a 4-of never adds up to more than 4 hits.
+Exits with code 1 on any failure.
+
+    python benchmarks/check_pack_budget.py
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import best_pack as bp  # noqa: E402
+
+SETS = {"xln", "dom"}
+# xln: one rare in a pool of 1 (hazard 7/8); dom: 6 of 10 rares missing (0.525 hits per pack)
+NEED = {"xln": {"rare": {"Four Of"}, "mythic": set()},
+        "dom": {"rare": {f"Single {i}" for i in range(6)}, "mythic": set()}}
+POOLS = {"xln": {"rare": 1, "mythic": 5}, "dom": {"rare": 10, "mythic": 5}}
+
+
+def plan(packs, missing=None, need=NEED):
+    return bp.optimize_pack_budget(need, POOLS, SETS, budget_packs=packs, missing_by_card=missing)
+
+
+def leading(order, set_code):
+    """How many allocations in a row `set_code` takes from the start."""
+    n = 0
+    while n < len(order) and order[n] == set_code:
+        n += 1
+    return n
+
+
+def checks():
+    wc = bp.wildcard_ev_per_pack(False)
+
+    one = plan(10)["order"]
+    yield "one missing copy: the tiny set is opened once, then loses its place", leading(one, "xln") == 1
+
+    four = plan(10, {"Four Of": 4})["order"]
+    yield "4-of keeps its set on top for more than one allocation", leading(four, "xln") > 1
+    yield "4-of gets more packs than a single copy", four.count("xln") > one.count("xln")
+
+    only = {"xln": NEED["xln"]}
+    h = bp.P_RARE / POOLS["xln"]["rare"]
+    hits = plan(3, need=only)["expected_hits"] - 3 * wc
+    yield "single copy follows 1 - (1 - hazard)^n", abs(hits - (1 - (1 - h) ** 3)) < 1e-9
+
+    hits = plan(200, {"Four Of": 4}, need=only)["expected_hits"] - 200 * wc
+    yield "4-of adds up to at most 4 hits", 3.99 < hits <= 4.0 + 1e-9
+
+
+def main():
+    failures = 0
+    for name, ok in checks():
+        print(f"{'ok  ' if ok else 'FAIL'} {name}")
+        failures += not ok
+    print(f"\n{failures} failed" if failures else "\nAll checks passed.")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+"""
+Checks for the incremental Player.log reader against synthetic logs.
+
+Writes small Arena-like logs to a temporary directory and runs the real
+scan_player_log / import_player_log on them: payloads on the marker line, on
+the next (indented) line and pretty-printed over many lines, a partial last
+line that Arena is still writing, resuming from the checkpointed offset, and
+a log that was rotated or truncated. Card ids are named through a fake offline
+catalog, so nothing talks to Scryfall. Exits with code 1 on any failure.
+
+    python benchmarks/check_player_log.py
+"""
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import best_pack as bp  # noqa: E402
+
+NAMES = {1001: "Sheoldred, the Apocalypse", 1002: "Fable of the Mirror-Breaker", 1003: "Llanowar Elves"}
+HEADER = "[UnityCrossThreadLogger]"
+
+
+def collection_json(cards, indent=None):
+    return json.dumps({"payload": {str(g): q for g, q in cards.items()}}, indent=indent)
+
+
+def scan(text):
+    """(state, offset) of one scan_player_log pass over `text` from offset 0."""
+    state = {"collection": {}, "wildcards": {}}
+    with io.BytesIO(text.encode("utf-8")) as f:
+        offset = bp.scan_player_log(f, 0, state)
+    return state, offset
+
+
+def import_log(path):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return bp.import_player_log(path)
+
+
+def checkpoint():
+    """The saved checkpoint (the only file in INPUT_CACHE_DIR)."""
+    with open(os.path.join(bp.INPUT_CACHE_DIR, os.listdir(bp.INPUT_CACHE_DIR)[0]), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def check_scan():
+    marker = f"{HEADER} <== GetPlayerCards(12)"
+    cards = {1001: 2, 1003: 4}
+    want = {"1001": 2, "1003": 4}
+    yield "payload on the marker line", scan(f"{marker} {collection_json(cards)}\n")[0]["collection"] == want
+
+    text = f"{marker}\n  {collection_json(cards)}\n"
+    state, offset = scan(text)
+    yield "indented payload on the next line", state["collection"] == want and offset == len(text)
+
+    body = "\n".join("    " + line for line in collection_json(cards, indent=2).splitlines())
+    text = f"{marker}\n{body}\n{HEADER} next entry\n"
+    state, offset = scan(text)
+    yield "pretty-printed payload with an indented closing brace", \
+        state["collection"] == want and offset == len(text)
+
+    text = f"{HEADER} <== GetPlayerInventory(3)\n" + json.dumps({"payload": {"wcRare": 7, "wcMythic": 2}}) + "\n"
+    yield "wildcards from the inventory", scan(text)[0]["wildcards"] == {"rare": 7, "mythic": 2}
+
+    head = f"{HEADER} unrelated\n"
+    partial = f"{marker}\n{collection_json(cards)[:-3]}"
+    state, offset = scan(head + partial)
+    yield "partial last line waits at the marker", not state["collection"] and offset == len(head)
+
+
+def check_import(tmp):
+    path = os.path.join(tmp, "Player.log")
+    padding = "".join(f"{HEADER} line {i}\n" for i in range(100))   # beyond PLAYER_LOG_HEAD_BYTES
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(padding + f"{HEADER} <== GetPlayerCards(1)\n{collection_json({1001: 1})}\n")
+    owned, _, _ = import_log(path)
+    yield "first import", owned == {"Sheoldred, the Apocalypse": 1}
+    yield "checkpoint at the end of the log", checkpoint()["offset"] == os.path.getsize(path)
+
+    # Arena appends a newer snapshot, half of it written so far
+    snapshot = f"{HEADER} <== GetPlayerCards(2)\n{collection_json({1001: 2, 1002: 1}, indent=2)}\n"
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(snapshot[:-10])
+    before = os.path.getsize(path) - len(snapshot[:-10].encode("utf-8"))
+    owned, _, _ = import_log(path)
+    yield "half-written snapshot keeps the previous one", owned == {"Sheoldred, the Apocalypse": 1}
+    yield "checkpoint waits at the half-written marker", checkpoint()["offset"] == before
+
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(snapshot[-10:])
+    owned, _, _ = import_log(path)
+    yield "resumed import picks up the finished snapshot", \
+        owned == {"Sheoldred, the Apocalypse": 2, "Fable of the Mirror-Breaker": 1}
+
+    # Lines before the checkpoint are not read again: rewriting the last snapshot in
+    # place (past the fingerprinted head) goes unnoticed
+    with open(path, "rb") as f:
+        data = f.read()
+    with open(path, "r+b") as f:
+        f.seek(data.rindex(b'"1002"'))
+        f.write(b'"1003"')
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(f"{HEADER} unrelated\n")
+    owned, _, _ = import_log(path)
+    yield "resume reads only the appended lines", \
+        owned == {"Sheoldred, the Apocalypse": 2, "Fable of the Mirror-Breaker": 1} \
+        and checkpoint()["offset"] == os.path.getsize(path)
+
+    # Arena starts a new log: the old one is moved away and a fresh file takes its place
+    os.replace(path, path + ".prev")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(padding + f"{HEADER} <== GetPlayerCards(1)\n{collection_json({1003: 3})}\n")
+    owned, _, _ = import_log(path)
+    yield "rotated log is read from the start", owned == {"Llanowar Elves": 3}
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"{HEADER} <== GetPlayerCards(1)\n{collection_json({1002: 4})}\n")
+    owned, _, _ = import_log(path)
+    yield "truncated log is read from the start", owned == {"Fable of the Mirror-Breaker": 4}
+
+
+def main():
+    tmp = tempfile.mkdtemp(prefix="best_pack_log_")
+    bp.INPUT_CACHE_DIR = os.path.join(tmp, "cache")
+    bp._CATALOG = {"arena_ids": NAMES}
+    failures = 0
+    try:
+        for name, ok in list(check_scan()) + list(check_import(tmp)):
+            print(f"{'ok  ' if ok else 'FAIL'} {name}")
+            failures += not ok
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    print(f"\n{failures} failed" if failures else "\nAll checks passed.")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""
+Checks that the top-K ranking (--rank-top K) matches the first K lines of the
+full ranking.
+
+Builds fake Scryfall worlds with large and small sets (down to a handful of
+rares and one or two mythics per set, where a fixed guess of the smallest pool
+would make the bounds too low), draws random want-lists and runs
+rank_sets_top_k against the fake server. The reference is rank_sets with every
+needed set's pools fetched. Also reports how many pool requests top-K saved.
+Exits with code 1 on any mismatch.
+
+    python benchmarks/check_rank_top_k.py
+    python benchmarks/check_rank_top_k.py --lists 50 --cards-per-set 12 25
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import best_pack as bp  # noqa: E402
+from fake_scryfall import FakeScryfall, make_world  # noqa: E402
+
+
+def quiet(func, *args):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args)
+
+
+def names_by_set(cards):
+    by_set = {}
+    for c in cards:
+        by_set.setdefault(c["set"], set()).add(c["name"])
+    return {s: sorted(names) for s, names in by_set.items()}
+
+
+def want_lists(cards, sets, n, seed):
+    """`n` random (want-list, k) pairs, each focused on a few sets plus cards from anywhere."""
+    rnd = random.Random(seed)
+    by_set = names_by_set(cards)
+    all_names = sorted({c["name"] for c in cards})
+    for _ in range(n):
+        names = [name for s in rnd.sample(sets, 3)
+                 for name in rnd.sample(by_set[s], min(len(by_set[s]), rnd.randint(5, 30)))]
+        names += rnd.sample(all_names, rnd.randint(5, 60))
+        yield [(name, rnd.randint(1, 4)) for name in dict.fromkeys(names)], rnd.choice((1, 3, 5, 10))
+
+
+def check_world(cards_per_set, n_lists, seed):
+    """(mismatches, pool requests with top-K, pool requests for the full ranking)."""
+    arena = quiet(bp.get_arena_sets)
+    sets = list(arena)
+    cards = make_world(sets, cards_per_set, seed=seed)
+    mismatches = top_k_requests = full_requests = 0
+    with FakeScryfall(cards) as fake:
+        bp.SCRYFALL_API = fake.base_url
+        for i, (rows, k) in enumerate(want_lists(cards, sets, n_lists, seed)):
+            prints = quiet(bp.resolve_arena_printings, [name for name, _ in rows], arena)
+            need_names_by_set = bp.needs_from_rows(rows, prints, verbose=False)[3]
+
+            bp._POOL_CACHE.clear()
+            bp._SET_CATALOG_CACHE.clear()
+            before = fake.stats()["requests"]
+            top, _, _ = quiet(bp.rank_sets_top_k, need_names_by_set, arena, k)
+            top_k_requests += fake.stats()["requests"] - before
+
+            bp._POOL_CACHE.clear()
+            bp._SET_CATALOG_CACHE.clear()
+            before = fake.stats()["requests"]
+            pools = quiet(bp.compute_pool_sizes, need_names_by_set)
+            full_requests += fake.stats()["requests"] - before
+
+            full = bp.rank_sets(need_names_by_set, pools, arena)[:k]
+            if top != full:
+                mismatches += 1
+                print(f"FAIL want-list {i} (top {k}): {top} != {full}")
+    return mismatches, top_k_requests, full_requests
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--lists", type=int, default=20, help="want-lists per world")
+    ap.add_argument("--cards-per-set", type=int, nargs="+", default=[12, 25, 80])
+    ap.add_argument("--seed", type=int, default=3)
+    args = ap.parse_args()
+
+    bp.INPUT_CACHE_DIR = None
+    bp.HTTP_CACHE_PATH = None
+    bp.SCRYFALL_SLEEP = 0
+    bp._CATALOG = None
+    failures = 0
+    for cards_per_set in args.cards_per_set:
+        bad, top_k, full = check_world(cards_per_set, args.lists, args.seed)
+        failures += bad
+        print(f"{'ok  ' if not bad else 'FAIL'} {cards_per_set} cards per set: {args.lists - bad} of {args.lists} "
+              f"want-lists match, {full - top_k} of {full} pool requests saved")
+    print(f"\n{failures} failed" if failures else "\nAll checks passed.")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
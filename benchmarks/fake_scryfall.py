@@ -0,0 +1,236 @@
+"""
+Synthetic card world and a local fake Scryfall server for the benchmarks.
+
+`make_world` builds sets of cards (rares, mythics, commons/uncommons, reprints,
+a few paper-only or non-booster printings); `FakeScryfall` serves them over
+HTTP with the endpoints best_pack.py uses:
+
+    GET  /cards/named?exact=NAME
+    POST /cards/collection         {"identifiers": [{"name": ...}, ...]}
+    GET  /cards/search?q=...       oracleid:ID | e:SET game:arena [is:booster] r:R | (r:A or r:B)
+    GET  /cards/arena/ID
+
+Every response is delayed by `latency` seconds, and more than `rate_limit`
+requests per second (bursts of `burst`) are answered with 429 + Retry-After.
+"""
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+PAGE_SIZE = 175   # Scryfall's search page size
+
+
+def make_world(set_codes, cards_per_set=120, reprint_rate=0.15, seed=0):
+    """
+    List of Scryfall-like card objects. Each set gets `cards_per_set` new cards
+    (~55% rare, ~15% mythic, the rest common/uncommon); a `reprint_rate` share of
+    them is also printed in 1-2 older sets.
+    """
+    rnd = random.Random(seed)
+    cards = []
+    n_sets = len(set_codes)
+    serial = 0
+    for age, set_code in enumerate(set_codes):   # set_codes newest first
+        released = f"{2025 - age // 4}-{12 - 3 * (age % 4):02d}-01"
+        for i in range(cards_per_set):
+            roll = rnd.random()
+            rarity = "mythic" if roll < 0.15 else "rare" if roll < 0.70 else rnd.choice(["common", "uncommon"])
+            name = f"{set_code.upper()} Card {i}"
+            sets = [set_code]
+            if rnd.random() < reprint_rate and age + 1 < n_sets:
+                sets += rnd.sample(set_codes[age + 1:], min(rnd.choice((1, 1, 2)), n_sets - age - 1))
+            for j, printed_in in enumerate(sets):
+                serial += 1
+                p_age = set_codes.index(printed_in)
+                cards.append({
+                    "object": "card",
+                    "name": name,
+                    "oracle_id": f"oracle-{set_code}-{i}",
+                    "set": printed_in,
+                    "collector_number": str(i if j == 0 else 1000 + serial),
+                    "rarity": rarity if j == 0 or rnd.random() < 0.8 else rnd.choice(["rare", "mythic"]),
+                    "games": ["arena", "paper"] if rnd.random() < 0.97 else ["paper"],
+                    "booster": rnd.random() < 0.97,
+                    "released_at": f"{2025 - p_age // 4}-{12 - 3 * (p_age % 4):02d}-01" if j else released,
+                    "arena_id": 100000 + serial,
+                })
+    return cards
+
+
+class FakeScryfall:
+    """
+    Threaded local HTTP server answering like api.scryfall.com for `cards`.
+    Use as a context manager; `base_url` goes into best_pack.SCRYFALL_API.
+    """
+
+    def __init__(self, cards, latency=0.0, rate_limit=0.0, burst=10, retry_after=0.5, page_size=PAGE_SIZE):
+        self.cards = cards
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.burst = burst
+        self.retry_after = retry_after
+        self.page_size = page_size
+        self.by_name = {}
+        self.by_oracle = defaultdict(list)
+        self.by_set = defaultdict(list)
+        self.by_arena_id = {}
+        for c in cards:
+            self.by_name.setdefault(c["name"].casefold(), c)
+            self.by_oracle[c["oracle_id"]].append(c)
+            self.by_set[c["set"]].append(c)
+            self.by_arena_id[c["arena_id"]] = c
+        for prints in self.by_oracle.values():
+            prints.sort(key=lambda c: c["released_at"], reverse=True)
+
+        self._lock = threading.Lock()
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self.requests = Counter()       # by endpoint
+        self.bytes_sent = 0
+        self.throttled = 0
+        self._server = None
+
+    # ---- stats ----
+    def stats(self):
+        with self._lock:
+            return {"requests": sum(self.requests.values()), "by_endpoint": dict(self.requests),
+                    "throttled": self.throttled, "bytes": self.bytes_sent}
+
+    def _admit(self, endpoint):
+        """Count the request; False when it exceeds the rate limit."""
+        with self._lock:
+            self.requests[endpoint] += 1
+            if self.rate_limit <= 0:
+                return True
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate_limit)
+            self._updated = now
+            if self._tokens < 1.0:
+                self.throttled += 1
+                return False
+            self._tokens -= 1.0
+            return True
+
+    # ---- endpoints ----
+    def card_json(self, card):
+        out = dict(card)
+        out["prints_search_uri"] = f"{self.base_url}/cards/search?" + urlencode(
+            {"order": "released", "q": f"oracleid:{card['oracle_id']}", "unique": "prints"})
+        return out
+
+    def search(self, query):
+        m = re.search(r"oracleid:(\S+)", query)
+        if m:
+            return self.by_oracle.get(m.group(1), [])
+        m = re.search(r"\be:(\w+)", query)
+        if not m:
+            return []
+        rarities = set(re.findall(r"\br:(\w+)", query))
+        out = []
+        for c in self.by_set.get(m.group(1), []):
+            if "game:arena" in query and "arena" not in c["games"]:
+                continue
+            if "is:booster" in query and not c["booster"]:
+                continue
+            if rarities and c["rarity"] not in rarities:
+                continue
+            out.append(c)
+        return out
+
+    def handle(self, method, path, query, body):
+        """(status, JSON body) for one request."""
+        if method == "GET" and path == "/cards/named":
+            card = self.by_name.get(query.get("exact", "").casefold())
+            return (200, self.card_json(card)) if card else (404, {"object": "error", "status": 404})
+
+        if method == "POST" and path == "/cards/collection":
+            data, not_found = [], []
+            for ident in body.get("identifiers", []):
+                card = self.by_name.get(str(ident.get("name", "")).casefold())
+                if card:
+                    data.append(self.card_json(card))
+                else:
+                    not_found.append(ident)
+            return 200, {"object": "list", "not_found": not_found, "data": data}
+
+        if method == "GET" and path == "/cards/search":
+            results = self.search(query.get("q", ""))
+            if not results:
+                return 404, {"object": "error", "status": 404}
+            page = int(query.get("page", 1))
+            start = (page - 1) * self.page_size
+            out = {"object": "list", "total_cards": len(results),
+                   "data": [self.card_json(c) for c in results[start:start + self.page_size]],
+                   "has_more": start + self.page_size < len(results)}
+            if out["has_more"]:
+                out["next_page"] = f"{self.base_url}/cards/search?" + urlencode(dict(query, page=page + 1))
+            return 200, out
+
+        if method == "GET" and path.startswith("/cards/arena/"):
+            card = self.by_arena_id.get(int(path.rsplit("/", 1)[1] or 0))
+            return (200, self.card_json(card)) if card else (404, {"object": "error", "status": 404})
+
+        return 404, {"object": "error", "status": 404}
+
+    # ---- server ----
+    def start(self, host="127.0.0.1", port=0):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def _serve(self, method):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}") if length else {}
+                parts = urlsplit(self.path)
+                query = {k: v[0] for k, v in parse_qs(parts.query).items()}
+                endpoint = "/cards/arena" if parts.path.startswith("/cards/arena/") else parts.path
+                if fake.latency:
+                    time.sleep(fake.latency)
+                if fake._admit(endpoint):
+                    status, payload = fake.handle(method, parts.path, query, body)
+                else:
+                    status, payload = 429, {"object": "error", "status": 429}
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                if status == 429:
+                    self.send_header("Retry-After", str(fake.retry_after))
+                self.end_headers()
+                self.wfile.write(data)
+                with fake._lock:
+                    fake.bytes_sent += len(data)
+
+            def do_GET(self):
+                self._serve("GET")
+
+            def do_POST(self):
+                self._serve("POST")
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self.base_url = f"http://{host}:{self._server.server_address[1]}"
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
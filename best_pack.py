@@ -1,17 +1,36 @@
-import pandas as pd
-import requests
+import contextlib
+import gzip
+import hashlib
+import heapq
+import json
+import os
+import pickle
+import re
+import threading
 import time
+import zlib
+from array import array
 from collections import defaultdict
+from collections.abc import Mapping, MutableMapping, MutableSet
+from urllib.parse import urlencode, urlsplit
 
 # =======================
 # Config
 # =======================
 EXCEL_PATH = "mtg_decklist.xlsx"
 SEARCH_SIDEBOARD = False
+# Optional separate inputs (default: the Decklist / Have sheets of EXCEL_PATH).
+# Accepts .xlsx workbooks, Name,Qty .csv files and MTG Arena text exports (.txt).
+DECKLIST_PATH = None
+COLLECTION_PATH = None
+# Parsed inputs are cached here, keyed on file mtime + hash (None to disable)
+INPUT_CACHE_DIR = ".best_pack_cache"
 
 # Your current wildcards
 MYTHIC_WILDCARDS = 7
 RARE_WILDCARDS   = 15
+# The wildcard plan first avoids eliminating targets in this many top sets
+TOP_K_PROTECT = 3
 
 # Consider only rares/mythics for pack EV
 ALLOWED_RARITIES = {"rare", "mythic"}
@@ -32,9 +51,12 @@ GOLDEN_MYTHIC_RATE_PER_SLOT = GOLDEN_EXPECTED_MYTHICS / GOLDEN_PACK_SLOTS_TOTAL
 
 # Wildcard track EV (very small, but certain) — tweak to taste
 # Rough heuristic: every 6 packs ~1 rare WC; every 30 rares ~1 mythic WC (via 5th). Convert to "card-equivalent" EV.
+PACKS_PER_TRACK_WILDCARD = 6
+TRACK_WILDCARDS_PER_MYTHIC = 5
+
 def wildcard_value_from_n_packs(n_packs):
-    total_rare_wc = n_packs / 6.0                   # one rare WC per 6 packs
-    total_mythic_wc = int(total_rare_wc // 5)       # every 5 rares → 1 mythic
+    total_rare_wc = n_packs / float(PACKS_PER_TRACK_WILDCARD)           # one rare WC per 6 packs
+    total_mythic_wc = int(total_rare_wc // TRACK_WILDCARDS_PER_MYTHIC)  # every 5 rares → 1 mythic
     total_rare_wc -= total_mythic_wc
     return total_rare_wc + total_mythic_wc
 
@@ -52,8 +74,37 @@ LATEST_STANDARD_SET = "eoe"
 # Prefer the oldest Standard-legal set in ties (0 = newest, larger = older)
 STD_ROTATION_PRIORITY = {code: i for i, code in enumerate(STANDARD_OR_ALCHEMY_LEGAL_SETS)}
 
-# Basic Scryfall rate-limit
+# Scryfall API base URL (point it at a mirror or a local fake server for benchmarks)
+SCRYFALL_API = "https://api.scryfall.com"
+
+# Basic Scryfall rate-limit: one request every SCRYFALL_SLEEP seconds on average,
+# enforced by a shared token bucket so up to SCRYFALL_MAX_WORKERS requests can overlap
 SCRYFALL_SLEEP = 0.12
+SCRYFALL_BURST = 4
+SCRYFALL_MAX_WORKERS = 4
+SCRYFALL_MAX_RETRIES = 4          # on 429 / 503
+SCRYFALL_BACKOFF_BASE = 1.0       # seconds, doubled per retry when there is no Retry-After
+SCRYFALL_USER_AGENT = "best-pack-mtg-arena/1.0"
+# Max identifiers per /cards/collection request (Scryfall limit)
+SCRYFALL_COLLECTION_BATCH = 75
+
+# Offline card catalog built from a Scryfall bulk file ("default_cards" or "all_cards").
+# Download it from https://scryfall.com/docs/api/bulk-data (or run `python best_pack.py ingest --download`).
+# When the catalog is present, card, printing and pool lookups never touch the network.
+BULK_DATA_PATH = "default-cards.json"
+CATALOG_PATH   = "arena_catalog.pkl"
+
+# Persistent on-disk cache of Scryfall responses (shared across runs)
+HTTP_CACHE_PATH = "scryfall_cache.sqlite"     # set to None to disable
+HTTP_CACHE_MAX_BYTES = 256 * 1024 * 1024      # least recently used responses are evicted above this
+# Time-to-live in seconds per endpoint (longest matching path prefix wins)
+HTTP_CACHE_TTLS = {
+    "/cards/named":  14 * 24 * 3600,   # card identity rarely changes
+    "/cards/collection": 14 * 24 * 3600,
+    "/cards/search":  3 * 24 * 3600,   # printings / set pools (new printings show up on set release)
+    "/bulk-data":          12 * 3600,
+    "":               1 * 24 * 3600,   # anything else
+}
 
 
 # =======================
@@ -111,24 +162,525 @@ def get_arena_sets():
 
 
 # =======================
-# Scryfall helpers
+# Persistent HTTP cache
 # =======================
-def scryfall_get(url, params=None):
+class HttpCache:
+    """
+    Disk-backed cache of Scryfall JSON responses keyed on URL + params.
+    Entries expire per endpoint (HTTP_CACHE_TTLS) and the least recently used
+    ones are evicted once the stored (compressed) bytes exceed max_bytes.
+    Reads don't write: access times of hits are kept in memory and stored in one
+    transaction on the next put(), flush() or at exit.
+    """
+
+    def __init__(self, path, max_bytes=HTTP_CACHE_MAX_BYTES, ttls=None):
+        import sqlite3
+
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttls = dict(HTTP_CACHE_TTLS if ttls is None else ttls)
+        self.hits = self.misses = self.expired = self.evictions = 0
+        self._lock = threading.Lock()
+        self._accessed = {}       # key -> access time not written yet
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, stored_at REAL, accessed_at REAL, size INTEGER, body BLOB)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_lru ON responses (accessed_at)")
+        self._db.commit()
+        self.total_bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        import atexit
+        atexit.register(self.flush)
+
+    @staticmethod
+    def make_key(url, params=None, body=None):
+        key = url
+        if params:
+            key += ("&" if "?" in url else "?") + urlencode(sorted(params.items()))
+        if body is not None:
+            key += " " + json.dumps(body, sort_keys=True, separators=(",", ":"))
+        return key
+
+    def ttl_for(self, url):
+        path = urlsplit(url).path
+        prefix = max((p for p in self.ttls if path.startswith(p)), key=len, default=None)
+        return self.ttls.get(prefix, 0)
+
+    def get(self, url, params=None, body=None):
+        key = self.make_key(url, params, body)
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT stored_at, body FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            stored_at, body = row
+            if now - stored_at > self.ttl_for(url):
+                self.expired += 1
+                self.misses += 1
+                return None
+            self._accessed[key] = now
+            self.hits += 1
+        return json.loads(zlib.decompress(body))
+
+    def put(self, url, params, data, body=None):
+        key = self.make_key(url, params, body)
+        body = zlib.compress(json.dumps(data, separators=(",", ":")).encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            old = self._db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            if old:
+                self.total_bytes -= old[0]
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, stored_at, accessed_at, size, body) VALUES (?, ?, ?, ?, ?)",
+                (key, now, now, len(body), body),
+            )
+            self.total_bytes += len(body)
+            self._accessed.pop(key, None)
+            self._write_accessed_locked()
+            self._evict_locked()
+            self._db.commit()
+
+    def flush(self):
+        """Store the access times of the hits since the last write."""
+        with self._lock:
+            if self._accessed:
+                self._write_accessed_locked()
+                self._db.commit()
+
+    def _write_accessed_locked(self):
+        if self._accessed:
+            self._db.executemany("UPDATE responses SET accessed_at = ? WHERE key = ?",
+                                 [(t, k) for k, t in self._accessed.items()])
+            self._accessed.clear()
+
+    def _evict_locked(self):
+        while self.total_bytes > self.max_bytes:
+            rows = self._db.execute(
+                "SELECT key, size FROM responses ORDER BY accessed_at LIMIT 64"
+            ).fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.total_bytes -= size
+                self.evictions += 1
+                if self.total_bytes <= self.max_bytes:
+                    break
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "evictions": self.evictions,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            "bytes": self.total_bytes,
+        }
+
+
+_HTTP_CACHE = None
+
+def get_http_cache():
+    global _HTTP_CACHE
+    if _HTTP_CACHE is None and HTTP_CACHE_PATH:
+        _HTTP_CACHE = HttpCache(HTTP_CACHE_PATH, HTTP_CACHE_MAX_BYTES, HTTP_CACHE_TTLS)
+    return _HTTP_CACHE
+
+
+# =======================
+# Run profile (--profile)
+# =======================
+# Write per-phase timings and HTTP accounting of the run to this JSON file (None = off)
+PROFILE_PATH = None
+
+
+class _Phase:
+    __slots__ = ("profile", "name", "start")
+
+    def __init__(self, profile, name):
+        self.profile = profile
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.profile.add_phase(self.name, time.perf_counter() - self.start)
+
+
+class RunProfile:
+    """
+    Where a run spends its time: wall time per phase (phases may nest), and per
+    Scryfall endpoint the requests, bytes, errors, retries, time on the wire and
+    cache hits, plus the time spent sleeping in the rate limiter. Thread-safe.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = {}
+        self.endpoints = defaultdict(lambda: {"requests": 0, "bytes": 0, "errors": 0, "retries": 0,
+                                              "cache_hits": 0, "seconds": 0.0})
+        self.sleep_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def phase(self, name):
+        return _Phase(self, name)
+
+    def add_phase(self, name, seconds):
+        with self._lock:
+            entry = self.phases.setdefault(name, {"seconds": 0.0, "calls": 0})
+            entry["seconds"] += seconds
+            entry["calls"] += 1
+
+    @staticmethod
+    def endpoint(url):
+        path = urlsplit(url).path
+        for prefix in ("/cards/arena/", "/bulk-data/"):
+            if path.startswith(prefix):
+                return prefix.rstrip("/")
+        return path
+
+    def record_request(self, url, status, n_bytes, seconds):
+        with self._lock:
+            entry = self.endpoints[self.endpoint(url)]
+            entry["requests"] += 1
+            entry["bytes"] += n_bytes
+            entry["seconds"] += seconds
+            if status in (429, 503):
+                entry["retries"] += 1
+            elif status != 200:
+                entry["errors"] += 1
+
+    def record_cache_hit(self, url):
+        with self._lock:
+            self.endpoints[self.endpoint(url)]["cache_hits"] += 1
+
+    def record_sleep(self, seconds):
+        if seconds > 0:
+            with self._lock:
+                self.sleep_seconds += seconds
+
+    def to_dict(self):
+        with self._lock:
+            endpoints = {k: dict(v) for k, v in sorted(self.endpoints.items())}
+            phases = {k: dict(v) for k, v in self.phases.items()}
+        totals = {key: sum(e[key] for e in endpoints.values())
+                  for key in ("requests", "bytes", "errors", "retries", "cache_hits", "seconds")}
+        lookups = totals["requests"] + totals["cache_hits"]
+        cache = get_http_cache()
+        return {
+            "total_seconds": time.perf_counter() - self.started,
+            "phases": phases,
+            "http": dict(totals, sleep_seconds=self.sleep_seconds,
+                         cache_hit_rate=totals["cache_hits"] / lookups if lookups else 0.0,
+                         by_endpoint=endpoints),
+            "http_cache": cache.stats() if cache is not None else None,
+        }
+
+
+_PROFILE = None
+_NO_PHASE = contextlib.nullcontext()
+
+def enable_profile():
+    global _PROFILE
+    _PROFILE = RunProfile()
+    return _PROFILE
+
+
+def profile_phase(name):
+    """Context manager timing `name` in the run profile (a shared no-op when profiling is off)."""
+    return _PROFILE.phase(name) if _PROFILE is not None else _NO_PHASE
+
+
+def write_profile(path):
+    if _PROFILE is None:
+        return None
+    data = _PROFILE.to_dict()
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    return data
+
+
+# =======================
+# Fetch engine (pooled session + token-bucket rate limit)
+# =======================
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` requests per second with bursts of up to `burst`.
+    Callers reserve a token and sleep only for as long as the bucket is in debt,
+    so concurrent requests overlap instead of each paying a fixed sleep.
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate = float(rate)
+        self.capacity = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill_locked(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        with self._lock:
+            self._refill_locked()
+            self.tokens -= 1.0
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def pause(self, seconds):
+        """Stop handing out tokens for `seconds` (e.g. after a 429 Retry-After)."""
+        with self._lock:
+            self._refill_locked()
+            self.tokens = min(self.tokens, 0.0) - seconds * self.rate
+
+
+_SESSION = None
+_RATE_LIMITER = None
+_ENGINE_LOCK = threading.Lock()
+
+def get_session():
+    global _SESSION
+    import requests
+
+    with _ENGINE_LOCK:
+        if _SESSION is None:
+            _SESSION = requests.Session()
+            _SESSION.headers.update({"User-Agent": SCRYFALL_USER_AGENT, "Accept": "application/json"})
+            adapter = requests.adapters.HTTPAdapter(pool_connections=2, pool_maxsize=max(SCRYFALL_MAX_WORKERS, 1))
+            _SESSION.mount("https://", adapter)
+            _SESSION.mount("http://", adapter)
+    return _SESSION
+
+
+def get_rate_limiter():
+    global _RATE_LIMITER
+    with _ENGINE_LOCK:
+        if _RATE_LIMITER is None:
+            _RATE_LIMITER = TokenBucket(1.0 / SCRYFALL_SLEEP if SCRYFALL_SLEEP > 0 else float("inf"),
+                                        SCRYFALL_BURST)
+    return _RATE_LIMITER
+
+
+# Scryfall traffic can be recorded to a cassette (--record) and served back from it
+# (--replay): replayed runs are reproducible, work offline and never sleep
+CASSETTE_RECORD_PATH = None
+CASSETTE_REPLAY_PATH = None
+CASSETTE_VERSION = 1
+
+
+class CassetteMiss(LookupError):
+    """A replayed run made a request that is not on the cassette."""
+
+
+def _cassette_key(method, url, params=None, payload=None):
+    return f"{method} {HttpCache.make_key(url, params, payload)}"
+
+
+class CassetteResponse:
+    """The parts of a requests.Response that scryfall_request uses."""
+
+    def __init__(self, status_code, content, headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class HttpTransport:
+    """Sends requests to Scryfall through the shared keep-alive session."""
+    replaying = False
+
+    def send(self, method, url, params=None, payload=None):
+        session = get_session()
+        if method == "POST":
+            return session.post(url, json=payload, timeout=20)
+        return session.get(url, params=params, timeout=20)
+
+
+class RecordingTransport:
+    """
+    Passes requests on to `inner` and keeps the last response to every distinct
+    request (method + URL + params + body); save() writes them as a cassette.
+    """
+    replaying = False
+
+    def __init__(self, path, inner=None):
+        self.path = path
+        self.inner = inner or HttpTransport()
+        self.interactions = {}
+        self._lock = threading.Lock()
+
+    def send(self, method, url, params=None, payload=None):
+        r = self.inner.send(method, url, params, payload)
+        entry = {"status": r.status_code, "body": r.content.decode("utf-8", "replace")}
+        if r.headers.get("Retry-After") is not None:
+            entry["retry_after"] = r.headers["Retry-After"]
+        with self._lock:
+            self.interactions[_cassette_key(method, url, params, payload)] = entry
+        return r
+
+    def save(self):
+        """Write the cassette (gzipped JSON); returns the number of recorded requests."""
+        with self._lock:
+            data = {"version": CASSETTE_VERSION, "recorded_at": time.time(), "interactions": self.interactions}
+            text = json.dumps(data, separators=(",", ":"), sort_keys=True)
+        tmp = self.path + ".tmp"
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, self.path)
+        return len(data["interactions"])
+
+
+class ReplayTransport:
+    """Answers requests from a recorded cassette; anything not on it raises CassetteMiss."""
+    replaying = True
+
+    def __init__(self, path):
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                data = json.load(f)
+            if not isinstance(data, dict) or not isinstance(data.get("interactions"), dict):
+                raise ValueError("not a cassette")
+            if data.get("version") != CASSETTE_VERSION:
+                raise ValueError(f"unsupported cassette version {data.get('version')}")
+        except (OSError, EOFError, ValueError) as e:
+            raise SystemExit(f"❌ Could not read cassette {path}: {e}")
+        self.path = path
+        self.interactions = data["interactions"]
+
+    def send(self, method, url, params=None, payload=None):
+        key = _cassette_key(method, url, params, payload)
+        entry = self.interactions.get(key)
+        if entry is None:
+            raise CassetteMiss(f"request not on cassette {self.path}: {key}")
+        headers = {"Retry-After": entry["retry_after"]} if "retry_after" in entry else {}
+        return CassetteResponse(entry["status"], entry["body"].encode("utf-8"), headers)
+
+
+_TRANSPORT = None
+
+def get_transport():
+    """The transport Scryfall requests go through: live, recording or replaying a cassette."""
+    global _TRANSPORT
+    with _ENGINE_LOCK:
+        if _TRANSPORT is None:
+            if CASSETTE_REPLAY_PATH:
+                _TRANSPORT = ReplayTransport(CASSETTE_REPLAY_PATH)
+            elif CASSETTE_RECORD_PATH:
+                _TRANSPORT = RecordingTransport(CASSETTE_RECORD_PATH)
+            else:
+                _TRANSPORT = HttpTransport()
+    return _TRANSPORT
+
+
+def start_cassette():
+    """
+    Set up a --record / --replay run. It starts from a clean slate: the run state,
+    the learned card names (both in INPUT_CACHE_DIR) and the offline catalog would
+    answer lookups locally, so a warm run would record no requests and a replay
+    would depend on local files. The transport is created right away, so a broken
+    cassette stops the run before it starts and a recording is always saved.
+    """
+    global INPUT_CACHE_DIR, CATALOG_PATH, BULK_DATA_PATH
+    INPUT_CACHE_DIR = CATALOG_PATH = BULK_DATA_PATH = None
+    return get_transport()
+
+
+def _retry_after_seconds(response, attempt):
+    value = response.headers.get("Retry-After")
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        return SCRYFALL_BACKOFF_BASE * (2 ** attempt)
+
+
+def scryfall_request(method, url, params=None, payload=None):
+    """
+    Cached, rate-limited Scryfall request returning parsed JSON (or None on error).
+    429/503 responses are retried after Retry-After (or exponential backoff),
+    pausing the shared rate limiter so other threads back off too.
+    """
+    profile = _PROFILE
+    transport = get_transport()
+    # With a cassette every request goes through the transport, so it is recorded (or replayed)
+    cache = get_http_cache() if isinstance(transport, HttpTransport) else None
+    if cache is not None:
+        cached = cache.get(url, params, body=payload)
+        if cached is not None:
+            if profile is not None:
+                profile.record_cache_hit(url)
+            return cached  # no rate limiting for cache hits
+
+    limiter = None if transport.replaying else get_rate_limiter()
     try:
-        r = requests.get(url, params=params, timeout=20)
-        time.sleep(SCRYFALL_SLEEP)
+        for attempt in range(SCRYFALL_MAX_RETRIES + 1):
+            waited = limiter.acquire() if limiter is not None else 0.0
+            start = time.perf_counter()
+            r = transport.send(method, url, params, payload)
+            if profile is not None:
+                profile.record_sleep(waited)
+                profile.record_request(url, r.status_code, len(r.content), time.perf_counter() - start)
+            if r.status_code in (429, 503) and attempt < SCRYFALL_MAX_RETRIES and limiter is not None:
+                delay = _retry_after_seconds(r, attempt)
+                print(f"⏳ Scryfall throttled ({r.status_code}), retrying in {delay:.1f}s")
+                limiter.pause(delay)
+                continue
+            break
         if r.status_code == 200:
-            return r.json()
+            data = r.json()
+            if cache is not None:
+                cache.put(url, params, data, body=payload)
+            return data
         print(f"❌ Scryfall error {r.status_code} at {url}")
         return None
+    except CassetteMiss:
+        raise
     except Exception as e:
+        if profile is not None:
+            profile.record_request(url, None, 0, 0.0)
         print(f"❌ Request exception at {url}: {e}")
         return None
 
 
+def scryfall_get(url, params=None):
+    return scryfall_request("GET", url, params=params)
+
+
+def scryfall_post(url, payload):
+    return scryfall_request("POST", url, payload=payload)
+
+
+def fetch_concurrently(func, items, max_workers=None):
+    """
+    Run `func` over `items` on a thread pool sharing the session and rate limiter.
+    Results come back in input order, exactly as `[func(x) for x in items]` would.
+    """
+    items = list(items)
+    workers = SCRYFALL_MAX_WORKERS if max_workers is None else max_workers
+    if workers <= 1 or len(items) <= 1:
+        return [func(x) for x in items]
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=min(workers, len(items))) as pool:
+        return list(pool.map(func, items))
+
+
+# =======================
+# Scryfall helpers
+# =======================
 def get_card_data(card_name):
-    url = "https://api.scryfall.com/cards/named"
-    data = scryfall_get(url, params={"exact": card_name})
+    resolved, _ = resolve_cards([card_name])
+    data = resolved.get(card_name)
     if data:
         print(f"🔍 Processing: {card_name}")
     else:
@@ -136,12 +688,127 @@ def get_card_data(card_name):
     return data
 
 
-def get_all_arena_printings(card_data, arena_sets, allowed_rarities):
+def _collection_lookup(pairs, resolved, index):
+    """
+    Ask /cards/collection for (name as given, name to ask for) pairs, in batches of
+    SCRYFALL_COLLECTION_BATCH identifiers; found cards go into `resolved` and `index`.
+    Names are sent the way Scryfall spells them (see scryfall_name), and names that
+    only matched after that are recorded in _NAME_CORRECTIONS.
+    """
+    url = f"{SCRYFALL_API}/cards/collection"
+    respelled = {n for n, q in pairs if scryfall_name(q) != q}
+    pairs = [(n, scryfall_name(q)) for n, q in pairs]
+    for i in range(0, len(pairs), SCRYFALL_COLLECTION_BATCH):
+        batch = pairs[i:i + SCRYFALL_COLLECTION_BATCH]
+        page = scryfall_post(url, {"identifiers": [{"name": q} for _, q in batch]})
+        if not page:
+            continue
+        cards = page.get("data", [])
+        index.learn(cards)
+        # Found cards come back in request order, minus the identifiers listed in not_found
+        missing = {str(ident.get("name", "")).casefold() for ident in page.get("not_found", [])}
+        found = [n for n, q in batch if q.casefold() not in missing]
+        if len(found) == len(cards):
+            resolved.update(zip(found, cards))
+            continue
+        # Fall back to matching by (face) name if the response doesn't line up
+        by_name = {}
+        for card in cards:
+            by_name.setdefault(card.get("name", "").casefold(), card)
+            for face in card.get("card_faces", []) or []:
+                by_name.setdefault(face.get("name", "").casefold(), card)
+        for n, q in batch:
+            if q.casefold() in by_name:
+                resolved[n] = by_name[q.casefold()]
+    for n in respelled:
+        if n in resolved and n not in _NAME_CORRECTIONS and resolved[n].get("name", n) != n:
+            _NAME_CORRECTIONS[n] = (resolved[n]["name"], "spelling")
+
+
+def _fuzzy_lookup(pairs, resolved, index):
+    """
+    Ask /cards/named?fuzzy= for (name as given, name to ask for) pairs, one request
+    each; Scryfall answers only when a single card fits. Found cards go into
+    `resolved` and `index`, and the correction into _NAME_CORRECTIONS.
+    """
+    url = f"{SCRYFALL_API}/cards/named"
+    cards = fetch_concurrently(lambda pair: scryfall_get(url, params={"fuzzy": pair[1]}), pairs)
+    for (name, _), card in zip(pairs, cards):
+        if not card or not card.get("name"):
+            continue
+        index.learn([card])
+        resolved[name] = card
+        if card["name"] != name:
+            canonical, reason = index.lookup(name, fuzzy=False)
+            _NAME_CORRECTIONS[name] = (card["name"], reason if canonical == card["name"] else "typo")
+
+
+def resolve_cards(card_names):
+    """
+    Resolve many card names at once.
+    Names are matched locally first: the offline catalog, then the name index
+    (other spellings, card faces, Alchemy "A-" names, and typos once the catalog
+    lists every card). Only the rest go to /cards/collection; names Scryfall
+    doesn't know get one more try under the closest name learned meanwhile.
+    Without the catalog, names still unknown after that are asked one by one
+    through Scryfall's fuzzy name search (accents, single faces, typos).
+    Corrections are recorded in _NAME_CORRECTIONS.
+    Returns (card_data_by_name, not_found_names), keyed on the names as given.
+    """
+    resolved = {}
+    pending = []      # (name as given, name to ask Scryfall for)
+    index = None
+    for name in dict.fromkeys(card_names):
+        card_data = None if name.startswith("A-") else catalog_card_data(name)
+        if card_data and card_data["name"] == name:
+            resolved[name] = card_data
+            continue
+        index = index or get_name_index()
+        canonical, reason = index.lookup(name, fuzzy=index.complete)
+        if canonical is None and name.startswith("A-") and len(name) > 2:
+            canonical, reason = name[2:], "Alchemy rebalance"
+        if reason:
+            _NAME_CORRECTIONS[name] = (canonical, reason)
+        card_data = catalog_card_data(canonical or name)
+        if card_data:
+            resolved[name] = card_data
+        else:
+            pending.append((name, canonical or name))
+    if not pending:
+        return resolved, []
+
+    _collection_lookup(pending, resolved, index)
+    if not index.complete:
+        # Typos: retry the names Scryfall doesn't know under the closest known name
+        retry = []
+        for name, asked in pending:
+            if name not in resolved:
+                canonical, reason = index.lookup(asked)
+                if reason:
+                    _NAME_CORRECTIONS[name] = (canonical, reason)
+                    retry.append((name, canonical))
+        _collection_lookup(retry, resolved, index)
+        _fuzzy_lookup([(n, asked) for n, asked in pending if n not in resolved], resolved, index)
+    save_name_index()
+
+    not_found = [n for n, _ in pending if n not in resolved]
+    for name in not_found:
+        _NAME_CORRECTIONS.pop(name, None)
+    return resolved, not_found
+
+
+def get_all_arena_printings(card_data, arena_sets, allowed_rarities, errors=None):
     """
     Returns list of (set_code, rarity_on_arena) for this card,
     counting ONLY Arena-openable booster printings.
     Fixes issues where paper has different rarity (e.g., Arclight Phoenix).
+    Pages that failed to load are appended to `errors` (the list is then partial).
     """
+    if "arena_printings" in card_data:
+        # Answered from the offline catalog (already Arena booster printings, newest first)
+        return [(set_code, rarity) for set_code, rarity in card_data["arena_printings"]
+                if set_code in arena_sets and rarity in allowed_rarities]
+
     out = []
     uri = card_data.get("prints_search_uri")
     if not uri:
@@ -150,6 +817,8 @@ def get_all_arena_printings(card_data, arena_sets, allowed_rarities):
     while uri:
         page = scryfall_get(uri)
         if not page:
+            if errors is not None:
+                errors.append(uri)
             break
         for p in page.get("data", []):
             if "arena" not in p.get("games", []):
@@ -177,8 +846,19 @@ def get_pool_size_for_set(set_code, rarity):
     if key in _POOL_CACHE:
         return _POOL_CACHE[key]
 
+    if _CATALOG is not None and set_code in _CATALOG["pools"]:
+        total = _CATALOG["pools"][set_code].get(rarity, 0)
+        _POOL_CACHE[key] = total
+        return total
+
+    if rarity in ALLOWED_RARITIES:
+        # One pass over the set answers every allowed rarity at once
+        total = get_set_catalog(set_code)["pools"].get(rarity, 0)
+        _POOL_CACHE[key] = total
+        return total
+
     total = 0
-    url = "https://api.scryfall.com/cards/search"
+    url = f"{SCRYFALL_API}/cards/search"
     params = {"q": f"e:{set_code} game:arena r:{rarity}", "unique": "prints"}
     while True:
         page = scryfall_get(url, params=params) if params else scryfall_get(url)
@@ -197,159 +877,1240 @@ def get_pool_size_for_set(set_code, rarity):
 
 
 # =======================
-# Data loading
+# Per-set catalogs (one search pass per Arena set)
 # =======================
-def load_data():
-    deck_df  = pd.read_excel(EXCEL_PATH, sheet_name="Decklist")
-    owned_df = pd.read_excel(EXCEL_PATH, sheet_name="Have")
+# Decks with at least this many cards still to look up fetch every Arena set's
+# catalog up front; that answers all printing lookups (and the pools) in ~1 page per set.
+SET_CATALOG_PREFETCH_MIN_CARDS = 30
 
-    if SEARCH_SIDEBOARD:
-        try:
-            sideboard_df = pd.read_excel(EXCEL_PATH, sheet_name="Sideboard")
-            deck_df = pd.concat([deck_df, sideboard_df], ignore_index=True)
-        except Exception:
-            print("⚠️ Sideboard tab not found or error reading it. Skipping sideboard.")
+_SET_CATALOG_CACHE = {}
+_SET_CATALOG_LOCKS = defaultdict(threading.Lock)
 
-    deck_df["Name"]  = deck_df["Name"].str.strip()
-    owned_df["Name"] = owned_df["Name"].str.strip()
-    owned_dict = dict(zip(owned_df["Name"], owned_df["Qty"]))
+def get_set_catalog(set_code):
+    """
+    Download the Arena booster cards of ALLOWED_RARITIES in one set, once:
+      - pools[rarity] = # of Arena-openable booster cards (what get_pool_size_for_set counts)
+      - printings[name] = rarities of that name's booster printings in the set
+      - released_at = set release date (orders printings newest first, like prints_search_uri)
+      - complete = False when a page failed, so printings can't be answered from it
+    """
+    with _SET_CATALOG_LOCKS[set_code]:
+        if set_code in _SET_CATALOG_CACHE:
+            return _SET_CATALOG_CACHE[set_code]
 
-    return deck_df, owned_dict
+        pools = defaultdict(int)
+        printings = defaultdict(list)
+        released_at = ""
+        complete = True
+        rarity_q = " or ".join(f"r:{r}" for r in sorted(ALLOWED_RARITIES))
+        url = f"{SCRYFALL_API}/cards/search"
+        params = {"q": f"e:{set_code} game:arena is:booster ({rarity_q})", "unique": "prints"}
+        while True:
+            page = scryfall_get(url, params=params) if params else scryfall_get(url)
+            if not page:
+                complete = False  # failed (or empty) search: don't trust it for printing lookups
+                break
+            get_name_index().learn(page.get("data", []))
+            for c in page.get("data", []):
+                if "arena" not in c.get("games", []) or not c.get("booster", False):
+                    continue
+                rarity = c.get("rarity")
+                pools[rarity] += 1
+                if rarity not in printings[c.get("name")]:
+                    printings[c.get("name")].append(rarity)
+                released_at = max(released_at, c.get("released_at", ""))
+            next_page = page.get("next_page")
+            if not next_page:
+                break
+            url, params = next_page, None
 
+        catalog = {"pools": dict(pools), "printings": dict(printings),
+                   "released_at": released_at, "complete": complete}
+        _SET_CATALOG_CACHE[set_code] = catalog
+        return catalog
 
-# =======================
-# Need building (distinct names, by set/rarity)
-# =======================
-def build_needs(deck_df, owned_dict, arena_sets):
-    """
-    Build:
-      - missing_by_card[name] = remaining qty needed for the deck
-      - printings_by_card[name] = list of (set_code, arena_rarity)
-      - need_names_by_set[set_code][rarity] = set of distinct needed names for that set/rarity
-      - craft_rarity_by_card[name] = cheapest rarity available on Arena for crafting that name
-    Only cards with qty_missing > 0 and rarity in ALLOWED_RARITIES will be tracked.
-    """
-    rarity_rank = {"rare": 1, "mythic": 2}
-    need_names_by_set = defaultdict(lambda: {"rare": set(), "mythic": set()})
-    printings_by_card = {}
-    craft_rarity_by_card = {}
-    missing_by_card = {}
-
-    for _, row in deck_df.iterrows():
-        name = str(row["Name"]).strip()
-        qty_deck = int(row["Qty"])
-        qty_owned = int(owned_dict.get(name, 0))
-        qty_missing = max(qty_deck - qty_owned, 0)
-        if qty_missing <= 0:
-            continue
 
-        card_data = get_card_data(name)
-        if not card_data:
-            continue
+def prefetch_set_catalogs(set_codes):
+    fetch_concurrently(get_set_catalog, [s for s in set_codes if s not in _SET_CATALOG_CACHE])
 
-        arena_prints = get_all_arena_printings(card_data, arena_sets, ALLOWED_RARITIES)
-        if not arena_prints:
-            continue
 
-        craft_rar = min((r for (_, r) in arena_prints), key=lambda r: rarity_rank[r])
-        craft_rarity_by_card[name] = craft_rar
-        printings_by_card[name] = arena_prints
-        missing_by_card[name] = qty_missing
+def pool_sizes_complete(set_code):
+    """True when the set's pool sizes came from the offline catalog or a set catalog that fully loaded."""
+    if _CATALOG is not None and set_code in _CATALOG["pools"]:
+        return True
+    catalog = _SET_CATALOG_CACHE.get(set_code)
+    return catalog is not None and catalog["complete"]
 
-        for set_code, rar in arena_prints:
-            need_names_by_set[set_code][rar].add(name)
 
-    return missing_by_card, printings_by_card, craft_rarity_by_card, need_names_by_set
+def forget_pool_sizes(set_code):
+    """Drop the in-memory pool sizes / set catalog of a set, so the next lookup asks Scryfall again."""
+    for rarity in list(ALLOWED_RARITIES) + ["rare", "mythic"]:
+        _POOL_CACHE.pop((set_code, rarity), None)
+    _SET_CATALOG_CACHE.pop(set_code, None)
 
 
-def compute_pool_sizes(need_names_by_set):
-    pool_sizes = defaultdict(lambda: {"rare": 0, "mythic": 0})
-    for set_code, by_rarity in need_names_by_set.items():
-        for rar in ("rare", "mythic"):
-            pool_sizes[set_code][rar] = get_pool_size_for_set(set_code, rar)
-    return pool_sizes
+def printings_from_set_catalogs(card_name, arena_sets, allowed_rarities):
+    """
+    Arena printings of a card answered from the per-set catalogs, newest set first.
+    Only possible once every Arena set's catalog is fully loaded; returns None otherwise.
+    """
+    if any(s not in _SET_CATALOG_CACHE or not _SET_CATALOG_CACHE[s]["complete"] for s in arena_sets):
+        return None
+    out = []
+    ordered = sorted(arena_sets, key=lambda s: _SET_CATALOG_CACHE[s]["released_at"], reverse=True)
+    for set_code in ordered:
+        for rarity in _SET_CATALOG_CACHE[set_code]["printings"].get(card_name, ()):
+            if rarity in allowed_rarities:
+                out.append((set_code, rarity))
+    return out
 
 
 # =======================
-# Direct pack EV (per pack)
+# Offline card catalog (Scryfall bulk data)
 # =======================
-def direct_pack_hit_prob_for_set(set_code, need_names_by_set, pool_sizes):
-    Rn = len(need_names_by_set[set_code]["rare"])
-    Mn = len(need_names_by_set[set_code]["mythic"])
-    Rt = pool_sizes[set_code]["rare"] or 0
-    Mt = pool_sizes[set_code]["mythic"] or 0
-    rare_term   = P_RARE   * (Rn / Rt) if Rt > 0 else 0.0
-    mythic_term = P_MYTHIC * (Mn / Mt) if Mt > 0 else 0.0
-    return rare_term + mythic_term
+_CATALOG = None
 
 
-# =======================
-# Golden Pack EV (expected hit probability per Golden Pack)
-# =======================
-def golden_pack_expected_hit(need_names_by_set, pool_sizes, standard_sets, latest_set):
+def iter_bulk_cards(path, chunk_size=1 << 20):
     """
-    Expected # of hits (distinct-need successes) from ONE Golden Pack.
+    Stream card objects out of a Scryfall bulk file (a single huge JSON array)
+    without loading the whole file: only the current read chunk and the card
+    being decoded are held in memory. Plain and .gz files are accepted.
     """
-    n_std = len(standard_sets)
-    if n_std == 0:
-        return 0.0
+    opener = gzip.open if path.endswith(".gz") else open
+    decoder = json.JSONDecoder()
+    with opener(path, "rt", encoding="utf-8") as f:
+        buf, pos, eof = "", 0, False
+        while True:
+            # Skip separators between objects: whitespace, the opening '[' and commas
+            while pos < len(buf) and buf[pos] in " \t\r\n,[":
+                pos += 1
+            if pos < len(buf) and buf[pos] == "]":
+                return
+            if pos < len(buf):
+                try:
+                    obj, end = decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                else:
+                    yield obj
+                    pos = end
+                    continue
+            if eof:
+                return
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buf, pos = buf[pos:] + chunk, 0
 
-    # Expected slots per set
-    slots_per_set = {}
-    for s in standard_sets:
-        base = GOLDEN_PACK_SLOTS_ANY_STANDARD / n_std  # share of the 4 "any Standard" slots
-        if s == latest_set:
-            base += GOLDEN_PACK_SLOTS_LATEST_SET       # +2 dedicated to latest set
-        slots_per_set[s] = base
 
-    # Expected mythic/rare slots per set
-    gp_ev = 0.0
-    for s, slots in slots_per_set.items():
-        mythic_slots = slots * GOLDEN_MYTHIC_RATE_PER_SLOT
-        rare_slots   = slots - mythic_slots
-        Rn = len(need_names_by_set.get(s, {}).get("rare", set()))
-        Mn = len(need_names_by_set.get(s, {}).get("mythic", set()))
-        Rt = pool_sizes.get(s, {}).get("rare", 0) or 0
-        Mt = pool_sizes.get(s, {}).get("mythic", 0) or 0
+def build_catalog_from_bulk(bulk_path):
+    """
+    Build the offline catalog from a bulk file:
+      - printings[name] = [(set_code, rarity), ...] Arena booster printings, newest first
+      - aliases[face_name] = full card name (split/adventure/MDFC faces)
+      - pools[set_code][rarity] = # of Arena-openable booster cards (same count as get_pool_size_for_set)
+      - arena_ids[arena_id] = card name (Arena grpIds, as found in Player.log)
+    "all_cards" repeats every printing per language, so printings are deduplicated on (set, collector number).
+    """
+    prints = defaultdict(list)
+    aliases = {}
+    arena_ids = {}
+    pools = defaultdict(lambda: defaultdict(int))
+    seen = set()
 
-        if Mt > 0 and Mn > 0 and mythic_slots > 0:
-            gp_ev += mythic_slots * (Mn / Mt)
-        if Rt > 0 and Rn > 0 and rare_slots > 0:
-            gp_ev += rare_slots * (Rn / Rt)
+    for card in iter_bulk_cards(bulk_path):
+        name = card.get("name")
+        if not name:
+            continue
+        prints.setdefault(name, [])
+        for face in card.get("card_faces", []) or []:
+            face_name = face.get("name")
+            if face_name and face_name != name:
+                aliases.setdefault(face_name, name)
+        if card.get("arena_id"):
+            arena_ids[card["arena_id"]] = name
 
-    return gp_ev
+        key = (card.get("set"), card.get("collector_number"))
+        if key in seen:
+            continue
+        seen.add(key)
+        if "arena" not in card.get("games", []) or not card.get("booster", False):
+            continue
+        set_code, rarity = card.get("set"), card.get("rarity")
+        pools[set_code][rarity] += 1
+        prints[name].append((card.get("released_at", ""), set_code, rarity))
 
+    printings = {}
+    for name, rows in prints.items():
+        # Same order as prints_search_uri (newest release first), deduplicated
+        rows.sort(key=lambda r: r[0], reverse=True)
+        printings[name] = list(dict.fromkeys((s, r) for _, s, r in rows))
 
-def per_pack_golden_bonus(need_names_by_set, pool_sizes):
+    return {
+        "source": os.path.abspath(bulk_path),
+        "built_at": time.time(),
+        "printings": printings,
+        "aliases": aliases,
+        "arena_ids": arena_ids,
+        "pools": {s: dict(by_rarity) for s, by_rarity in pools.items()},
+    }
+
+
+def save_catalog(catalog, path=CATALOG_PATH):
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump(catalog, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+
+
+def load_catalog(path=CATALOG_PATH, bulk_path=BULK_DATA_PATH):
     """
-    EV added to ONE Standard-legal pack from the Golden Pack progress (0.1 GP per pack).
-    This is identical across Standard sets (composition of GP is independent of which Standard pack you buy),
-    but differs vs. non-Standard packs (which don't progress GP).
+    Load the offline catalog into memory, (re)building it first when the bulk
+    file is newer than the saved catalog. Returns None when neither exists.
     """
-    std_sets_present = [s for s in STANDARD_OR_ALCHEMY_LEGAL_SETS if s in need_names_by_set]
-    if not std_sets_present:
-        return 0.0
-    gp_ev_one = golden_pack_expected_hit(
-        need_names_by_set, pool_sizes, std_sets_present, LATEST_STANDARD_SET
-    )
-    return GOLDEN_PACKS_PER_STD_PACK * gp_ev_one
+    global _CATALOG
+    have_catalog = bool(path) and os.path.exists(path)
+    have_bulk = bool(bulk_path) and os.path.exists(bulk_path)
 
+    if have_bulk and (not have_catalog or os.path.getmtime(bulk_path) > os.path.getmtime(path)):
+        print(f"📚 Building offline card catalog from {bulk_path}...")
+        catalog = build_catalog_from_bulk(bulk_path)
+        save_catalog(catalog, path)
+    elif have_catalog:
+        with open(path, "rb") as f:
+            catalog = pickle.load(f)
+    else:
+        return None
 
-# =======================
-# Wildcard EV per pack
-# =======================
-def wildcard_ev_per_pack(is_standard_pack: bool):
-    if not INCLUDE_WILDCARD_EV:
-        return 0.0
-    ev = wildcard_value_from_n_packs(1.0)  # normal pack contributes
-    if is_standard_pack and WILDCARDS_FROM_GOLDEN_PACK:
-        ev += GOLDEN_PACKS_PER_STD_PACK * wildcard_value_from_n_packs(1.0)  # share of a GP "pack"
-    return ev
+    print(f"📚 Offline card catalog loaded: {len(catalog['printings'])} cards, {len(catalog['pools'])} sets")
+    _CATALOG = catalog
+    return catalog
 
 
-# =======================
+def catalog_card_data(card_name):
+    """
+    Card data answered from the offline catalog, or None when there is no
+    catalog or it does not know the name (e.g. cards newer than the bulk file).
+    """
+    if _CATALOG is None:
+        return None
+    name = card_name if card_name in _CATALOG["printings"] else _CATALOG["aliases"].get(card_name)
+    if name is None:
+        return None
+    return {"name": name, "arena_printings": _CATALOG["printings"][name]}
+
+
+def download_bulk_data(dest=BULK_DATA_PATH, kind="default_cards"):
+    """
+    Download a Scryfall bulk file (default_cards ~ 500MB, all_cards ~ 2GB) streaming to disk.
+    """
+    meta = scryfall_get(f"{SCRYFALL_API}/bulk-data/{kind}")
+    if not meta or not meta.get("download_uri"):
+        return None
+    print(f"⬇️  Downloading Scryfall {kind} bulk data to {dest}...")
+    with get_session().get(meta["download_uri"], stream=True, timeout=60) as r:
+        r.raise_for_status()
+        tmp = dest + ".part"
+        with open(tmp, "wb") as f:
+            for chunk in r.iter_content(chunk_size=1 << 20):
+                f.write(chunk)
+    os.replace(tmp, dest)
+    return dest
+
+
+# =======================
+# Card name index (normalized keys, face names, fuzzy matching)
+# =======================
+# Card names learned from Scryfall answers are kept here (in INPUT_CACHE_DIR), so
+# misspelled names can be corrected locally on later runs
+NAME_INDEX_FILE = "card_names.json"
+NAME_FUZZY_MIN_SCORE = 0.85   # similarity (0-1) a typo needs to be auto-corrected
+NAME_FUZZY_MARGIN = 0.03      # ... and its lead over the next best name
+
+_NAME_INDEX = None
+_NAME_INDEX_LOCK = threading.Lock()
+_NAME_CORRECTIONS = {}        # name as written -> (card name, reason)
+
+_NAME_PUNCTUATION = str.maketrans({"‘": "'", "’": "'", "‛": "'", "ʼ": "'", "`": "'",
+                                   "“": '"', "”": '"', "–": "-", "—": "-"})
+_NAME_SEPARATOR = re.compile(r"\s*/{1,2}\s*")
+
+
+def normalize_name(name):
+    """Lookup key for a card name: case, accents, curly quotes, spacing and split-card '/' ignored."""
+    import unicodedata
+    text = unicodedata.normalize("NFKD", str(name)).translate(_NAME_PUNCTUATION)
+    if not text.isascii():
+        text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    if "/" in text:
+        text = _NAME_SEPARATOR.sub(" // ", text)
+    return " ".join(text.casefold().split())
+
+
+def scryfall_name(name):
+    """A name spelled the way Scryfall matches it: straight quotes, ' // ' between faces, single spaces."""
+    text = str(name).translate(_NAME_PUNCTUATION)
+    if "/" in text:
+        text = _NAME_SEPARATOR.sub(" // ", text)
+    return " ".join(text.split())
+
+
+def _trigrams(key):
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class CardNameIndex:
+    """
+    Card names known locally, with their lookup tables:
+      - keys[normalize_name(name)] = name
+      - faces[normalize_name(face)] = name of the whole card (split, adventure, MDFC faces)
+      - grams[trigram] = keys containing it, built on the first fuzzy lookup
+    `complete` is True when the offline catalog was loaded, i.e. every card is in the index.
+    """
+
+    def __init__(self):
+        self.names = {}           # name -> face names
+        self.keys = {}
+        self.faces = {}
+        self.complete = False
+        self.dirty = False
+        self._grams = None
+        self._lock = threading.Lock()
+
+    def add(self, name, face_names=()):
+        faces = [f for f in face_names if f and f != name]
+        if not name or (name in self.names and set(faces) <= set(self.names[name])):
+            return
+        self.names[name] = sorted(set(self.names.get(name, ())) | set(faces))
+        new_keys = [(normalize_name(name), name)]
+        self.keys.setdefault(new_keys[0][0], name)
+        for face in faces:
+            key = normalize_name(face)
+            self.faces.setdefault(key, name)
+            new_keys.append((key, name))
+        if self._grams is not None:
+            for key, _ in new_keys:
+                for gram in _trigrams(key):
+                    self._grams[gram].add(key)
+        self.dirty = True
+
+    def learn(self, cards):
+        """Add the names (and face names) of Scryfall card objects."""
+        with self._lock:
+            for card in cards:
+                self.add(card.get("name"), [f.get("name") for f in card.get("card_faces", []) or []])
+
+    def _resolve_key(self, key):
+        return self.keys.get(key) or self.faces.get(key)
+
+    def lookup(self, name, fuzzy=True):
+        """
+        (card name, reason) for a name as written, reason being None for an exact
+        name; (None, None) when nothing in the index matches.
+        """
+        text = str(name).strip()
+        # Alchemy rebalanced cards ("A-Name") are opened as the original card
+        if text[:2] in ("A-", "a-") and len(text) > 2:
+            base, _ = self.lookup(text[2:], fuzzy=False)
+            if base:
+                return base, "Alchemy rebalance"
+        if text in self.names:
+            return text, None
+        key = normalize_name(text)
+        if key in self.keys:
+            return self.keys[key], "spelling"
+        if key in self.faces:
+            return self.faces[key], "card face"
+        if " // " in key:
+            # One half of a split card written with a different other half
+            front = self._resolve_key(key.split(" // ")[0])
+            if front:
+                return front, "card face"
+        if fuzzy:
+            match = self.fuzzy(key)
+            if match:
+                return match, "typo"
+        return None, None
+
+    def fuzzy(self, key):
+        """Closest known name to `key`, when it is close enough and clearly ahead of the rest."""
+        import difflib
+        shared = defaultdict(int)
+        with self._lock:
+            if self._grams is None:
+                self._grams = defaultdict(set)
+                for k in list(self.keys) + list(self.faces):
+                    for gram in _trigrams(k):
+                        self._grams[gram].add(k)
+            for gram in _trigrams(key):
+                for k in self._grams.get(gram, ()):
+                    shared[k] += 1
+        scored = sorted(((difflib.SequenceMatcher(None, key, k).ratio(), k)
+                         for k in heapq.nlargest(20, shared, key=shared.get)), reverse=True)
+        if not scored or scored[0][0] < NAME_FUZZY_MIN_SCORE:
+            return None
+        best = self._resolve_key(scored[0][1])
+        runner_up = next((s for s, k in scored[1:] if self._resolve_key(k) != best), 0.0)
+        if scored[0][0] - runner_up < NAME_FUZZY_MARGIN:
+            return None
+        return best
+
+
+def _name_index_path():
+    return os.path.join(INPUT_CACHE_DIR, NAME_INDEX_FILE) if INPUT_CACHE_DIR else None
+
+
+def get_name_index():
+    """The shared CardNameIndex: offline catalog names plus the names learned on earlier runs."""
+    global _NAME_INDEX
+    with _NAME_INDEX_LOCK:
+        if _NAME_INDEX is not None and (_CATALOG is None or _NAME_INDEX.complete):
+            return _NAME_INDEX
+        index = _NAME_INDEX or CardNameIndex()
+        if _NAME_INDEX is None:
+            path = _name_index_path()
+            if path and os.path.exists(path):
+                try:
+                    with open(path, encoding="utf-8") as f:
+                        learned = json.load(f)
+                except (OSError, ValueError):
+                    learned = {}
+                for name, faces in learned.get("cards", {}).items():
+                    index.add(name, faces)
+            index.dirty = False
+        if _CATALOG is not None:
+            faces_by_name = defaultdict(list)
+            for face, name in _CATALOG["aliases"].items():
+                faces_by_name[name].append(face)
+            with index._lock:
+                dirty = index.dirty
+                for name in _CATALOG["printings"]:
+                    index.add(name, faces_by_name.get(name, ()))
+                index.complete, index.dirty = True, dirty
+        _NAME_INDEX = index
+        return index
+
+
+def save_name_index():
+    """Write the learned names to INPUT_CACHE_DIR when the index gained any."""
+    path = _name_index_path()
+    index = _NAME_INDEX
+    if not path or index is None or not index.dirty:
+        return
+    with index._lock:
+        # Cards of the offline catalog are indexed from it anyway
+        known = _CATALOG["printings"] if _CATALOG is not None else {}
+        learned = {name: faces for name, faces in index.names.items() if name not in known}
+        data = json.dumps({"cards": learned}, ensure_ascii=False, sort_keys=True)
+        index.dirty = False
+    os.makedirs(INPUT_CACHE_DIR, exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+# =======================
+# Data loading
+# =======================
+def _read_xlsx_sheets(path):
+    """{sheet name: [(name, qty), ...]} for every sheet with Name/Qty columns, streamed read-only."""
+    import openpyxl
+
+    sheets = {}
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        for ws in wb.worksheets:
+            rows = ws.iter_rows(values_only=True)
+            header = [str(h).strip().lower() if h is not None else "" for h in next(rows, ())]
+            if "name" not in header or "qty" not in header:
+                continue
+            ni, qi = header.index("name"), header.index("qty")
+            out = []
+            for row in rows:
+                name = row[ni] if ni < len(row) else None
+                if name is None or not str(name).strip():
+                    continue
+                qty = row[qi] if qi < len(row) else None
+                out.append((str(name).strip(), int(float(qty)) if qty not in (None, "") else 0))
+            sheets[ws.title] = out
+    finally:
+        wb.close()
+    return sheets
+
+
+def _read_csv_rows(path):
+    """Name,Qty rows of a CSV file (header required)."""
+    import csv
+
+    out = []
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        for row in csv.DictReader(f):
+            row = {str(k).strip().lower(): v for k, v in row.items() if k is not None}
+            name = (row.get("name") or "").strip()
+            if name:
+                qty = (row.get("qty") or "").strip()
+                out.append((name, int(float(qty)) if qty else 0))
+    return out
+
+
+_MTGA_LINE = re.compile(r"^(\d+)x?\s+(.+?)(?:\s+\([A-Za-z0-9_]+\)(?:\s+\S+)?)?\s*$")
+
+def parse_mtga_text(lines):
+    """
+    MTG Arena text export ("4 Arclight Phoenix (GRN) 91"), split into Decklist and
+    Sideboard. Section headers (Deck / Sideboard / Companion / Commander) are
+    optional; without them a blank line after the main deck starts the sideboard.
+    """
+    sections = {"Decklist": [], "Sideboard": []}
+    current = "Decklist"
+    for line in lines:
+        line = line.strip()
+        header = line.lower()
+        if not line:
+            if sections[current] and current == "Decklist":
+                current = "Sideboard"
+            continue
+        if header in ("deck", "commander", "companion"):
+            current = "Decklist"
+            continue
+        if header == "sideboard":
+            current = "Sideboard"
+            continue
+        m = _MTGA_LINE.match(line)
+        if m:
+            sections[current].append((m.group(2).strip(), int(m.group(1))))
+    return sections
+
+
+def _read_mtga_text(path):
+    with open(path, encoding="utf-8-sig") as f:
+        return parse_mtga_text(f)
+
+
+def parse_input_file(path):
+    """Parse a workbook, CSV or MTGA text file into {sheet name: [(name, qty), ...]}."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".xlsx", ".xlsm"):
+        return _read_xlsx_sheets(path)
+    if ext == ".csv":
+        return {"Decklist": _read_csv_rows(path), "Have": _read_csv_rows(path)}
+    return _read_mtga_text(path)
+
+
+def load_input_file(path):
+    """
+    parse_input_file with an on-disk cache keyed on the file's mtime/size and
+    SHA-256: an unchanged file is loaded straight from the cache (no parsing,
+    no hashing), a touched-but-identical file only costs a hash.
+    """
+    if not INPUT_CACHE_DIR:
+        return parse_input_file(path)
+    st = os.stat(path)
+    key = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()
+    cache_path = os.path.join(INPUT_CACHE_DIR, f"input-{key}.pkl")
+
+    cached = None
+    if os.path.exists(cache_path):
+        try:
+            with open(cache_path, "rb") as f:
+                cached = pickle.load(f)
+        except Exception:
+            cached = None
+    if cached and cached["mtime_ns"] == st.st_mtime_ns and cached["size"] == st.st_size:
+        return cached["data"]
+
+    with open(path, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    if cached and cached["sha256"] == digest:
+        data = cached["data"]
+    else:
+        data = parse_input_file(path)
+
+    os.makedirs(INPUT_CACHE_DIR, exist_ok=True)
+    tmp = cache_path + ".tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump({"mtime_ns": st.st_mtime_ns, "size": st.st_size, "sha256": digest, "data": data},
+                    f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, cache_path)
+    return data
+
+
+def load_decklist(path=None):
+    """
+    Decklist rows [(name, qty), ...] of a workbook / CSV / MTGA text file
+    (plus its Sideboard when SEARCH_SIDEBOARD is on).
+    """
+    path = path or DECKLIST_PATH or EXCEL_PATH
+    sheets = load_input_file(path)
+    rows = list(sheets.get("Decklist", []))
+
+    if SEARCH_SIDEBOARD:
+        if "Sideboard" in sheets:
+            rows += sheets["Sideboard"]
+        else:
+            print("⚠️ Sideboard tab not found or error reading it. Skipping sideboard.")
+    return rows
+
+
+def load_owned(path=None):
+    path = path or COLLECTION_PATH or EXCEL_PATH
+    if path.lower().endswith(".log"):
+        owned, _, unknown = import_player_log(path)
+        if unknown:
+            print(f"⚠️ {len(unknown)} Arena card ids in {os.path.basename(path)} could not be named; skipping them.")
+        return owned
+    sheets = load_input_file(path)
+    if "Have" in sheets:
+        rows = sheets["Have"]
+    elif path.lower().endswith((".xlsx", ".xlsm")):
+        print("⚠️ Have tab not found. Assuming an empty collection.")
+        rows = []
+    else:
+        # Plain collection export: every listed card counts as owned
+        rows = sheets.get("Decklist", []) + sheets.get("Sideboard", [])
+    return dict(rows)
+
+
+def load_data():
+    return load_decklist(), load_owned()
+
+
+# =======================
+# Arena Player.log import
+# =======================
+# Arena logs the collection and inventory responses to Player.log when
+# "Detailed Logs (Plugin Support)" is enabled in Options > Account.
+PLAYER_LOG_PATH = None                # None = default install location
+PLAYER_LOG_COLLECTION_MARKERS = ("GetPlayerCards",)
+PLAYER_LOG_INVENTORY_MARKERS = ("GetPlayerInventory", "InventoryInfo")
+PLAYER_LOG_HEAD_BYTES = 1024          # fingerprint of the log start, to notice a new log at the same path
+PLAYER_LOG_MAX_PAYLOAD_BYTES = 64 * 1024 * 1024
+
+_LOG_HEADER = re.compile(r"^\[[A-Za-z][^\]]*\]")   # e.g. [UnityCrossThreadLogger]
+_WILDCARD_KEYS = {"rare": ("wcRare", "WildCardRares"), "mythic": ("wcMythic", "WildCardMythics")}
+
+
+def default_player_log_path():
+    """Player.log of a default MTG Arena install (Windows / macOS)."""
+    if os.name == "nt":
+        base = os.environ.get("USERPROFILE", os.path.expanduser("~"))
+        return os.path.join(base, "AppData", "LocalLow", "Wizards Of The Coast", "MTGA", "Player.log")
+    return os.path.expanduser("~/Library/Logs/Wizards Of The Coast/MTGA/Player.log")
+
+
+def _log_payload(obj):
+    """Unwrap {"payload": ...} envelopes (the payload is sometimes itself a JSON string)."""
+    while isinstance(obj, dict) and "payload" in obj:
+        obj = obj["payload"]
+        if isinstance(obj, str):
+            try:
+                obj = json.loads(obj)
+            except ValueError:
+                return None
+    return obj
+
+
+def _log_collection(obj):
+    """{grpId: qty} from a GetPlayerCards response, or None."""
+    obj = _log_payload(obj)
+    if isinstance(obj, dict) and obj and all(str(k).isdigit() for k in obj):
+        return {str(k): int(v) for k, v in obj.items()}
+    return None
+
+
+def _log_wildcards(obj, depth=0):
+    """{"rare": n, "mythic": n} from an inventory response (searched a few levels deep), or None."""
+    obj = _log_payload(obj)
+    if not isinstance(obj, dict) or depth > 4:
+        return None
+    found = {}
+    for rarity, keys in _WILDCARD_KEYS.items():
+        for k in keys:
+            if k in obj:
+                found[rarity] = int(obj[k])
+                break
+    if found:
+        return found
+    for v in obj.values():
+        found = _log_wildcards(v, depth + 1)
+        if found:
+            return found
+    return None
+
+
+def _log_marker(line):
+    if any(m in line for m in PLAYER_LOG_COLLECTION_MARKERS):
+        return "collection"
+    if any(m in line for m in PLAYER_LOG_INVENTORY_MARKERS):
+        return "inventory"
+    return None
+
+
+def scan_player_log(f, offset, state):
+    """
+    Read the complete lines of the binary file `f` from `offset`, keeping the latest
+    collection / wildcard snapshots in `state`. A marker's JSON may sit on the same
+    line or on the following (pretty-printed) lines. Returns the offset to resume
+    from: the end of the last line consumed, or the start of a marker whose payload
+    is still being written.
+    """
+    decoder = json.JSONDecoder()
+    f.seek(offset)
+    pos = resume = offset
+    pending = None   # [kind, start offset, payload lines, payload bytes]
+
+    def finish(kind, text):
+        try:
+            obj, _ = decoder.raw_decode(text.lstrip())
+        except ValueError:
+            return False
+        if kind == "collection":
+            collection = _log_collection(obj)
+            if collection is not None:
+                state["collection"] = collection
+        else:
+            wildcards = _log_wildcards(obj)
+            if wildcards:
+                state["wildcards"].update(wildcards)
+        return True
+
+    for raw in f:
+        if not raw.endswith(b"\n"):
+            break  # Arena is still writing this line
+        start, pos = pos, pos + len(raw)
+        line = raw.decode("utf-8", "replace")
+
+        if pending is not None and pending[2] and not _LOG_HEADER.match(line):
+            pending[2].append(line)
+            pending[3] += len(raw)
+            if (line.lstrip()[:1] in "}]" and finish(pending[0], "".join(pending[2]))) \
+                    or pending[3] > PLAYER_LOG_MAX_PAYLOAD_BYTES:
+                pending, resume = None, pos
+            continue
+
+        kind = _log_marker(line)
+        if kind:
+            pending = [kind, start, [], 0]
+            brace = line.find("{")
+            if brace < 0:
+                continue
+            line = line[brace:]
+        elif pending is not None and line.lstrip().startswith("{"):
+            kind = pending[0]
+        else:
+            pending, resume = None, pos
+            continue
+
+        if finish(kind, line):
+            pending, resume = None, pos
+        else:
+            pending[2].append(line)
+            pending[3] += len(raw)
+
+    return pending[1] if pending is not None else resume
+
+
+def arena_id_names(grp_ids, known=None):
+    """
+    {grpId: card name}, answered from `known`, then the offline catalog, then
+    Scryfall's /cards/arena/<id> endpoint. Ids nobody recognises are left out
+    (and asked again next time, in case the lookup failed for network reasons).
+    """
+    names = dict(known or {})
+    catalog_ids = _CATALOG.get("arena_ids", {}) if _CATALOG else {}
+    remote = []
+    for g in grp_ids:
+        if g in names:
+            continue
+        name = catalog_ids.get(int(g))
+        if name:
+            names[g] = name
+        else:
+            remote.append(g)
+
+    if remote:
+        print(f"🔍 Looking up {len(remote)} Arena card ids on Scryfall "
+              f"(run `python best_pack.py ingest --download` to resolve them offline)...")
+        results = fetch_concurrently(lambda g: scryfall_get(f"{SCRYFALL_API}/cards/arena/{g}"), remote)
+        for g, data in zip(remote, results):
+            if data and data.get("name"):
+                names[g] = data["name"]
+    return names
+
+
+def import_player_log(path=None):
+    """
+    Owned quantities {card name: qty} from Arena's Player.log (the same mapping the
+    Have sheet gives), plus the wildcard counts and any unrecognised grpIds.
+
+    The log can grow to hundreds of MB, so only the part appended since the last
+    run is read: the byte offset, inode and a fingerprint of the first bytes are
+    checkpointed in INPUT_CACHE_DIR together with the latest collection snapshot.
+    A log that was replaced or truncated is read again from the start.
+    """
+    path = path or PLAYER_LOG_PATH or default_player_log_path()
+    st = os.stat(path)
+    ckpt_path = None
+    state = None
+    if INPUT_CACHE_DIR:
+        key = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()
+        ckpt_path = os.path.join(INPUT_CACHE_DIR, f"playerlog-{key}.json")
+        if os.path.exists(ckpt_path):
+            try:
+                with open(ckpt_path, encoding="utf-8") as f:
+                    state = json.load(f)
+            except (OSError, ValueError):
+                state = None
+
+    with open(path, "rb") as f:
+        head = f.read(PLAYER_LOG_HEAD_BYTES)
+        if (state is None or state["inode"] != st.st_ino or state["device"] != st.st_dev
+                or st.st_size < state["offset"]
+                or hashlib.sha1(head[:state["head_len"]]).hexdigest() != state["head"]):
+            # First run, or a new log: grpId names stay valid, everything else restarts
+            names = state["names"] if state else {}
+            state = {"offset": 0, "collection": {}, "wildcards": {}, "names": names}
+        state["offset"] = scan_player_log(f, state["offset"], state)
+
+    state["names"] = arena_id_names(state["collection"], state["names"])
+    state.update(inode=st.st_ino, device=st.st_dev,
+                 head_len=len(head), head=hashlib.sha1(head).hexdigest())
+    if ckpt_path:
+        os.makedirs(INPUT_CACHE_DIR, exist_ok=True)
+        tmp = ckpt_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp, ckpt_path)
+
+    owned = defaultdict(int)
+    unknown = []
+    for g, qty in state["collection"].items():
+        name = state["names"].get(g)
+        if name is None:
+            unknown.append(int(g))
+            continue
+        owned[name] += qty
+    for name in list(owned):
+        # Decklists name split / adventure / MDFC cards by their front face
+        if " // " in name:
+            owned.setdefault(name.split(" // ")[0], owned[name])
+    return dict(owned), dict(state["wildcards"]), sorted(unknown)
+
+
+# =======================
+# Compact need tracking (interned card ids, array vectors, bitsets)
+# =======================
+# The need structures keep their dict/set interfaces, but cards are interned to
+# ids 0..n-1 (in row order): per-card values live in arrays indexed by id and
+# every (set, rarity) need set is one int bitset. Copying a need table for a
+# what-if copies a few ints per set, and a need count is a popcount.
+RARITY_CODES = ("rare", "mythic")
+
+try:
+    _popcount = int.bit_count
+except AttributeError:  # Python < 3.10
+    def _popcount(bits):
+        return bin(bits).count("1")
+
+
+class CardIndex:
+    """Interned card names: ids 0..n-1 in first-seen order."""
+    __slots__ = ("names", "ids")
+
+    def __init__(self, names=()):
+        self.names = []
+        self.ids = {}
+        for name in names:
+            self.intern(name)
+
+    def intern(self, name):
+        card_id = self.ids.get(name)
+        if card_id is None:
+            card_id = self.ids[name] = len(self.names)
+            self.names.append(name)
+        return card_id
+
+    def __len__(self):
+        return len(self.names)
+
+    def names_of(self, bits):
+        """Names whose bits are set, in id order."""
+        names = self.names
+        while bits:
+            low = bits & -bits
+            yield names[low.bit_length() - 1]
+            bits ^= low
+
+
+class CardVector(MutableMapping):
+    """
+    {name: value} over a CardIndex, backed by a list or array indexed by card id.
+    Keys are fixed (every interned card); copy() is a buffer copy.
+    """
+    __slots__ = ("index", "data")
+
+    def __init__(self, index, data):
+        self.index = index
+        self.data = data
+
+    def __getitem__(self, name):
+        return self.data[self.index.ids[name]]
+
+    def __setitem__(self, name, value):
+        self.data[self.index.ids[name]] = value
+
+    def __delitem__(self, name):
+        raise TypeError("cards can't be removed from a CardVector")
+
+    def __contains__(self, name):
+        return name in self.index.ids
+
+    def __iter__(self):
+        return iter(self.index.names)
+
+    def __len__(self):
+        return len(self.index.names)
+
+    def items(self):
+        return zip(self.index.names, self.data)
+
+    def values(self):
+        return iter(self.data)
+
+    def copy(self):
+        return type(self)(self.index, self.data[:])
+
+    def __repr__(self):
+        return f"{type(self).__name__}({dict(self.items())!r})"
+
+
+class CraftRarities(CardVector):
+    """{name: "rare" | "mythic"} stored as one byte per card."""
+    __slots__ = ()
+
+    def __getitem__(self, name):
+        return RARITY_CODES[self.data[self.index.ids[name]]]
+
+    def __setitem__(self, name, value):
+        self.data[self.index.ids[name]] = RARITY_CODES.index(value)
+
+    def items(self):
+        return ((n, RARITY_CODES[c]) for n, c in zip(self.index.names, self.data))
+
+    def values(self):
+        return (RARITY_CODES[c] for c in self.data)
+
+
+class NeedBits(MutableSet):
+    """Live set view of one (set, rarity) bitset of a NeedTable."""
+    __slots__ = ("table", "row", "col")
+
+    def __init__(self, table, row, col):
+        self.table, self.row, self.col = table, row, col
+
+    @property
+    def bits(self):
+        return self.table.bits[self.row][self.col]
+
+    def __len__(self):
+        return _popcount(self.bits)
+
+    def __contains__(self, name):
+        card_id = self.table.index.ids.get(name)
+        return card_id is not None and (self.bits >> card_id) & 1 == 1
+
+    def __iter__(self):
+        return self.table.index.names_of(self.bits)
+
+    def add(self, name):
+        self.table.bits[self.row][self.col] |= 1 << self.table.index.intern(name)
+
+    def discard(self, name):
+        card_id = self.table.index.ids.get(name)
+        if card_id is not None:
+            self.table.bits[self.row][self.col] &= ~(1 << card_id)
+
+    def __repr__(self):
+        return repr(set(self))
+
+
+class NeedTable(Mapping):
+    """
+    need_names_by_set as {set_code: {"rare": names, "mythic": names}} views over
+    [rare_bits, mythic_bits] per set. Like the defaultdict it replaces, indexing
+    an unknown set adds an empty entry (get() and `in` don't).
+    """
+    __slots__ = ("index", "bits", "_rows")
+
+    def __init__(self, index, bits=None):
+        self.index = index
+        self.bits = {} if bits is None else bits
+        self._rows = {}
+
+    def __reduce__(self):
+        return NeedTable, (self.index, self.bits)
+
+    def __getitem__(self, set_code):
+        row = self._rows.get(set_code)
+        if row is None:
+            if set_code not in self.bits:
+                self.bits[set_code] = [0, 0]
+            row = self._rows[set_code] = {r: NeedBits(self, set_code, c) for c, r in enumerate(RARITY_CODES)}
+        return row
+
+    def get(self, set_code, default=None):
+        return self[set_code] if set_code in self.bits else default
+
+    def __contains__(self, set_code):
+        return set_code in self.bits
+
+    def __iter__(self):
+        return iter(self.bits)
+
+    def __len__(self):
+        return len(self.bits)
+
+    def contains(self, set_code, rarity, name):
+        """`name in self[set_code][rarity]` without building the views."""
+        card_id = self.index.ids.get(name)
+        row = self.bits.get(set_code)
+        return card_id is not None and row is not None and (row[RARITY_CODES.index(rarity)] >> card_id) & 1 == 1
+
+    def counts(self, set_code):
+        """(rare, mythic) need counts of one set."""
+        return tuple(_popcount(b) for b in self.bits.get(set_code, (0, 0)))
+
+    def copy(self):
+        return NeedTable(self.index, {s: list(b) for s, b in self.bits.items()})
+
+    def __repr__(self):
+        return f"NeedTable({ {s: {r: set(v) for r, v in row.items()} for s, row in self.items()}!r})"
+
+
+def copy_needs(need_names_by_set):
+    """Independent copy of need_names_by_set for the planner to mutate."""
+    if isinstance(need_names_by_set, NeedTable):
+        return need_names_by_set.copy()
+    return {s: {"rare": set(v["rare"]), "mythic": set(v["mythic"])} for s, v in need_names_by_set.items()}
+
+
+# =======================
+# Need building (distinct names, by set/rarity)
+# =======================
+def missing_rows(deck_rows, owned_dict):
+    """(name, qty_missing) for every decklist row still missing copies, in sheet order."""
+    rows = []
+    for name, qty_deck in deck_rows:
+        name = str(name).strip()
+        qty_deck = int(qty_deck)
+        qty_owned = int(owned_dict.get(name, 0))
+        qty_missing = max(qty_deck - qty_owned, 0)
+        if qty_missing <= 0:
+            continue
+        rows.append((name, qty_missing))
+    return rows
+
+
+def resolve_arena_printings(card_names, arena_sets, incomplete=None):
+    """
+    Arena booster printings for every distinct name: {name: [(set_code, rarity), ...]}.
+    Names Scryfall doesn't know are reported and left out. Names whose printing
+    lookup failed part-way are added to the set `incomplete`, when given.
+    """
+    # Resolve every card in a handful of batched calls
+    with profile_phase("resolve_cards"):
+        card_data_by_name, not_found = resolve_cards(card_names)
+    if not_found:
+        print(f"❌ Cards not found: {', '.join(not_found)}")
+    corrected = [(n, _NAME_CORRECTIONS[n]) for n in card_data_by_name if n in _NAME_CORRECTIONS]
+    if corrected:
+        print("✏️  Auto-corrected card names:")
+        for name, (canonical, reason) in corrected:
+            print(f"   {name} → {canonical} ({reason})")
+
+    to_lookup = [name for name in dict.fromkeys(card_names) if name in card_data_by_name]
+
+    # Big decks: one catalog pass per Arena set replaces the per-card printing lookups
+    n_remote = sum(1 for n in to_lookup if "arena_printings" not in card_data_by_name[n])
+    if n_remote >= SET_CATALOG_PREFETCH_MIN_CARDS:
+        with profile_phase("set_catalogs"):
+            prefetch_set_catalogs(arena_sets)
+
+    def lookup_printings(n):
+        card_data = card_data_by_name[n]
+        if "arena_printings" not in card_data:
+            from_sets = printings_from_set_catalogs(card_data.get("name", n), arena_sets, ALLOWED_RARITIES)
+            if from_sets is not None:
+                return from_sets
+        errors = []
+        printings = get_all_arena_printings(card_data, arena_sets, ALLOWED_RARITIES, errors)
+        if errors and incomplete is not None:
+            incomplete.add(n)
+        return printings
+
+    # Remaining printing lookups (paginated per card) run concurrently through the fetch engine
+    with profile_phase("printings"):
+        looked_up = fetch_concurrently(lookup_printings, to_lookup)
+    save_name_index()
+    return dict(zip(to_lookup, looked_up))
+
+
+def needs_from_rows(rows, prints_by_name, verbose=True):
+    """
+    Build the need structures (see build_needs) from missing rows and resolved printings.
+    """
+    rarity_rank = {"rare": 1, "mythic": 2}
+    index = CardIndex()
+    need_names_by_set = NeedTable(index)
+    missing, craft_rarity, printings = array("l"), array("b"), []
+
+    for name, qty_missing in rows:
+        if name not in prints_by_name:
+            continue
+        if verbose:
+            print(f"🔍 Processing: {name}")
+
+        arena_prints = prints_by_name[name]
+        if not arena_prints:
+            continue
+
+        craft_rar = min((r for (_, r) in arena_prints), key=lambda r: rarity_rank[r])
+        card_id = index.intern(name)
+        if card_id == len(missing):
+            missing.append(qty_missing)
+            craft_rarity.append(RARITY_CODES.index(craft_rar))
+            printings.append(arena_prints)
+        else:  # the same card on another row: the last row wins, like a dict
+            missing[card_id] = qty_missing
+            craft_rarity[card_id] = RARITY_CODES.index(craft_rar)
+            printings[card_id] = arena_prints
+
+        bit = 1 << card_id
+        for set_code, rar in arena_prints:
+            need_names_by_set.bits.setdefault(set_code, [0, 0])[RARITY_CODES.index(rar)] |= bit
+
+    missing_by_card = CardVector(index, missing)
+    printings_by_card = CardVector(index, printings)
+    craft_rarity_by_card = CraftRarities(index, craft_rarity)
+    return missing_by_card, printings_by_card, craft_rarity_by_card, need_names_by_set
+
+
+def build_needs(deck_rows, owned_dict, arena_sets):
+    """
+    Build:
+      - missing_by_card[name] = remaining qty needed for the deck
+      - printings_by_card[name] = list of (set_code, arena_rarity)
+      - need_names_by_set[set_code][rarity] = set of distinct needed names for that set/rarity
+      - craft_rarity_by_card[name] = cheapest rarity available on Arena for crafting that name
+    Only cards with qty_missing > 0 and rarity in ALLOWED_RARITIES will be tracked.
+    """
+    rows = missing_rows(deck_rows, owned_dict)
+    prints_by_name = resolve_arena_printings([name for name, _ in rows], arena_sets)
+    return needs_from_rows(rows, prints_by_name)
+
+
+def compute_pool_sizes(need_names_by_set):
+    pool_sizes = defaultdict(lambda: {"rare": 0, "mythic": 0})
+    # One task per set: its rare and mythic counts come from the same set catalog pass
+    sets = list(need_names_by_set)
+    with profile_phase("pool_sizes"):
+        sizes = fetch_concurrently(
+            lambda s: {rar: get_pool_size_for_set(s, rar) for rar in ("rare", "mythic")}, sets
+        )
+    for set_code, by_rarity in zip(sets, sizes):
+        pool_sizes[set_code].update(by_rarity)
+    return pool_sizes
+
+
+# =======================
+# Direct pack EV (per pack)
+# =======================
+def direct_pack_hit_prob_for_set(set_code, need_names_by_set, pool_sizes):
+    Rn = len(need_names_by_set[set_code]["rare"])
+    Mn = len(need_names_by_set[set_code]["mythic"])
+    Rt = pool_sizes[set_code]["rare"] or 0
+    Mt = pool_sizes[set_code]["mythic"] or 0
+    rare_term   = P_RARE   * (Rn / Rt) if Rt > 0 else 0.0
+    mythic_term = P_MYTHIC * (Mn / Mt) if Mt > 0 else 0.0
+    return rare_term + mythic_term
+
+
+# =======================
+# Golden Pack EV (expected hit probability per Golden Pack)
+# =======================
+def golden_pack_expected_hit(need_names_by_set, pool_sizes, standard_sets, latest_set):
+    """
+    Expected # of hits (distinct-need successes) from ONE Golden Pack.
+    """
+    n_std = len(standard_sets)
+    if n_std == 0:
+        return 0.0
+
+    # Expected slots per set
+    slots_per_set = {}
+    for s in standard_sets:
+        base = GOLDEN_PACK_SLOTS_ANY_STANDARD / n_std  # share of the 4 "any Standard" slots
+        if s == latest_set:
+            base += GOLDEN_PACK_SLOTS_LATEST_SET       # +2 dedicated to latest set
+        slots_per_set[s] = base
+
+    # Expected mythic/rare slots per set
+    gp_ev = 0.0
+    for s, slots in slots_per_set.items():
+        mythic_slots = slots * GOLDEN_MYTHIC_RATE_PER_SLOT
+        rare_slots   = slots - mythic_slots
+        Rn = len(need_names_by_set.get(s, {}).get("rare", set()))
+        Mn = len(need_names_by_set.get(s, {}).get("mythic", set()))
+        Rt = pool_sizes.get(s, {}).get("rare", 0) or 0
+        Mt = pool_sizes.get(s, {}).get("mythic", 0) or 0
+
+        if Mt > 0 and Mn > 0 and mythic_slots > 0:
+            gp_ev += mythic_slots * (Mn / Mt)
+        if Rt > 0 and Rn > 0 and rare_slots > 0:
+            gp_ev += rare_slots * (Rn / Rt)
+
+    return gp_ev
+
+
+def per_pack_golden_bonus(need_names_by_set, pool_sizes):
+    """
+    EV added to ONE Standard-legal pack from the Golden Pack progress (0.1 GP per pack).
+    This is identical across Standard sets (composition of GP is independent of which Standard pack you buy),
+    but differs vs. non-Standard packs (which don't progress GP).
+    """
+    std_sets_present = [s for s in STANDARD_OR_ALCHEMY_LEGAL_SETS if s in need_names_by_set]
+    if not std_sets_present:
+        return 0.0
+    gp_ev_one = golden_pack_expected_hit(
+        need_names_by_set, pool_sizes, std_sets_present, LATEST_STANDARD_SET
+    )
+    return GOLDEN_PACKS_PER_STD_PACK * gp_ev_one
+
+
+# =======================
+# Wildcard EV per pack
+# =======================
+def wildcard_ev_per_pack(is_standard_pack: bool):
+    if not INCLUDE_WILDCARD_EV:
+        return 0.0
+    ev = wildcard_value_from_n_packs(1.0)  # normal pack contributes
+    if is_standard_pack and WILDCARDS_FROM_GOLDEN_PACK:
+        ev += GOLDEN_PACKS_PER_STD_PACK * wildcard_value_from_n_packs(1.0)  # share of a GP "pack"
+    return ev
+
+
+# =======================
 # Scoring and sorting
 # =======================
+# Rank only the best RANK_TOP_K sets (0 = all): pool sizes are fetched only for the
+# sets that can make it (see rank_sets_top_k). Only used when no wildcards are crafted,
+# since the crafting plan weighs every set's pools.
+RANK_TOP_K = 0
+
+
 def total_ev_for_pack(set_code, need_names_by_set, pool_sizes):
     direct = direct_pack_hit_prob_for_set(set_code, need_names_by_set, pool_sizes)
 
@@ -361,24 +2122,305 @@ def total_ev_for_pack(set_code, need_names_by_set, pool_sizes):
 
 
 def rank_sets(need_names_by_set, pool_sizes, arena_sets):
-    scores = {}
-    for s in need_names_by_set:
-        if s not in arena_sets:
-            continue
-        scores[s] = total_ev_for_pack(s, need_names_by_set, pool_sizes)
+    engine = ScoringEngine(need_names_by_set, pool_sizes, arena_sets)
+    return engine.rank(engine.score(engine.need_counts(need_names_by_set))["total"])
+
+
+def _pool_sizes_are_free(set_code):
+    """True when the set's pool sizes can be answered without a Scryfall request."""
+    if all((set_code, r) in _POOL_CACHE for r in ("rare", "mythic")):
+        return True
+    if _CATALOG is not None and set_code in _CATALOG["pools"]:
+        return True
+    catalog = _SET_CATALOG_CACHE.get(set_code)
+    return catalog is not None and catalog["complete"]
+
+
+def pool_size_floors(pool_sizes):
+    """
+    Smallest non-empty rare / mythic pool among the sets whose pools are known
+    (`pool_sizes` and the offline catalog): lower bounds for the sets not fetched
+    yet. 1 when nothing is known, which leaves only the bound that a set holds at
+    least the cards needed from it.
+    """
+    known = list(pool_sizes.values())
+    if _CATALOG is not None:
+        known += _CATALOG["pools"].values()
+    return {r: min((p.get(r) or 0 for p in known if (p.get(r) or 0) > 0), default=1) for r in ("rare", "mythic")}
+
+
+def rank_sets_top_k(need_names_by_set, arena_sets, k, pool_sizes=None):
+    """
+    The first `k` entries of rank_sets() with every pool size known, fetching
+    pool sizes only for the sets that can make it:
+      - Standard sets share the golden pack term, so their pools are always fetched
+      - every other set's EV is bounded from above by its direct EV with the
+        smallest pools it could have plus its wildcard EV: never fewer cards than
+        it has needed names, nor than the smallest pool known so far
+        (pool_size_floors, lowered as more pools come in)
+      - those sets are fetched in order of their bound, a few at a time, until the
+        k-th best exact EV beats every bound left
+    `pool_sizes` are pool sizes already known (e.g. from the last run); sets the
+    offline catalog or the in-memory caches know are looked up for free.
+    Returns (ranking, pool sizes used, sets whose pools were never fetched).
+    """
+    pools = {s: v for s, v in (pool_sizes or {}).items() if s in need_names_by_set}
+
+    def fetch(sets):
+        sets = [s for s in sets if s not in pools]
+        if sets:
+            pools.update(compute_pool_sizes(dict.fromkeys(sets)))
+
+    fetch(s for s in need_names_by_set if s in STANDARD_OR_ALCHEMY_LEGAL_SETS or _pool_sizes_are_free(s))
+
+    def bound(s, floors):
+        Rn, Mn = len(need_names_by_set[s]["rare"]), len(need_names_by_set[s]["mythic"])
+        Rt, Mt = max(floors["rare"], Rn, 1), max(floors["mythic"], Mn, 1)
+        return P_RARE * (Rn / Rt) + P_MYTHIC * (Mn / Mt) + wildcard_ev_per_pack(False)
+
+    pending = [s for s in need_names_by_set if s not in pools and s in arena_sets]
+    while True:
+        floors = pool_size_floors(pools)
+        pending.sort(key=lambda s: bound(s, floors), reverse=True)
+        # Unfetched sets score with empty pools here, which touches no other set's EV
+        known = defaultdict(lambda: {"rare": 0, "mythic": 0}, pools)
+        ranked = [(s, ev) for s, ev in rank_sets(need_names_by_set, known, arena_sets) if s in pools]
+        if not pending:
+            break
+        kth = round(ranked[k - 1][1], 9) if len(ranked) >= k else float("-inf")
+        if round(bound(pending[0], floors), 9) < kth:
+            break
+        batch, pending = pending[:max(SCRYFALL_MAX_WORKERS, 1)], pending[max(SCRYFALL_MAX_WORKERS, 1):]
+        fetch(batch)
+    return ranked[:k], pools, pending
+
+
+# =======================
+# Vectorized scoring engine
+# =======================
+class ScoringEngine:
+    """
+    Array-backed version of total_ev_for_pack for every set at once.
+
+    Need counts and pool sizes live in (set, rarity) arrays (rarity 0 = rare,
+    1 = mythic). score() computes direct, golden and wildcard EV for all sets in
+    one pass, with the shared golden term computed once instead of once per
+    Standard set. It also accepts a stack of what-if need arrays of shape
+    (..., n_sets, 2) and scores them all together. Results are bit-for-bit the
+    same as the scalar functions (same operations in the same order).
+    """
+
+    def __init__(self, need_names_by_set, pool_sizes, arena_sets):
+        import numpy as np
+
+        # Every set with a need entry (they all feed the golden pack); only Arena booster sets are ranked
+        self.sets = list(need_names_by_set)
+        self.index = {s: i for i, s in enumerate(self.sets)}
+        self.rankable = np.array([s in arena_sets for s in self.sets], dtype=bool)
+        self.pools = np.array(
+            [[pool_sizes.get(s, {}).get(r, 0) or 0 for r in ("rare", "mythic")] for s in self.sets],
+            dtype=float,
+        ).reshape(len(self.sets), 2)
+        self.is_std = np.array([s in STANDARD_OR_ALCHEMY_LEGAL_SETS for s in self.sets], dtype=bool)
+        self.std_age = np.array([STD_ROTATION_PRIORITY.get(s, float("inf")) for s in self.sets], dtype=float)
+
+        # Golden pack slots per Standard set present, in golden_pack_expected_hit order
+        std_present = [s for s in STANDARD_OR_ALCHEMY_LEGAL_SETS if s in need_names_by_set]
+        self.golden = []
+        for s in std_present:
+            slots = GOLDEN_PACK_SLOTS_ANY_STANDARD / len(std_present)
+            if s == LATEST_STANDARD_SET:
+                slots += GOLDEN_PACK_SLOTS_LATEST_SET
+            mythic_slots = slots * GOLDEN_MYTHIC_RATE_PER_SLOT
+            self.golden.append((self.index[s], mythic_slots, slots - mythic_slots))
+
+    def need_counts(self, need_names_by_set):
+        """(n_sets, 2) array of distinct needed names per set and rarity."""
+        import numpy as np
+
+        counts = np.zeros((len(self.sets), 2))
+        if isinstance(need_names_by_set, NeedTable):
+            for s, i in self.index.items():
+                counts[i] = need_names_by_set.counts(s)
+            return counts
+        for s, i in self.index.items():
+            by_rarity = need_names_by_set.get(s, {})
+            counts[i, 0] = len(by_rarity.get("rare", ()))
+            counts[i, 1] = len(by_rarity.get("mythic", ()))
+        return counts
+
+    def golden_hits(self, needs):
+        """Expected hits from ONE Golden Pack for every scenario (golden_pack_expected_hit)."""
+        import numpy as np
+
+        gp_ev = np.zeros(needs.shape[:-2])
+        for i, mythic_slots, rare_slots in self.golden:
+            Rt, Mt = self.pools[i]
+            Rn, Mn = needs[..., i, 0], needs[..., i, 1]
+            if Mt > 0 and mythic_slots > 0:
+                gp_ev = gp_ev + np.where(Mn > 0, mythic_slots * (Mn / Mt), 0.0)
+            if Rt > 0 and rare_slots > 0:
+                gp_ev = gp_ev + np.where(Rn > 0, rare_slots * (Rn / Rt), 0.0)
+        return gp_ev
+
+    def score(self, needs, golden_packs_per_std_pack=None):
+        """EV components for every set (and every scenario when `needs` is stacked)."""
+        import numpy as np
 
-    # Prefer higher score, then oldest Standard-legal in ties
-    def tiebreak(item):
-        s, val = item
-        std_age = STD_ROTATION_PRIORITY.get(s, float("inf"))
-        return (-round(val, 9), -std_age)
+        rate = GOLDEN_PACKS_PER_STD_PACK if golden_packs_per_std_pack is None else golden_packs_per_std_pack
+        needs = np.asarray(needs, dtype=float)
+        Rt, Mt = self.pools[:, 0], self.pools[:, 1]
+        rare_term = np.where(Rt > 0, P_RARE * (needs[..., 0] / np.where(Rt > 0, Rt, 1.0)), 0.0)
+        mythic_term = np.where(Mt > 0, P_MYTHIC * (needs[..., 1] / np.where(Mt > 0, Mt, 1.0)), 0.0)
+        direct = rare_term + mythic_term
 
-    return sorted(scores.items(), key=tiebreak)
+        # Shared by every Standard set: computed once per scenario
+        golden = rate * self.golden_hits(needs) if self.golden else np.zeros(needs.shape[:-2])
+        golden_by_set = np.where(self.is_std, golden[..., None], 0.0)
+
+        if INCLUDE_WILDCARD_EV:
+            wc_pack = wildcard_value_from_n_packs(1.0)
+            wc_std = wc_pack + rate * wildcard_value_from_n_packs(1.0) if WILDCARDS_FROM_GOLDEN_PACK else wc_pack
+            wc = np.where(self.is_std, wc_std, wc_pack)
+        else:
+            wc = np.zeros(len(self.sets))
+
+        return {"direct": direct, "golden": golden, "golden_by_set": golden_by_set,
+                "wildcard": wc, "total": direct + golden_by_set + wc}
+
+    def rank(self, totals):
+        """Sets sorted like rank_sets: higher EV first, then oldest Standard set in ties."""
+        scores = [(s, float(v)) for s, v, ok in zip(self.sets, totals, self.rankable) if ok]
+        return sorted(scores, key=lambda item: (-round(item[1], 9), -self.std_age[self.index[item[0]]]))
+
+    def best(self, totals):
+        """
+        Top-ranked set of every scenario in a stacked `total` array, with the same
+        tie-breaking as rank(). Returns (set codes, EVs) arrays.
+        """
+        import numpy as np
+
+        totals = np.asarray(totals, dtype=float)
+        rounded = np.where(self.rankable, np.round(totals, 9), -np.inf)
+        cand = rounded == rounded.max(axis=-1, keepdims=True)
+        age = np.where(cand, self.std_age, -np.inf)
+        cand &= age == age.max(axis=-1, keepdims=True)
+        idx = cand.argmax(axis=-1)
+        codes = np.array(self.sets, dtype=object)[idx]
+        return codes, np.take_along_axis(totals, idx[..., None], axis=-1)[..., 0]
 
 
 # =======================
 # Wildcard planner (avoid killing targets in top sets)
 # =======================
+class CraftQueues:
+    """
+    Candidate queues of the wildcard planner. craft(rarity) crafts one copy of
+    the next card wildcard_plan would pick and updates `missing_by_card` and
+    `need_names_by_set` in place.
+
+    Each card has a single craft rarity and its keys only depend on its own
+    printings, so the rare and mythic pick sequences never affect each other;
+    the what-if sweep relies on that.
+    """
+
+    def __init__(self, missing_by_card, printings_by_card, craft_rarity_by_card, need_names_by_set, pool_sizes,
+                 top_k_protect=3):
+        self.missing_by_card = missing_by_card
+        self.printings_by_card = printings_by_card
+        self.need_names_by_set = need_names_by_set
+
+        base_scores_map = {s: direct_pack_hit_prob_for_set(s, need_names_by_set, pool_sizes)
+                           for s in need_names_by_set}
+        protected_sets = set([s for s, _ in
+                              sorted(base_scores_map.items(), key=lambda kv: kv[1], reverse=True)[:top_k_protect]])
+
+        rarity_prob = {"rare": P_RARE, "mythic": P_MYTHIC}
+        if isinstance(need_names_by_set, NeedTable):
+            is_needed = need_names_by_set.contains
+        else:
+            def is_needed(s, rar, card_name):
+                return card_name in need_names_by_set.get(s, {}).get(rar, set())
+        self.is_needed = is_needed
+
+        def ev_loss_if_eliminate(card_name):
+            loss = 0.0
+            for s, rar in printings_by_card[card_name]:
+                if is_needed(s, rar, card_name):
+                    denom = pool_sizes.get(s, {}).get(rar, 0)
+                    if denom > 0:
+                        loss += rarity_prob[rar] * (1.0 / denom)
+            return loss
+
+        def protected_affinity(card_name):
+            return sum(base_scores_map.get(s, 0.0) for (s, _) in printings_by_card[card_name] if s in protected_sets)
+
+        # Per-rarity priority queues replace re-sorting the candidate list on every craft.
+        # A card's keys only depend on its own printings (its EV loss and its share of
+        # protected sets), so they never change while planning: entries just go stale
+        # when the card's remaining need changes and are skipped lazily when popped.
+        # The insertion index breaks ties exactly like the stable sorts did.
+        #   safe[r]: crafts that don't eliminate (need > 1), key (affinity, loss)
+        #   last[r]: crafts that eliminate (need == 1), key (loss, affinity)
+        #   any[r]:  forced crafts ignoring protection, key sum of set scores
+        self.queues = {r: {"safe": [], "last": [], "any": []} for r in rarity_prob}
+        self.keys = {}
+        for idx, (n, miss) in enumerate(missing_by_card.items()):
+            rar = craft_rarity_by_card.get(n)
+            if miss <= 0 or rar not in self.queues:
+                continue
+            aff, loss = protected_affinity(n), ev_loss_if_eliminate(n)
+            self.keys[n] = (idx, aff, loss)
+            if miss > 1:
+                self.queues[rar]["safe"].append((aff, loss, idx, n))
+            else:
+                self.queues[rar]["last"].append((loss, aff, idx, n))
+            base = sum(base_scores_map.get(s, 0.0) for (s, _) in printings_by_card[n])
+            self.queues[rar]["any"].append((base, idx, n))
+        for by_kind in self.queues.values():
+            for heap in by_kind.values():
+                heapq.heapify(heap)
+
+        self.outstanding = sum(1 for miss in missing_by_card.values() if miss > 0)
+
+    def _peek(self, heap, is_valid):
+        while heap and not is_valid(self.missing_by_card[heap[0][-1]]):
+            heapq.heappop(heap)
+        return heap[0][-1] if heap else None
+
+    def craft(self, rarity, ignore_protection=False):
+        """Craft one copy of the next `rarity` candidate; returns its name (None when there is none)."""
+        if rarity not in self.queues:
+            return None
+
+        q = self.queues[rarity]
+        # Safe craft first; only eliminate if unavoidable; when forcing, lowest-EV sets first
+        chosen = self._peek(q["safe"], lambda miss: miss > 1)
+        if chosen is None and not ignore_protection:
+            chosen = self._peek(q["last"], lambda miss: miss == 1)
+        elif chosen is None:
+            chosen = self._peek(q["any"], lambda miss: miss > 0)
+
+        if chosen is None:
+            return None
+
+        # Craft
+        self.missing_by_card[chosen] -= 1
+
+        if self.missing_by_card[chosen] == 1:
+            idx, aff, loss = self.keys[chosen]
+            heapq.heappush(q["last"], (loss, aff, idx, chosen))
+
+        # Remove from need sets if eliminated
+        if self.missing_by_card[chosen] == 0:
+            self.outstanding -= 1
+            for s, rar in self.printings_by_card[chosen]:
+                if self.is_needed(s, rar, chosen):
+                    self.need_names_by_set[s][rar].remove(chosen)
+
+        return chosen
+
+
 def wildcard_plan(missing_by_card,
                   printings_by_card,
                   craft_rarity_by_card,
@@ -393,65 +2435,16 @@ def wildcard_plan(missing_by_card,
     """
 
     usage_log = []
-    base_scores_map = {s: direct_pack_hit_prob_for_set(s, need_names_by_set, pool_sizes)
-                       for s in need_names_by_set}
-    protected_sets = set([s for s, _ in
-                          sorted(base_scores_map.items(), key=lambda kv: kv[1], reverse=True)[:top_k_protect]])
-
-    rarity_prob = {"rare": P_RARE, "mythic": P_MYTHIC}
-
-    def ev_loss_if_eliminate(card_name):
-        loss = 0.0
-        for s, rar in printings_by_card[card_name]:
-            if card_name in need_names_by_set.get(s, {}).get(rar, set()):
-                denom = pool_sizes.get(s, {}).get(rar, 0)
-                if denom > 0:
-                    loss += rarity_prob[rar] * (1.0 / denom)
-        return loss
-
-    def protected_affinity(card_name):
-        return sum(base_scores_map.get(s, 0.0) for (s, _) in printings_by_card[card_name] if s in protected_sets)
+    queues = CraftQueues(missing_by_card, printings_by_card, craft_rarity_by_card, need_names_by_set, pool_sizes,
+                         top_k_protect=top_k_protect)
 
     def pick_and_craft_one(rarity, wc_left, ignore_protection=False):
         if wc_left <= 0:
             return False, wc_left
-
-        candidates = [n for n, miss in missing_by_card.items()
-                      if miss > 0 and craft_rarity_by_card.get(n) == rarity]
-        if not candidates:
-            return False, wc_left
-
-        not_eliminate = [n for n in candidates if missing_by_card[n] > 1]
-        eliminate     = [n for n in candidates if missing_by_card[n] == 1]
-
-        chosen = None
-        if not_eliminate:
-            # Safe craft
-            not_eliminate.sort(key=lambda n: (protected_affinity(n), ev_loss_if_eliminate(n)))
-            chosen = not_eliminate[0]
-        elif eliminate and not ignore_protection:
-            # Only eliminate if unavoidable
-            eliminate.sort(key=lambda n: (ev_loss_if_eliminate(n), protected_affinity(n)))
-            chosen = eliminate[0]
-        elif candidates:
-            # Force-craft ignoring protection
-            # Pick from lowest-EV sets first
-            candidates.sort(key=lambda n: sum(base_scores_map.get(s, 0.0) for (s, _) in printings_by_card[n]))
-            chosen = candidates[0]
-
+        chosen = queues.craft(rarity, ignore_protection)
         if chosen is None:
             return False, wc_left
-
-        # Craft
-        missing_by_card[chosen] -= 1
         usage_log.append(f"Crafted 1x {rarity.capitalize()} '{chosen}' (remaining need: {missing_by_card[chosen]})")
-
-        # Remove from need sets if eliminated
-        if missing_by_card[chosen] == 0:
-            for s, rar in printings_by_card[chosen]:
-                if chosen in need_names_by_set.get(s, {}).get(rar, set()):
-                    need_names_by_set[s][rar].remove(chosen)
-
         return True, wc_left - 1
 
     # Phase 1: preserve top-K sets
@@ -468,7 +2461,7 @@ def wildcard_plan(missing_by_card,
         toggle = "rare" if toggle == "mythic" else "mythic"
 
         # Stop if no craftable cards remain
-        if not any(missing_by_card.get(n, 0) > 0 for n in missing_by_card):
+        if queues.outstanding == 0:
             break
 
     # Phase 2: craft remaining wildcards ignoring top-K protection, lowest-EV sets first
@@ -483,7 +2476,677 @@ def wildcard_plan(missing_by_card,
         if not progress:
             break  # no more candidates left
 
-    return missing_by_card, need_names_by_set, usage_log
+    return missing_by_card, need_names_by_set, usage_log
+
+
+# =======================
+# Exact wildcard allocation (branch-and-bound over target sets)
+# =======================
+# Replace the greedy plan with the allocation that maximizes the best set's EV (--exact)
+WILDCARD_OPTIMIZER = False
+OPTIMIZER_TIME_BUDGET = 2.0   # seconds; the greedy plan is kept when the search runs out of time
+
+
+def optimal_wildcard_plan(missing_by_card, printings_by_card, craft_rarity_by_card, need_names_by_set,
+                          pool_sizes, arena_sets, rare_wildcards, mythic_wildcards, greedy_need_after,
+                          time_budget=None):
+    """
+    Crafting plan that spends as many wildcards as wildcard_plan does and leaves
+    the highest possible best-set EV (total_ev_for_pack) afterwards.
+
+    Only eliminated cards change EV, and any card can take all but one of its
+    missing copies without being eliminated, so spending r rare crafts means
+    eliminating exactly max(0, r - (copies - cards)) rare cards (same for mythic).
+    For a fixed target set the EV is linear in the need counts, so the best
+    eliminations are the cards with the smallest EV loss for that set. The search
+    branches over target sets in order of their uncrafted EV (an upper bound),
+    prunes sets whose bound can't beat the incumbent and memoizes elimination
+    sets already scored.
+
+    A finished search is optimal: every target set is either scored with its best
+    eliminations or bounded below the incumbent. When `time_budget` runs out, the
+    best plan found so far is still used if it beats the greedy one, and the report
+    gives `bound_gap`, how far the optimum can be above it (the highest uncrafted EV
+    among the unexplored target sets). Returns the plan plus its EV next to the
+    greedy plan's, or None when no set is rankable.
+    """
+    import numpy as np
+
+    time_budget = OPTIMIZER_TIME_BUDGET if time_budget is None else time_budget
+    start = time.perf_counter()
+    engine = ScoringEngine(need_names_by_set, pool_sizes, arena_sets)
+    rarity_col = {"rare": 0, "mythic": 1}
+
+    def best_of(counts):
+        codes, evs = engine.best(engine.score(counts)["total"])
+        return str(codes), float(evs)
+
+    base = engine.need_counts(need_names_by_set)
+    greedy_set, greedy_ev = best_of(engine.need_counts(greedy_need_after))
+
+    # Candidates per rarity and the count deltas of eliminating each of them
+    cards = {r: [n for n, m in missing_by_card.items() if m > 0 and craft_rarity_by_card.get(n) == r]
+             for r in rarity_col}
+    deltas = {}
+    for r, names in cards.items():
+        d = np.zeros((len(names), len(engine.sets), 2))
+        for k, n in enumerate(names):
+            for s, rar in set(printings_by_card[n]):
+                if n in need_names_by_set.get(s, {}).get(rar, ()):
+                    d[k, engine.index[s], rarity_col[rar]] = 1.0
+        deltas[r] = d
+
+    eliminate = {}
+    for r, wc in (("rare", rare_wildcards), ("mythic", mythic_wildcards)):
+        copies = sum(missing_by_card[n] for n in cards[r])
+        eliminate[r] = max(0, min(wc, copies) - (copies - len(cards[r])))
+
+    # EV loss of each elimination for every target set (EV is linear in the counts)
+    base_total = engine.score(base)["total"]
+    losses = {r: base_total - engine.score(base - d)["total"] if len(d) else np.zeros((0, len(engine.sets)))
+              for r, d in deltas.items()}
+
+    targets = sorted((i for i in range(len(engine.sets)) if engine.rankable[i]), key=lambda i: -base_total[i])
+    best = None
+    scored = {}
+    explored = 0
+    status = "optimal"
+    bound = None   # highest uncrafted EV among the target sets left unexplored by a timeout
+    for i in targets:
+        if best is not None and base_total[i] <= best[1] + 1e-12:
+            break  # no remaining target set can beat the incumbent
+        if time.perf_counter() - start > time_budget:
+            status, bound = "timeout", float(base_total[i])
+            break
+        explored += 1
+        chosen = tuple(tuple(sorted(np.argsort(losses[r][:, i], kind="stable")[:eliminate[r]].tolist()))
+                       for r in rarity_col)
+        if chosen not in scored:
+            counts = base.copy()
+            for r, picks in zip(rarity_col, chosen):
+                counts -= deltas[r][list(picks)].sum(axis=0)
+            scored[chosen] = best_of(counts)
+        top_set, ev = scored[chosen]
+        if best is None or ev > best[1] + 1e-12:
+            best = (top_set, ev, chosen)
+
+    if best is None and status == "optimal":
+        return None  # nothing rankable
+    report = {"status": status, "explored": explored, "elapsed": time.perf_counter() - start,
+              "time_budget": time_budget, "best_set": greedy_set, "best_ev": greedy_ev,
+              "greedy_set": greedy_set, "greedy_ev": greedy_ev, "gap": 0.0, "plan": None,
+              "bound_gap": max(0.0, bound - greedy_ev) if bound is not None else 0.0}
+    if best is None or best[1] <= greedy_ev + 1e-12:
+        return report  # keep the greedy plan
+
+    # Eliminate the chosen cards, then spread the remaining crafts without eliminating anything
+    missing_after = missing_by_card.copy()
+    need_after = copy_needs(need_names_by_set)
+    usage_log = []
+
+    def craft(name, rarity):
+        missing_after[name] -= 1
+        usage_log.append(f"Crafted 1x {rarity.capitalize()} '{name}' (remaining need: {missing_after[name]})")
+
+    for r, picks in zip(rarity_col, best[2]):
+        wc_left = min(rare_wildcards if r == "rare" else mythic_wildcards, sum(missing_by_card[n] for n in cards[r]))
+        for k in picks:
+            name = cards[r][k]
+            while missing_after[name] > 0:
+                craft(name, r)
+                wc_left -= 1
+            for s, rar in printings_by_card[name]:
+                need_after.get(s, {}).get(rar, set()).discard(name)
+        for name in cards[r]:
+            while wc_left > 0 and missing_after[name] > 1:
+                craft(name, r)
+                wc_left -= 1
+
+    report.update(best_set=best[0], best_ev=best[1], gap=best[1] - greedy_ev,
+                  bound_gap=max(0.0, bound - best[1]) if bound is not None else 0.0,
+                  plan=(missing_after, need_after, usage_log))
+    return report
+
+
+def print_optimizer_report(report, arena_sets):
+    if report["plan"] is None:
+        reason = "out of time" if report["status"] == "timeout" else "no better allocation"
+        print(f"\n🧮 Exact wildcard allocation: keeping the greedy plan ({reason}, "
+              f"{report['explored']} target sets in {report['elapsed']:.2f}s)")
+    else:
+        print(f"\n🧮 Exact wildcard allocation: {arena_sets.get(report['best_set'], report['best_set'])} "
+              f"({report['best_set'].upper()}) at {100 * report['best_ev']:.2f}% per pack vs greedy "
+              f"{report['greedy_set'].upper()} at {100 * report['greedy_ev']:.2f}% "
+              f"(+{100 * report['gap']:.2f} points, {report['explored']} target sets in {report['elapsed']:.2f}s)")
+    if report["status"] == "timeout":
+        print(f"   ⏱️ Search stopped after OPTIMIZER_TIME_BUDGET = {report['time_budget']:g}s; "
+              f"the best allocation may be up to {100 * report['bound_gap']:.2f} points better")
+
+
+# =======================
+# Budget optimizer (marginal EV pack allocation)
+# =======================
+# Packs (or gems) to spend; 0 = don't plan purchases
+PACK_BUDGET = 0
+PACK_PRICE_GEMS = 200
+
+
+def optimize_pack_budget(need_names_by_set, pool_sizes, arena_sets, budget_packs=None, budget_gems=None,
+                         missing_by_card=None):
+    """
+    Allocate a pack budget one pack at a time to the set with the highest
+    marginal expected hits, given the packs already allocated.
+
+    Each needed card keeps the distribution of how many of its missing copies
+    (`missing_by_card`, 1 if not given) the allocated packs have pulled, and both
+    terms use it. Opening a pack of set s pulls each of s's cards with probability
+    P_rarity / pool; every Standard pack also pulls each golden pack card with
+    probability golden packs per pack * its golden hazard, so a card expected from
+    golden packs is worth less in the direct EV too. One more pull is a hit while
+    some copy is still missing, so a 4-of keeps its set's value up for several packs
+    instead of dropping out after the first expected hit; for a single copy this is
+    the plain survival product. Cards are pulled independently of each other and the
+    wildcard term is a flat rate, so the schedule is a greedy heuristic and its
+    expected hits lean high.
+    Returns the purchase schedule, the allocation order and the expected hits.
+    """
+    import numpy as np
+
+    if budget_packs is None:
+        budget_packs = int(budget_gems // PACK_PRICE_GEMS) if budget_gems else 0
+    rarity_prob = {"rare": P_RARE, "mythic": P_MYTHIC}
+    missing_by_card = missing_by_card or {}
+
+    sets = [s for s in need_names_by_set if s in arena_sets]
+    order = {s: i for i, s in enumerate(sets)}
+    cards = sorted({n for s in sets for r in ("rare", "mythic") for n in need_names_by_set[s][r]})
+    card_idx = {n: i for i, n in enumerate(cards)}
+    copies = np.array([max(1, missing_by_card.get(n, 1)) for n in cards], dtype=int)
+
+    # Per-set hit hazard of each needed card (sets x cards)
+    hazards = np.zeros((len(sets), len(cards)))
+    for si, s in enumerate(sets):
+        for r in ("rare", "mythic"):
+            total = pool_sizes.get(s, {}).get(r, 0) or 0
+            if total <= 0:
+                continue
+            for n in need_names_by_set[s][r]:
+                hazards[si, card_idx[n]] += rarity_prob[r] / total
+
+    # Golden pack hazard per card (expected copies per Golden Pack), as in golden_pack_expected_hit
+    std_present = [s for s in STANDARD_OR_ALCHEMY_LEGAL_SETS if s in need_names_by_set]
+    gold = np.zeros(len(cards))
+    for s in std_present:
+        slots = GOLDEN_PACK_SLOTS_ANY_STANDARD / len(std_present)
+        if s == LATEST_STANDARD_SET:
+            slots += GOLDEN_PACK_SLOTS_LATEST_SET
+        mythic_slots = slots * GOLDEN_MYTHIC_RATE_PER_SLOT
+        for r, r_slots in (("rare", slots - mythic_slots), ("mythic", mythic_slots)):
+            total = pool_sizes.get(s, {}).get(r, 0) or 0
+            if total > 0:
+                for n in need_names_by_set[s][r]:
+                    gold[card_idx[n]] += r_slots / total
+
+    # pulled[i, k] = P(k copies of card i pulled so far); k = copies[i] (all missing copies pulled) absorbs
+    golden_hazard = np.minimum(GOLDEN_PACKS_PER_STD_PACK * gold, 1.0)
+    open_copy = np.arange(int(copies.max()) + 1 if len(cards) else 1) < copies[:, None]
+    pulled = np.zeros(open_copy.shape)
+    pulled[:, 0] = 1.0
+
+    def pull(h):
+        """One more pull of each card with probability h."""
+        moved = pulled * (h[:, None] * open_copy)
+        pulled[:] -= moved
+        pulled[:, 1:] += moved[:, :-1]
+
+    is_std = np.array([s in STANDARD_OR_ALCHEMY_LEGAL_SETS for s in sets], dtype=bool)
+    wc = np.where(is_std, wildcard_ev_per_pack(True), wildcard_ev_per_pack(False))
+    tie_key = {s: (-STD_ROTATION_PRIORITY.get(s, float("inf")), order[s]) for s in sets}
+
+    picks = []
+    expected_hits = 0.0
+    for _ in range(budget_packs if sets else 0):
+        p = (pulled * open_copy).sum(axis=1)      # P(fewer than all missing copies pulled)
+        gp = GOLDEN_PACKS_PER_STD_PACK * float(gold @ p) if std_present else 0.0
+        val = hazards @ p + wc + np.where(is_std, gp, 0.0)
+        rounded = np.round(val, 9)
+        best = min(np.flatnonzero(rounded == rounded.max()), key=lambda si: tie_key[sets[si]])
+        picks.append(sets[best])
+        expected_hits += float(val[best])
+
+        pull(hazards[best])
+        if is_std[best]:
+            # Golden packs from this pack: every golden pack card gets its share too
+            pull(golden_hazard)
+
+    counts = defaultdict(int)
+    for s in picks:
+        counts[s] += 1
+    schedule = sorted(counts.items(), key=lambda kv: (-kv[1], order[kv[0]]))
+    return {"schedule": schedule, "order": picks, "expected_hits": expected_hits, "packs": len(picks)}
+
+
+def print_budget_plan(plan, arena_sets):
+    print(f"\n🛒 Pack purchase plan for {plan['packs']} packs "
+          f"(≈{plan['expected_hits']:.2f} expected needed cards, wildcard track included):")
+    print("   " + ", ".join(f"{n}× {s.upper()}" for s, n in plan["schedule"]))
+    for s, n in plan["schedule"]:
+        print(f"   - {arena_sets.get(s, s)} ({s.upper()}): {n} packs")
+
+
+# =======================
+# Monte Carlo pack-opening simulator
+# =======================
+# Set SIMULATE_TRIALS > 0 to simulate packs-to-completion for the top sets after crafting
+SIMULATE_TRIALS = 0
+SIMULATE_TOP_SETS = 3
+SIMULATION_SEED = None
+SIMULATION_MAX_PACKS = 3000
+SIMULATION_BATCH = 50_000     # trials simulated together in one vectorized batch
+SIMULATION_WORKERS = None     # process pool size (None = all cores)
+
+
+def build_simulation_model(set_code, missing_by_card, printings_by_card, craft_rarity_by_card, pool_sizes,
+                           rare_wildcards=0, mythic_wildcards=0):
+    """
+    Flatten the remaining needs into arrays for the simulator.
+    Each (set, rarity) pool becomes a lookup table of length pool_size whose first
+    slots hold the ids of still-needed cards and the rest -1 ("not needed").
+    Golden packs draw from every Standard set; other sets are only needed for the opened set.
+    """
+    import numpy as np
+
+    names = [n for n, miss in missing_by_card.items() if miss > 0]
+    card_id = {n: i for i, n in enumerate(names)}
+    need = np.array([missing_by_card[n] for n in names], dtype=np.int16)
+    craft_mythic = np.array([craft_rarity_by_card.get(n) == "mythic" for n in names], dtype=bool)
+
+    def pool_table(s, rarity):
+        size = int((pool_sizes.get(s, {}) or {}).get(rarity, 0) or 0)
+        ids = [card_id[n] for n in names if (s, rarity) in printings_by_card.get(n, ())]
+        table = np.full(max(size, len(ids), 1), -1, dtype=np.int32)
+        table[:len(ids)] = ids
+        return table, size if size > 0 else 0
+
+    sets = [set_code] + [x for x in STANDARD_OR_ALCHEMY_LEGAL_SETS if x != set_code]
+    width = 1
+    tables = {}
+    for s in sets:
+        for r in ("rare", "mythic"):
+            tables[(s, r)] = pool_table(s, r)
+            width = max(width, len(tables[(s, r)][0]))
+    # stacked[set_index, rarity(0 rare / 1 mythic), slot] and matching pool sizes
+    stacked = np.full((len(sets), 2, width), -1, dtype=np.int32)
+    sizes = np.zeros((len(sets), 2), dtype=np.int64)
+    for i, s in enumerate(sets):
+        for j, r in enumerate(("rare", "mythic")):
+            table, size = tables[(s, r)]
+            stacked[i, j, :len(table)] = table
+            sizes[i, j] = size
+
+    std_idx = np.array([i for i, x in enumerate(sets) if x in STANDARD_OR_ALCHEMY_LEGAL_SETS], dtype=np.int64)
+    latest = sets.index(LATEST_STANDARD_SET) if LATEST_STANDARD_SET in sets else -1
+    return {
+        "set": set_code,
+        "need": need,
+        "craft_mythic": craft_mythic,
+        "tables": stacked,
+        "sizes": sizes,
+        "is_standard": set_code in STANDARD_OR_ALCHEMY_LEGAL_SETS,
+        "std_idx": std_idx,
+        "latest_idx": latest,
+        "gp_period": int(round(1.0 / GOLDEN_PACKS_PER_STD_PACK)) if GOLDEN_PACKS_PER_STD_PACK > 0 else 0,
+        "wc_track": INCLUDE_WILDCARD_EV,
+        "wc_from_gp": WILDCARDS_FROM_GOLDEN_PACK,
+        "start_wc": (int(rare_wildcards), int(mythic_wildcards)),
+    }
+
+
+def _sim_draw(model, rng, rem, left, rows, set_idx, mythic):
+    """Open one card slot per row (set_idx/mythic arrays per row) and apply hits to the needs."""
+    import numpy as np
+
+    rar = mythic.astype(np.int64)
+    size = model["sizes"][set_idx, rar]
+    slot = (rng.random(len(rows)) * size).astype(np.int64)
+    card = np.where(size > 0, model["tables"][set_idx, rar, np.minimum(slot, model["tables"].shape[2] - 1)], -1)
+    hit = card >= 0
+    r, c = rows[hit], card[hit]
+    useful = rem[r, c] > 0
+    r, c = r[useful], c[useful]
+    rem[r, c] -= 1
+    left[r] -= 1
+
+
+def _sim_craft(model, rem, left, mythic_wc):
+    """Spend one wildcard per row on the first remaining card craftable with it (if any)."""
+    import numpy as np
+
+    mask = (rem > 0) & (model["craft_mythic"] == mythic_wc)
+    has = mask.any(axis=1)
+    rows = np.nonzero(has)[0]
+    cols = mask[rows].argmax(axis=1)
+    rem[rows, cols] -= 1
+    left[rows] -= 1
+
+
+def _simulate_chunk(model, n_trials, seed_seq, max_packs):
+    """
+    Simulate n_trials independent pack sequences of one set in lockstep.
+    Returns packs-to-completion per trial (max_packs + 1 when not finished).
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed_seq)
+    rem = np.tile(model["need"], (n_trials, 1))
+    left = rem.sum(axis=1, dtype=np.int64)
+    result = np.full(n_trials, max_packs + 1, dtype=np.int32)
+    trial = np.arange(n_trials)
+
+    for _ in range(model["start_wc"][0]):
+        _sim_craft(model, rem, left, False)
+    for _ in range(model["start_wc"][1]):
+        _sim_craft(model, rem, left, True)
+
+    track_packs = 0
+    wc_earned = 0
+    std = model["std_idx"]
+    for pack in range(1, max_packs + 1):
+        done = left <= 0
+        if done.any():
+            result[trial[done]] = pack - 1
+            keep = ~done
+            rem, left, trial = rem[keep], left[keep], trial[keep]
+            if len(trial) == 0:
+                break
+        rows = np.arange(len(trial))
+
+        # Regular pack: one rare slot upgraded to mythic 1/8 of the time
+        _sim_draw(model, rng, rem, left, rows, np.zeros(len(rows), dtype=np.int64),
+                  rng.random(len(rows)) < P_MYTHIC)
+        n_track = 1
+
+        # Golden pack after every 10 Standard packs: 2 latest-set slots + 4 any-Standard slots,
+        # one guaranteed mythic slot, the other slots upgraded 1/8 of the time
+        if model["is_standard"] and model["gp_period"] and pack % model["gp_period"] == 0 and len(std):
+            guaranteed = rng.integers(0, GOLDEN_PACK_SLOTS_TOTAL, len(rows))
+            for slot in range(GOLDEN_PACK_SLOTS_TOTAL):
+                if slot < GOLDEN_PACK_SLOTS_LATEST_SET and model["latest_idx"] >= 0:
+                    set_idx = np.full(len(rows), model["latest_idx"], dtype=np.int64)
+                else:
+                    set_idx = std[rng.integers(0, len(std), len(rows))]
+                mythic = (guaranteed == slot) | (rng.random(len(rows)) < P_MYTHIC)
+                _sim_draw(model, rng, rem, left, rows, set_idx, mythic)
+            if model["wc_from_gp"]:
+                n_track += 1
+
+        # Wildcard track: a wildcard every 6 packs, every 5th one mythic
+        if model["wc_track"]:
+            for _ in range(n_track):
+                track_packs += 1
+                if track_packs % PACKS_PER_TRACK_WILDCARD == 0:
+                    wc_earned += 1
+                    _sim_craft(model, rem, left, wc_earned % TRACK_WILDCARDS_PER_MYTHIC == 0)
+    else:
+        done = left <= 0
+        result[trial[done]] = max_packs
+
+    return result
+
+
+def simulate_packs_to_completion(set_code, missing_by_card, printings_by_card, craft_rarity_by_card, pool_sizes,
+                                 n_trials=100_000, seed=None, max_packs=None,
+                                 rare_wildcards=0, mythic_wildcards=0, workers=SIMULATION_WORKERS,
+                                 batch_size=SIMULATION_BATCH):
+    """
+    Monte Carlo estimate of how many packs of `set_code` it takes to finish the deck
+    (pack pulls + golden packs + wildcard track crafts). Trials run in vectorized
+    batches spread over a process pool; a given seed gives the same answer for any
+    number of workers. Returns mean / std / percentiles of packs-to-completion.
+    """
+    import numpy as np
+
+    max_packs = SIMULATION_MAX_PACKS if max_packs is None else max_packs
+    model = build_simulation_model(set_code, missing_by_card, printings_by_card, craft_rarity_by_card,
+                                   pool_sizes, rare_wildcards, mythic_wildcards)
+    sizes = [min(batch_size, n_trials - i) for i in range(0, n_trials, batch_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    if workers == 1 or len(sizes) == 1:
+        chunks = [_simulate_chunk(model, n, sq, max_packs) for n, sq in zip(sizes, seeds)]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunks = list(pool.map(_simulate_chunk, [model] * len(sizes), sizes, seeds, [max_packs] * len(sizes)))
+    packs = np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.int32)
+
+    finished = packs <= max_packs
+    pct = np.percentile(packs, [10, 25, 50, 75, 90, 99]) if len(packs) else [float("nan")] * 6
+    return {
+        "set": set_code,
+        "trials": int(len(packs)),
+        "mean": float(packs[finished].mean()) if finished.any() else float("inf"),
+        "std": float(packs[finished].std()) if finished.any() else float("nan"),
+        "finished": float(finished.mean()) if len(packs) else 0.0,
+        "percentiles": dict(zip((10, 25, 50, 75, 90, 99), (float(x) for x in pct))),
+        "max_packs": max_packs,
+    }
+
+
+def print_simulation(result, arena_sets):
+    pct = result["percentiles"]
+    fmt = lambda v: f">{result['max_packs']}" if v > result["max_packs"] else f"{v:.0f}"
+    mean = f"{result['mean']:.1f}" if result["finished"] > 0 else f">{result['max_packs']}"
+    print(f"{arena_sets.get(result['set'], result['set'])} ({result['set'].upper()}): "
+          f"mean≈{mean} packs  |  median {fmt(pct[50])}, "
+          f"p90 {fmt(pct[90])}, p99 {fmt(pct[99])}  "
+          f"({100.0 * result['finished']:.1f}% of {result['trials']} trials finished)")
+
+
+# =======================
+# Closed-form packs-to-completion
+# =======================
+# Set EXPECTED_PACKS = True (--expected-packs) to print the expected packs to finish the deck for the top sets
+EXPECTED_PACKS = False
+EXPECTED_PACKS_TOLERANCE = 1e-9   # stops once completion is (numerically) certain
+
+
+class _CraftChain:
+    """
+    Exact distribution of each craft rarity's progress under the simulator's craft
+    policy: every wildcard goes right away to the first card (in deck order) of its
+    rarity that is still missing copies. Crafts only ever touch that card, so the
+    state is (card the crafts have reached, copies it still misses); the cards after
+    it have only been pulled, and their deficits are tracked on their own.
+    Both rarities share one (blocks, 0..max missing copies, 2) array for the two
+    distributions: per rarity a leading empty block for "no craft yet", then one
+    block per card.
+    """
+
+    def __init__(self, needs):
+        import numpy as np
+
+        blocks = [np.concatenate([[0], np.asarray(need, dtype=np.int64)]) for need in needs]
+        self.segments, start = [], 0
+        for b in blocks:
+            self.segments.append(slice(start, start + len(b)))
+            start += len(b)
+        need = np.concatenate(blocks)
+        self.need = need
+        self.width = int(need.max()) + 1
+        # dist[..., 0] = pull-only deficit of each card, dist[..., 1] = reached card and its deficit
+        self.dist = np.zeros((len(need), self.width, 2))
+        self.dist[np.arange(len(need)), need, 0] = 1.0
+        for seg in self.segments:
+            self.dist[seg.start, 0, 1] = 1.0
+        self.finished = np.zeros(len(needs))      # every card of the rarity crafted or pulled
+        self.masks = []
+        for seg in self.segments:
+            rows, cols = np.indices((seg.stop - seg.start,) * 2)
+            self.masks.append((rows > cols, rows >= cols))
+
+    def pull_table(self, probs, pulls=1):
+        """Transition of `pulls` card slots per block, from the chance one slot is each card (0 = empty block)."""
+        import numpy as np
+
+        d = np.arange(self.width)
+        one = np.zeros((len(probs), self.width, self.width))
+        one[:, d, d] = np.where(d > 0, 1.0 - probs[:, None], 1.0)
+        one[:, d[:-1], d[1:]] = probs[:, None]      # a pull takes one missing copy off
+        return np.linalg.matrix_power(one, pulls) if pulls != 1 else one
+
+    def pull(self, table):
+        """Advance both distributions by a pull_table (one pack)."""
+        self.dist = table @ self.dist
+
+    def craft(self, rarity):
+        """One wildcard of `rarity` (0 = rare, 1 = mythic) on the first card still missing copies."""
+        import numpy as np
+
+        rarity = int(rarity)
+        seg = self.segments[rarity]
+        free, state = self.dist[seg, :, 0], self.dist[seg, :, 1]
+        # Mass that finds its block complete moves on to the next card:
+        # carry_c = state_c[0] + carry_{c-1} * free_c[0], i.e. carry = L @ state[:, 0]
+        # with L[c, k] = free_{k+1}[0] * ... * free_c[0]
+        below, lower = self.masks[rarity]
+        L = np.cumprod(np.where(below, free[:, :1], 1.0), axis=0) * lower
+        carry = L @ state[:, 0]
+        block = state + np.concatenate([[0.0], carry[:-1]])[:, None] * free   # reached now: pull-only deficit
+        state[:, :-1] = block[:, 1:]
+        state[:, -1] = 0.0
+        self.finished[rarity] += carry[-1]
+
+    def done(self, complete, finished):
+        """
+        P(every card of both rarities is complete) for snapshots of dist[:, 0]
+        (snapshots, blocks, 2) and of finished (snapshots, 2).
+        """
+        import numpy as np
+
+        p = np.ones(len(complete))
+        for r, seg in enumerate(self.segments):
+            pulled, reached = complete[:, seg, 0], complete[:, seg, 1]
+            # later cards of the rarity all pulled to completion
+            after = np.ones_like(pulled)
+            after[:, :-1] = np.cumprod(pulled[:, :0:-1], axis=1)[:, ::-1]
+            p *= (reached * after).sum(axis=1) + finished[:, r]
+        return p
+
+
+def expected_packs_to_completion(set_code, missing_by_card, printings_by_card, craft_rarity_by_card, pool_sizes,
+                                 rare_wildcards=0, mythic_wildcards=0, max_packs=None):
+    """
+    Deterministic counterpart of simulate_packs_to_completion, with the same pack,
+    golden pack and wildcard track model and the same craft policy (wildcards in
+    hand and from the track are crafted at once, on the first card still missing).
+    The state of each craft rarity is a small Markov chain (see _CraftChain)
+    advanced pack by pack, so P(finished by pack n) is exact up to treating the
+    cards' pulls as independent. A pack is one precomputed transition table per
+    card and a craft one triangular solve over the rarity's cards, and completion
+    is evaluated for a chunk of packs at once. Returns mean / percentiles like the
+    simulator plus the cumulative completion curve P(finished by pack n).
+    """
+    import numpy as np
+
+    max_packs = SIMULATION_MAX_PACKS if max_packs is None else max_packs
+    model = build_simulation_model(set_code, missing_by_card, printings_by_card, craft_rarity_by_card,
+                                   pool_sizes, rare_wildcards, mythic_wildcards)
+    tables, sizes = model["tables"], model["sizes"].astype(float)
+    n_cards = len(model["need"])
+    rates = np.array([P_RARE, P_MYTHIC])
+
+    def slot_probs(set_idx, rarity_rates):
+        """Probability that one card slot of the given sets/rarity mix is each needed card."""
+        probs = np.zeros(n_cards)
+        for i in np.atleast_1d(set_idx):
+            for j in range(2):
+                if sizes[i, j] > 0:
+                    ids = tables[i, j][tables[i, j] >= 0]
+                    np.add.at(probs, ids, rarity_rates[j] / sizes[i, j] / len(np.atleast_1d(set_idx)))
+        return probs
+
+    regular = slot_probs(0, rates)
+    golden = model["is_standard"] and model["gp_period"] > 0 and len(model["std_idx"]) > 0
+    gp_rates = np.array([1.0 - GOLDEN_MYTHIC_RATE_PER_SLOT, GOLDEN_MYTHIC_RATE_PER_SLOT])
+    any_slot = slot_probs(model["std_idx"], gp_rates) if golden else np.zeros(n_cards)
+    if golden and model["latest_idx"] >= 0:
+        latest_slot, n_latest = slot_probs(model["latest_idx"], gp_rates), GOLDEN_PACK_SLOTS_LATEST_SET
+    else:
+        latest_slot, n_latest = np.zeros(n_cards), 0
+    n_any = GOLDEN_PACK_SLOTS_TOTAL - n_latest
+
+    # Both craft rarities in one chain, cards in the order the simulator crafts them
+    cards = [np.nonzero(model["craft_mythic"] == mythic)[0] for mythic in (False, True)]
+    chain = _CraftChain([model["need"][c] for c in cards])
+
+    def per_block(probs):
+        return np.concatenate([np.concatenate([[0.0], probs[c]]) for c in cards])
+
+    # A pack's card slots all shift the deficits within each block, so they compose into one table per pack kind
+    regular_table = chain.pull_table(per_block(regular))
+    golden_table = regular_table
+    if golden:
+        golden_table = (regular_table @ chain.pull_table(per_block(latest_slot), n_latest)
+                        @ chain.pull_table(per_block(any_slot), n_any))
+
+    for mythic in (False, True):
+        for _ in range(model["start_wc"][mythic]):
+            chain.craft(mythic)
+
+    # Completion is evaluated a chunk of packs at a time from snapshots of the complete states
+    chunk = 32
+    complete, finished = np.empty((chunk, len(chain.dist), 2)), np.empty((chunk, len(chain.finished)))
+    curve = list(chain.done(chain.dist[None, :, 0], chain.finished[None]))
+    certain = curve[0] >= 1.0 - EXPECTED_PACKS_TOLERANCE
+    track_packs = wc_earned = pack = 0
+    while not certain and pack < max_packs:
+        n = min(chunk, max_packs - pack)
+        for j in range(n):
+            pack += 1
+            is_golden = golden and pack % model["gp_period"] == 0
+            chain.pull(golden_table if is_golden else regular_table)
+            if model["wc_track"]:
+                for _ in range(2 if is_golden and model["wc_from_gp"] else 1):
+                    track_packs += 1
+                    if track_packs % PACKS_PER_TRACK_WILDCARD == 0:
+                        wc_earned += 1
+                        chain.craft(wc_earned % TRACK_WILDCARDS_PER_MYTHIC == 0)
+            complete[j], finished[j] = chain.dist[:, 0], chain.finished
+        done = chain.done(complete[:n], finished[:n])
+        hit = np.flatnonzero(done >= 1.0 - EXPECTED_PACKS_TOLERANCE)
+        certain = len(hit) > 0
+        curve.extend(done[:hit[0] + 1] if certain else done)
+
+    curve = np.maximum.accumulate(np.minimum(np.array(curve), 1.0))
+    finished = 1.0 if certain else float(curve[-1])
+    pmf = np.diff(curve, prepend=0.0)
+    packs = np.arange(len(curve))
+    mean = float((packs * pmf).sum() / curve[-1]) if curve[-1] > 0 else float("inf")
+
+    def percentile(q):
+        idx = np.searchsorted(curve, q / 100.0 - 1e-12)
+        return float(idx) if idx < len(curve) else float(max_packs + 1)
+
+    return {
+        "set": set_code,
+        "mean": mean,
+        "finished": finished,
+        "percentiles": {q: percentile(q) for q in (10, 25, 50, 75, 90, 99)},
+        "curve": curve,
+        "max_packs": max_packs,
+    }
+
+
+def print_expected_packs(result, arena_sets):
+    pct = result["percentiles"]
+    fmt = lambda v: f">{result['max_packs']}" if v > result["max_packs"] else f"{v:.0f}"
+    mean = f"{result['mean']:.1f}" if result["finished"] > 0 else f">{result['max_packs']}"
+    print(f"{arena_sets.get(result['set'], result['set'])} ({result['set'].upper()}): "
+          f"expected≈{mean} packs  |  median {fmt(pct[50])}, p90 {fmt(pct[90])}, p99 {fmt(pct[99])}"
+          + (f"  ({100.0 * result['finished']:.1f}% finish within {result['max_packs']})"
+             if result["finished"] < 1.0 else ""))
 
 
 # =======================
@@ -492,8 +3155,10 @@ def wildcard_plan(missing_by_card,
 def print_recommendations(sorted_scores, need_names_by_set, pool_sizes, arena_sets, title, missing_by_card):
     print(f"\n📦 {title}")
     print("=" * (2 + len(title)))
-    # Precompute constant Golden Pack per-pack bonus for Standard sets (for display)
-    gp_per_pack = per_pack_golden_bonus(need_names_by_set, pool_sizes)
+    # EV components of every set in one vectorized pass (for display)
+    engine = ScoringEngine(need_names_by_set, pool_sizes, arena_sets)
+    parts = engine.score(engine.need_counts(need_names_by_set))
+    gp_per_pack = float(parts["golden"])
 
     for set_code, score in sorted_scores:
         if set_code not in arena_sets:
@@ -508,10 +3173,11 @@ def print_recommendations(sorted_scores, need_names_by_set, pool_sizes, arena_se
         if Rn + Mn == 0:
             continue
 
-        direct = direct_pack_hit_prob_for_set(set_code, need_names_by_set, pool_sizes)
+        i = engine.index[set_code]
+        direct = float(parts["direct"][i])
         is_std = set_code in STANDARD_OR_ALCHEMY_LEGAL_SETS
         gp = gp_per_pack if is_std else 0.0
-        wc = wildcard_ev_per_pack(is_std)
+        wc = float(parts["wildcard"][i])
 
         pct_direct = f"{100.0 * direct:.2f}%"
         pct_total  = f"{100.0 * score:.2f}%"
@@ -564,23 +3230,1041 @@ def compress_crafting_log_global(usage_log):
 
 
 # =======================
-# Main
+# Incremental re-evaluation (persisted run state + watch mode)
 # =======================
-def main():
+RUN_STATE_VERSION = 3
+WATCH_INTERVAL = 0.5      # seconds between input file checks in watch mode
+# Saved printings and pool sizes expire like the Scryfall searches they come from
+RUN_STATE_TTL = HTTP_CACHE_TTLS["/cards/search"]
+
+# Settings that never change the plan or ranking (a changed value keeps the cached plan)
+_PLAN_NEUTRAL_SETTINGS = ("SERVER_", "WATCH_", "PROFILE_", "CASSETTE_", "FLEET_", "SIMULAT",
+                          "PACK_BUDGET", "HTTP_CACHE", "SCRYFALL_SLEEP", "SCRYFALL_MAX_WORKERS",
+                          "RUN_STATE_")
+
+
+def _settings_fingerprint():
+    """Hash of the settings the plan depends on, so a changed constant invalidates it."""
+    items = [(name, repr(globals()[name])) for name in configurable_settings()
+             if not name.startswith(_PLAN_NEUTRAL_SETTINGS)]
+    return hashlib.sha1(repr(items).encode("utf-8")).hexdigest()
+
+
+def diff_missing_rows(old_rows, new_rows):
+    """{"added": [...], "removed": [...], "changed": [(name, old_qty, new_qty), ...]} between two row lists."""
+    old, new = dict(old_rows), dict(new_rows)
+    return {
+        "added": [n for n in new if n not in old],
+        "removed": [n for n in old if n not in new],
+        "changed": [(n, old[n], new[n]) for n in new if n in old and old[n] != new[n]],
+    }
+
+
+class IncrementalRun:
+    """
+    Pipeline state kept between runs (on disk in INPUT_CACHE_DIR, and in memory
+    for watch mode): resolved printings, pool sizes, the missing rows, needs and
+    the last plan and ranking. evaluate() diffs the current inputs against it,
+    resolves only cards it has never seen and fetches only new sets' pools.
+    Lookups that failed part-way are not kept, saved ones expire after
+    RUN_STATE_TTL seconds, and a rebuilt offline catalog starts a fresh state.
+    When neither the missing cards, the printings and pools nor any setting
+    changed, the last plan and ranking are reused as they are.
+    Needs, plan and ranking are otherwise rebuilt from the cached printings
+    (a few milliseconds), because the greedy plan's tie-breaks depend on row
+    order and must come out exactly as in a fresh run.
+    """
+
+    def __init__(self, deck_path=None, collection_path=None, arena_sets=None):
+        self.deck_path = deck_path or DECKLIST_PATH or EXCEL_PATH
+        self.collection_path = collection_path or COLLECTION_PATH or EXCEL_PATH
+        self.arena_sets = arena_sets if arena_sets is not None else get_arena_sets()
+        self.state_path = None
+        if INPUT_CACHE_DIR:
+            key = hashlib.sha1(f"{os.path.abspath(self.deck_path)}|{os.path.abspath(self.collection_path)}"
+                               .encode("utf-8")).hexdigest()
+            self.state_path = os.path.join(INPUT_CACHE_DIR, f"run-{key}.pkl")
+        self.state = self._load_state()
+
+    def _fresh_state(self):
+        return {"version": RUN_STATE_VERSION, "resolution": self._resolution_key(),
+                "prints": {}, "pools": {}, "stored_at": {"prints": {}, "pools": {}},
+                "rows": [], "settings": None, "result": None}
+
+    def _resolution_key(self):
+        # Printings and pools are only valid for the same set list, rarities and offline catalog
+        built_at = _CATALOG.get("built_at") if _CATALOG else None
+        return sorted(self.arena_sets), sorted(ALLOWED_RARITIES), built_at
+
+    def _expire(self):
+        """Forget saved printings and pool sizes older than RUN_STATE_TTL."""
+        cutoff = time.time() - RUN_STATE_TTL
+        for kind in ("prints", "pools"):
+            stored_at = self.state["stored_at"][kind]
+            for key in [k for k, t in stored_at.items() if t < cutoff]:
+                self.state[kind].pop(key, None)
+                del stored_at[key]
+
+    def _store(self, kind, items):
+        now = time.time()
+        for key, value in items:
+            self.state[kind][key] = value
+            self.state["stored_at"][kind][key] = now
+
+    def _load_state(self):
+        state = None
+        if self.state_path and os.path.exists(self.state_path):
+            try:
+                with open(self.state_path, "rb") as f:
+                    state = pickle.load(f)
+            except Exception:
+                state = None
+        if not state or state.get("version") != RUN_STATE_VERSION or state["resolution"] != self._resolution_key():
+            state = self._fresh_state()
+        return state
+
+    def _save_state(self):
+        if not self.state_path:
+            return
+        os.makedirs(INPUT_CACHE_DIR, exist_ok=True)
+        tmp = self.state_path + ".tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(self.state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self.state_path)
+
+    @staticmethod
+    def _lookups_key(rows, prints, pools, sets):
+        """Hash of the printings and pool sizes a plan is built from."""
+        items = ([(n, prints.get(n)) for n, _ in rows], [(s, pools.get(s)) for s in sorted(sets)])
+        return hashlib.sha1(repr(items).encode("utf-8")).hexdigest()
+
+    def evaluate(self, verbose=True, top_k=None):
+        """
+        Re-run the pipeline for the current inputs. Returns a dict with the needs,
+        pool sizes, plan (missing_after / need_after / usage_log), the ranking,
+        the diff against the previous run and what was reused.
+        With `top_k` and no wildcards to craft, only the best top_k sets are
+        ranked and the other sets' pools are fetched only as needed (rank_sets_top_k).
+        """
+        state = self.state
+        self._expire()
+        with profile_phase("load_inputs"):
+            rows = missing_rows(load_decklist(self.deck_path), load_owned(self.collection_path))
+        diff = diff_missing_rows(state["rows"], rows)
+
+        # Lookups that failed part-way are used for this run only, and asked again next time
+        prints = dict(state["prints"])
+        new_names = [n for n in dict.fromkeys(n for n, _ in rows) if n not in prints]
+        if new_names:
+            incomplete = set()
+            resolved = resolve_arena_printings(new_names, self.arena_sets, incomplete)
+            prints.update(resolved)
+            self._store("prints", ((n, v) for n, v in resolved.items() if n not in incomplete))
+
+        missing_by_card, printings_by_card, craft_rarity_by_card, need_names_by_set = needs_from_rows(
+            rows, prints, verbose=verbose
+        )
+        # The crafting plan weighs every set's pools; with nothing to craft, the ranking may bound them instead
+        bounded = bool(top_k) and RARE_WILDCARDS <= 0 and MYTHIC_WILDCARDS <= 0
+        pools = dict(state["pools"])
+        new_sets = [s for s in need_names_by_set if s not in pools]
+        if new_sets and not bounded:
+            pools.update((s, dict(v)) for s, v in compute_pool_sizes(dict.fromkeys(new_sets)).items())
+        pool_sizes = defaultdict(lambda: {"rare": 0, "mythic": 0})
+        pool_sizes.update((s, pools[s]) for s in need_names_by_set if s in pools)
+        skipped_sets = []
+
+        first_run = state["result"] is None
+        old_needs = {} if first_run else state["result"]["need_names_by_set"]
+        changed_sets = sorted(s for s in set(old_needs) | set(need_names_by_set)
+                              if old_needs.get(s) != need_names_by_set.get(s))
+
+        settings = _settings_fingerprint()
+        reused = (not first_run and state["rows"] == rows and state["settings"] == settings
+                  and state["result"].get("lookups") == self._lookups_key(rows, prints, pools, need_names_by_set))
+        if reused and state["result"].get("top_k") != (top_k if bounded else None):
+            reused = False
+        if reused:
+            plan = state["result"]
+        else:
+            with profile_phase("wildcard_plan"):
+                missing_after, need_after, usage_log = wildcard_plan(
+                    missing_by_card.copy(),
+                    printings_by_card,
+                    craft_rarity_by_card,
+                    copy_needs(need_names_by_set),
+                    pool_sizes,
+                    RARE_WILDCARDS,
+                    MYTHIC_WILDCARDS,
+                    top_k_protect=TOP_K_PROTECT
+                )
+            with profile_phase("rank_sets"):
+                if not need_names_by_set:
+                    ranked = []
+                elif bounded:
+                    known = {s: v for s, v in pools.items() if s in need_names_by_set}
+                    ranked, fetched, skipped_sets = rank_sets_top_k(need_after, self.arena_sets, top_k, known)
+                    pools.update((s, dict(v)) for s, v in fetched.items())
+                    pool_sizes.update(fetched)
+                else:
+                    ranked = rank_sets(need_after, pool_sizes, self.arena_sets)
+            plan = {"need_names_by_set": copy_needs(need_names_by_set), "missing_after": missing_after,
+                    "need_after": need_after, "usage_log": usage_log, "ranked": ranked,
+                    "top_k": top_k if bounded else None,
+                    "lookups": self._lookups_key(rows, prints, pools, need_names_by_set)}
+
+        # Only pool sizes that fully loaded are kept; the others are fetched again next time
+        fetched_sets = [s for s in new_sets if s in pools]
+        for s in fetched_sets:
+            if pool_sizes_complete(s):
+                self._store("pools", [(s, dict(pools[s]))])
+            else:
+                forget_pool_sizes(s)
+        if new_names or new_sets or not reused:
+            state.update(rows=rows, settings=settings, result=plan)
+            self._save_state()
+
+        return dict(
+            plan,
+            missing_by_card=missing_by_card,
+            printings_by_card=printings_by_card,
+            craft_rarity_by_card=craft_rarity_by_card,
+            need_names_by_set=need_names_by_set,
+            pool_sizes=pool_sizes,
+            diff=diff,
+            first_run=first_run,
+            changed_sets=changed_sets,
+            resolved=new_names,
+            fetched_sets=fetched_sets,
+            skipped_sets=skipped_sets,
+            reused_plan=reused,
+        )
+
+
+def describe_changes(result):
+    """One-line summary of what changed since the previous run."""
+    diff = result["diff"]
+    parts = []
+    if diff["added"]:
+        parts.append(f"{len(diff['added'])} newly missing")
+    if diff["removed"]:
+        parts.append(f"{len(diff['removed'])} completed")
+    if diff["changed"]:
+        parts.append(f"{len(diff['changed'])} changed")
+    line = ", ".join(parts) or "no card changes"
+    if result["changed_sets"]:
+        line += f" | sets affected: {', '.join(s.upper() for s in result['changed_sets'])}"
+    line += (f" | {len(result['resolved'])} cards resolved, {len(result['fetched_sets'])} pools fetched"
+             + (" | plan reused" if result["reused_plan"] else ""))
+    return line
+
+
+def print_incremental_result(result, arena_sets):
+    if not result["need_names_by_set"]:
+        print("🎉 No missing rares/mythics detected for Arena boosters in this deck.")
+        return
+    print_recommendations(result["ranked"], result["need_after"], result["pool_sizes"], arena_sets,
+                          "Recommended sets to open (after crafting plan)", result["missing_after"])
+    print("\n🎯 Suggested wildcard usage order (aiming not to eliminate targets in top sets):")
+    compressed_log = compress_crafting_log_global(result["usage_log"])
+    if compressed_log:
+        for line in compressed_log:
+            print(" ", line)
+    else:
+        print(" - No wildcard crafting suggested or no candidates available with given wildcards.")
+
+
+def watch_inputs(deck_path=None, collection_path=None, interval=None):
+    """
+    Re-rank every time the decklist or collection file is saved (polls mtimes).
+    Unchanged cards are never resolved again, so an edit to the Have sheet is
+    re-ranked in milliseconds.
+    """
+    load_catalog(CATALOG_PATH, BULK_DATA_PATH)
+    run = IncrementalRun(deck_path, collection_path)
+    paths = list(dict.fromkeys([run.deck_path, run.collection_path]))
+    interval = WATCH_INTERVAL if interval is None else interval
+    print(f"👀 Watching {', '.join(paths)} (Ctrl+C to stop)")
+
+    seen = None
+    try:
+        while True:
+            try:
+                stamp = tuple(os.stat(p).st_mtime_ns for p in paths)
+            except OSError:
+                stamp = None  # mid-save (some editors replace the file)
+            if stamp is not None and stamp != seen:
+                seen = stamp
+                start = time.perf_counter()
+                try:
+                    result = run.evaluate(verbose=False, top_k=RANK_TOP_K)
+                except Exception as e:  # e.g. a half-written workbook; try again on the next save
+                    print(f"❌ Could not evaluate the inputs: {e}")
+                    continue
+                elapsed = 1000.0 * (time.perf_counter() - start)
+                print(f"\n🔁 {time.strftime('%H:%M:%S')} re-ranked in {elapsed:.0f} ms: {describe_changes(result)}")
+                print_incremental_result(result, run.arena_sets)
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        pass
+
+
+# =======================
+# What-if sweep (wildcard counts x golden pack rate x top-K protection)
+# =======================
+SWEEP_WORKERS = None      # process pool size for the sweep (None = all cores, 1 = no pool)
+
+
+def parse_grid(text, kind=int):
+    """Grid values from "0:60" / "0:60:5" (inclusive int ranges) and comma lists ("0.1,0.125")."""
+    values = []
+    for part in str(text).split(","):
+        part = part.strip()
+        if ":" in part and kind is int:
+            lo, hi, *step = (int(x) for x in part.split(":"))
+            values.extend(range(lo, hi + 1, step[0] if step else 1))
+        elif part:
+            values.append(kind(part))
+    return list(dict.fromkeys(values))
+
+
+def craft_sequence(missing_by_card, printings_by_card, craft_rarity_by_card, need_names_by_set, pool_sizes,
+                   rarity, top_k_protect, protected_steps=None):
+    """
+    Names crafted, in order, by CraftQueues for one rarity with unlimited wildcards:
+    `protected_steps` picks under top-K protection, then forced picks
+    (None = protected until no candidate is left). Any plan that makes the same
+    number of protected picks crafts a prefix of this sequence.
+    """
+    missing = missing_by_card.copy()
+    needs = copy_needs(need_names_by_set)
+    queues = CraftQueues(missing, printings_by_card, craft_rarity_by_card, needs, pool_sizes, top_k_protect)
+    out = []
+    while protected_steps is None or len(out) < protected_steps:
+        chosen = queues.craft(rarity)
+        if chosen is None:
+            return out
+        out.append(chosen)
+    while True:
+        chosen = queues.craft(rarity, ignore_protection=True)
+        if chosen is None:
+            return out
+        out.append(chosen)
+
+
+def _sweep_top_k(settings, inputs, arena_sets, top_k, rare_values, mythic_values, golden_values):
+    """
+    One top_k_protect value of the sweep: (top sets, EVs, copies still missing),
+    arrays of shape (golden, rare, mythic). Runs in a worker process.
+    """
+    import numpy as np
+
+    apply_config(settings)
+    missing_by_card, printings_by_card, craft_rarity_by_card, need_names_by_set, pool_sizes = inputs
+    totals = {r: sum(m for n, m in missing_by_card.items() if craft_rarity_by_card.get(n) == r)
+              for r in ("rare", "mythic")}
+
+    engine = ScoringEngine(need_names_by_set, pool_sizes, arena_sets)
+    base = engine.need_counts(need_names_by_set)
+    col = {"rare": 0, "mythic": 1}
+
+    # wildcard_plan's phase 1 alternates mythic/rare crafts and stops at the first
+    # failed pick: with r rare and m mythic crafts possible, it makes min(m, r)
+    # protected rare picks and min(m, r + 1) protected mythic picks; the rest are forced.
+    sequences = {}
+
+    def needs_after(rarity, protected, n_crafts):
+        """Need count deltas after the first `n_crafts` picks (cumulative arrays per sequence)."""
+        key = (rarity, protected)
+        if key not in sequences:
+            seq = craft_sequence(missing_by_card, printings_by_card, craft_rarity_by_card, need_names_by_set,
+                                 pool_sizes, rarity, top_k, protected)
+            deltas = np.zeros((len(seq) + 1, len(engine.sets), 2))
+            left = dict(missing_by_card)
+            for step, name in enumerate(seq, 1):
+                deltas[step] = deltas[step - 1]
+                left[name] -= 1
+                if left[name] == 0:
+                    for s, rar in set(printings_by_card[name]):
+                        deltas[step, engine.index[s], col[rar]] -= 1
+            sequences[key] = deltas
+        return sequences[key][n_crafts]
+
+    needs = np.empty((len(rare_values), len(mythic_values), len(engine.sets), 2))
+    still_missing = np.empty((len(rare_values), len(mythic_values)), dtype=int)
+    for i, rare_wc in enumerate(rare_values):
+        r = min(rare_wc, totals["rare"])
+        for j, mythic_wc in enumerate(mythic_values):
+            m = min(mythic_wc, totals["mythic"])
+            rare_protected = None if r <= m else m
+            mythic_protected = None if m <= r + 1 else r + 1
+            needs[i, j] = base + needs_after("rare", rare_protected, r) + needs_after("mythic", mythic_protected, m)
+            still_missing[i, j] = totals["rare"] + totals["mythic"] - r - m
+
+    top_sets, evs = [], []
+    for golden in golden_values:
+        codes, ev = engine.best(engine.score(needs, golden_packs_per_std_pack=golden)["total"])
+        top_sets.append(codes)
+        evs.append(ev)
+    return np.array(top_sets, dtype=object), np.array(evs), still_missing
+
+
+def sweep_what_if(rare_values, mythic_values, golden_values=None, top_k_values=None, workers=None):
+    """
+    Top set and EV per pack for every grid point. The inputs are resolved once
+    (through the incremental run state); each top_k_protect value then computes
+    its rare and mythic craft sequences once, and every grid point's plan is a
+    prefix of one of them, so no grid point re-runs the planner. The top_k_protect
+    values are spread over a process pool. Returns one dict per grid point.
+    """
+    golden_values = golden_values or [GOLDEN_PACKS_PER_STD_PACK]
+    top_k_values = top_k_values or [TOP_K_PROTECT]
+    workers = SWEEP_WORKERS if workers is None else workers
+
+    run = IncrementalRun()
+    result = run.evaluate(verbose=False)
+    if not result["need_names_by_set"]:
+        return []
+    inputs = (result["missing_by_card"], result["printings_by_card"], result["craft_rarity_by_card"],
+              result["need_names_by_set"], {s: dict(v) for s, v in result["pool_sizes"].items()})
+    settings = {name: globals()[name] for name in configurable_settings()}
+    args = [(settings, inputs, run.arena_sets, k, rare_values, mythic_values, golden_values) for k in top_k_values]
+
+    with profile_phase("sweep"):
+        if workers == 1 or len(args) == 1:
+            parts = [_sweep_top_k(*a) for a in args]
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                parts = list(pool.map(_sweep_top_k, *zip(*args)))
+
+    rows = []
+    for top_k, (top_sets, evs, still_missing) in zip(top_k_values, parts):
+        for g, golden in enumerate(golden_values):
+            for i, rare_wc in enumerate(rare_values):
+                for j, mythic_wc in enumerate(mythic_values):
+                    rows.append({"top_k_protect": top_k, "golden_packs_per_std_pack": golden,
+                                 "rare_wildcards": rare_wc, "mythic_wildcards": mythic_wc,
+                                 "top_set": top_sets[g, i, j], "ev": float(evs[g, i, j]),
+                                 "copies_still_missing": int(still_missing[i, j])})
+    return rows
+
+
+def print_sweep(rows):
+    """One line per (top_k, golden rate, rare WC): runs of mythic WC counts sharing a top set."""
+    import itertools
+
+    if not rows:
+        print("🎉 No missing rares/mythics detected for Arena boosters in this deck.")
+        return
+    for (top_k, golden), block in itertools.groupby(
+            rows, key=lambda r: (r["top_k_protect"], r["golden_packs_per_std_pack"])):
+        print(f"\n📊 Top set and EV per pack by wildcards (top_k_protect={top_k}, "
+              f"golden packs per Standard pack={golden:g})")
+        for rare_wc, line in itertools.groupby(block, key=lambda r: r["rare_wildcards"]):
+            runs = []
+            for code, run in itertools.groupby(line, key=lambda r: r["top_set"]):
+                run = list(run)
+                lo, hi = run[0]["mythic_wildcards"], run[-1]["mythic_wildcards"]
+                ev_lo, ev_hi = min(r["ev"] for r in run), max(r["ev"] for r in run)
+                mythics = f"M {lo}" if lo == hi else f"M {lo}-{hi}"
+                ev = f"{100 * ev_lo:.2f}%" if ev_lo == ev_hi else f"{100 * ev_lo:.2f}-{100 * ev_hi:.2f}%"
+                runs.append(f"{mythics} {code.upper()} {ev}")
+            print(f"  R {rare_wc:>3}  " + " · ".join(runs))
+
+
+def write_sweep_csv(rows, path):
+    import csv
+
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.DictWriter(f, fieldnames=list(rows[0]) if rows else ["top_set"])
+        w.writeheader()
+        w.writerows(rows)
+
+
+# =======================
+# Batch mode (many decklists, one collection)
+# =======================
+def find_decklists(paths):
+    """Expand directories into the decklists they contain (skipping Excel lock files)."""
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            for f in sorted(os.listdir(path)):
+                if f.lower().endswith((".xlsx", ".csv", ".txt")) and not f.startswith("~$"):
+                    found.append(os.path.join(path, f))
+        else:
+            found.append(path)
+    return found
+
+
+def run_batch(deck_paths, owned_dict, priorities=None,
+              rare_wildcards=RARE_WILDCARDS, mythic_wildcards=MYTHIC_WILDCARDS, top_n=5):
+    """
+    Evaluate many decklists against one collection.
+    The union of missing card names is resolved once and pool sizes are fetched
+    once for the union of sets, so Scryfall traffic doesn't grow with the number
+    of decks. Each deck gets its own crafting plan and ranking; the aggregate
+    ranking averages each set's EV over the decks, weighted by deck priority
+    (default 1; a set a deck needs nothing from counts with its golden pack and
+    wildcard track EV only).
+    """
+    priorities = priorities or {}
     arena_sets = get_arena_sets()
-    deck_df, owned_dict = load_data()
+    deck_paths = find_decklists(deck_paths)
+
+    rows_by_deck = {}
+    with profile_phase("load_inputs"):
+        for path in deck_paths:
+            rows_by_deck[path] = missing_rows(load_decklist(path), owned_dict)
+
+    all_names = list(dict.fromkeys(name for rows in rows_by_deck.values() for name, _ in rows))
+    print(f"🔍 Resolving {len(all_names)} distinct missing cards across {len(deck_paths)} decks...")
+    prints_by_name = resolve_arena_printings(all_names, arena_sets)
+
+    needs_by_deck = {path: needs_from_rows(rows, prints_by_name, verbose=False)
+                     for path, rows in rows_by_deck.items()}
+    union_sets = {}
+    for _, _, _, need_names_by_set in needs_by_deck.values():
+        for set_code in need_names_by_set:
+            union_sets.setdefault(set_code, None)
+    pool_sizes = compute_pool_sizes(union_sets)
+
+    results = {}
+    weighted = defaultdict(float)
+    total_weight = 0.0
+    for path, (missing_by_card, printings_by_card, craft_rarity_by_card, need_names_by_set) in needs_by_deck.items():
+        deck_name = os.path.splitext(os.path.basename(path))[0]
+        weight = float(priorities.get(deck_name, priorities.get(path, 1.0)))
+        total_weight += weight
+        if not need_names_by_set:
+            results[path] = {"deck": deck_name, "weight": weight, "ranked": [], "usage_log": []}
+            for set_code in union_sets:
+                if set_code in arena_sets:
+                    weighted[set_code] += weight * wildcard_ev_per_pack(set_code in STANDARD_OR_ALCHEMY_LEGAL_SETS)
+            continue
+
+        with profile_phase("wildcard_plan"):
+            missing_after, need_after, usage_log = wildcard_plan(
+                missing_by_card.copy(),
+                printings_by_card,
+                craft_rarity_by_card,
+                copy_needs(need_names_by_set),
+                pool_sizes,
+                rare_wildcards,
+                mythic_wildcards,
+                top_k_protect=TOP_K_PROTECT
+            )
+        with profile_phase("rank_sets"):
+            ranked = [(s, ev) for s, ev in rank_sets(need_after, pool_sizes, arena_sets)
+                      if need_after[s]["rare"] or need_after[s]["mythic"]]
+        results[path] = {"deck": deck_name, "weight": weight, "ranked": ranked, "usage_log": usage_log}
+        if EXPECTED_PACKS:
+            with profile_phase("expected_packs"):
+                results[path]["expected_packs"] = {
+                    s: expected_packs_to_completion(s, missing_after, printings_by_card, craft_rarity_by_card,
+                                                    pool_sizes)["mean"]
+                    for s, _ in ranked[:top_n]
+                }
+
+        # Sets this deck needs nothing from still earn golden pack / wildcard track EV
+        ev_by_set = dict(ranked)
+        gp_per_pack = per_pack_golden_bonus(need_after, pool_sizes)
+        for set_code in union_sets:
+            if set_code in arena_sets and set_code not in ev_by_set:
+                is_std = set_code in STANDARD_OR_ALCHEMY_LEGAL_SETS
+                ev_by_set[set_code] = (gp_per_pack if is_std else 0.0) + wildcard_ev_per_pack(is_std)
+        for set_code, ev in ev_by_set.items():
+            weighted[set_code] += weight * ev
+
+    aggregate = sorted(
+        ((s, v / total_weight) for s, v in weighted.items()),
+        key=lambda kv: (-round(kv[1], 9), -STD_ROTATION_PRIORITY.get(kv[0], float("inf"))),
+    ) if total_weight > 0 else []
+
+    for path in deck_paths:
+        res = results[path]
+        print(f"\n📋 {res['deck']} (priority {res['weight']:g})")
+        if not res["ranked"]:
+            print("   🎉 Nothing missing for Arena boosters.")
+        for set_code, ev in res["ranked"][:top_n]:
+            packs = res.get("expected_packs", {}).get(set_code)
+            print(f"   {arena_sets[set_code]} ({set_code.upper()}): total≈{100.0 * ev:.2f}%"
+                  + (f"  |  ≈{packs:.0f} packs to finish" if packs is not None else ""))
+
+    print("\n📦 Aggregate ranking (priority-weighted average EV per pack)")
+    for set_code, ev in aggregate[:max(top_n, 10)]:
+        print(f"   {arena_sets[set_code]} ({set_code.upper()}): {100.0 * ev:.2f}%")
+
+    return {"decks": results, "aggregate": aggregate, "pool_sizes": pool_sizes}
+
+
+# =======================
+# Fleet mode (one workbook per player, shared catalog, process pool)
+# =======================
+FLEET_WORKERS = None              # process pool size (None = all cores, 1 = no pool)
+FLEET_OUTPUT_DIR = "fleet_results"
+FLEET_MMAP_BYTES = 256 * 1024 * 1024   # how much of the shared catalog a worker maps instead of reading
+
+
+def read_player_workbook(path):
+    """
+    (deck rows, owned dict, wildcards) of one player's workbook: the Decklist
+    (+ Sideboard when SEARCH_SIDEBOARD is on), Have and an optional Wildcards
+    sheet, a Name/Qty sheet with "Rare" and "Mythic" rows. Counts it doesn't
+    give fall back to RARE_WILDCARDS / MYTHIC_WILDCARDS.
+    """
+    sheets = load_input_file(path)
+    deck_rows = list(sheets.get("Decklist", []))
+    if SEARCH_SIDEBOARD:
+        deck_rows += sheets.get("Sideboard", [])
+    counts = {str(name).strip().lower(): qty for name, qty in sheets.get("Wildcards", [])}
+    wildcards = {"rare": int(counts.get("rare", RARE_WILDCARDS)),
+                 "mythic": int(counts.get("mythic", MYTHIC_WILDCARDS))}
+    return deck_rows, dict(sheets.get("Have", [])), wildcards
+
+
+class SharedCatalog:
+    """
+    What every player's run needs from Scryfall, in one read-only SQLite file:
+    the Arena printings of all players' missing cards, the pool sizes of their
+    sets and the Arena set list. The parent writes it once; worker processes
+    open it memory-mapped and only read the rows their player needs, so neither
+    Scryfall traffic nor per-worker memory grows with the number of players.
+    """
+
+    def __init__(self, path):
+        import pathlib
+        import sqlite3
+
+        self.path = path
+        uri = pathlib.Path(path).resolve().as_uri() + "?mode=ro&immutable=1"
+        self._db = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        self._db.execute(f"PRAGMA mmap_size = {int(FLEET_MMAP_BYTES)}")
+        self.arena_sets = json.loads(self._db.execute("SELECT value FROM meta WHERE key = 'arena_sets'").fetchone()[0])
+
+    @staticmethod
+    def write(path, prints_by_name, pool_sizes, arena_sets):
+        import sqlite3
+
+        tmp = path + ".tmp"
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        db = sqlite3.connect(tmp)
+        try:
+            db.execute("CREATE TABLE printings (name TEXT PRIMARY KEY, prints TEXT) WITHOUT ROWID")
+            db.execute("CREATE TABLE pools (set_code TEXT PRIMARY KEY, rare INTEGER, mythic INTEGER) WITHOUT ROWID")
+            db.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT) WITHOUT ROWID")
+            db.executemany("INSERT INTO printings VALUES (?, ?)",
+                           ((name, json.dumps(prints)) for name, prints in prints_by_name.items()))
+            db.executemany("INSERT INTO pools VALUES (?, ?, ?)",
+                           ((s, p["rare"], p["mythic"]) for s, p in pool_sizes.items()))
+            db.execute("INSERT INTO meta VALUES ('arena_sets', ?)", (json.dumps(arena_sets),))
+            db.commit()
+        finally:
+            db.close()
+        os.replace(tmp, path)
+
+    def printings(self, names):
+        """{name: [(set_code, rarity), ...]} for the names the catalog knows."""
+        names = list(dict.fromkeys(names))
+        out = {}
+        for i in range(0, len(names), 500):
+            chunk = names[i:i + 500]
+            query = f"SELECT name, prints FROM printings WHERE name IN ({', '.join('?' * len(chunk))})"
+            for name, prints in self._db.execute(query, chunk):
+                out[name] = [tuple(p) for p in json.loads(prints)]
+        return out
+
+    def pool_sizes(self, set_codes):
+        pool_sizes = defaultdict(lambda: {"rare": 0, "mythic": 0})
+        set_codes = list(set_codes)
+        for i in range(0, len(set_codes), 500):
+            chunk = set_codes[i:i + 500]
+            query = f"SELECT set_code, rare, mythic FROM pools WHERE set_code IN ({', '.join('?' * len(chunk))})"
+            for set_code, rare, mythic in self._db.execute(query, chunk):
+                pool_sizes[set_code] = {"rare": rare, "mythic": mythic}
+        return pool_sizes
+
 
-    # Build needs
-    missing_by_card, printings_by_card, craft_rarity_by_card, need_names_by_set = build_needs(
-        deck_df, owned_dict, arena_sets
+_SHARED_CATALOGS = {}
+
+
+def _fleet_read(path):
+    """Missing rows and wildcards of one player. Runs in a worker process."""
+    try:
+        deck_rows, owned, wildcards = read_player_workbook(path)
+        return {"rows": missing_rows(deck_rows, owned), "wildcards": wildcards}
+    except Exception as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+
+
+def fleet_player_names(paths):
+    """
+    Output name of each workbook: its file name without the extension, plus a
+    short hash of its full path when workbooks in different folders share it
+    (compared case-insensitively, as some file systems do).
+    """
+    names = [os.path.splitext(os.path.basename(p))[0] for p in paths]
+    counts = defaultdict(int)
+    for name in names:
+        counts[name.casefold()] += 1
+    return [f"{name}-{hashlib.sha1(os.path.abspath(p).encode('utf-8')).hexdigest()[:8]}"
+            if counts[name.casefold()] > 1 else name
+            for name, p in zip(names, paths)]
+
+
+def _fleet_player(catalog_path, path, player, player_input, out_dir, top_n):
+    """
+    build_needs -> wildcard_plan -> rank_sets for one player against the shared
+    catalog; writes <player>.json to `out_dir` and returns a short summary.
+    Runs in a worker process.
+    """
+    start = time.perf_counter()
+    if "error" in player_input:
+        return {"player": player, "error": player_input["error"]}
+
+    if catalog_path not in _SHARED_CATALOGS:
+        _SHARED_CATALOGS[catalog_path] = SharedCatalog(catalog_path)
+    catalog = _SHARED_CATALOGS[catalog_path]
+    rows, wildcards = player_input["rows"], player_input["wildcards"]
+
+    prints_by_name = catalog.printings(name for name, _ in rows)
+    missing_by_card, printings_by_card, craft_rarity_by_card, need_names_by_set = needs_from_rows(
+        rows, prints_by_name, verbose=False
+    )
+    pool_sizes = catalog.pool_sizes(need_names_by_set)
+    missing_after, need_after, usage_log = wildcard_plan(
+        missing_by_card.copy(),
+        printings_by_card,
+        craft_rarity_by_card,
+        copy_needs(need_names_by_set),
+        pool_sizes,
+        wildcards["rare"],
+        wildcards["mythic"],
+        top_k_protect=TOP_K_PROTECT
     )
+    ranked = rank_sets(need_after, pool_sizes, catalog.arena_sets)[:top_n] if need_names_by_set else []
+
+    result = {
+        "player": player,
+        "workbook": os.path.abspath(path),
+        "wildcards": wildcards,
+        "ranked": [{"set": s, "name": catalog.arena_sets.get(s, s), "ev": ev} for s, ev in ranked],
+        "usage_log": usage_log,
+        "crafting": compress_crafting_log_global(usage_log),
+        "still_missing": sorted(n for n, m in missing_after.items() if m > 0),
+        "unresolved": [n for n, _ in rows if n not in prints_by_name],
+    }
+    if EXPECTED_PACKS:
+        result["expected_packs"] = {
+            s: expected_packs_to_completion(s, missing_after, printings_by_card, craft_rarity_by_card,
+                                            pool_sizes)["mean"]
+            for s, _ in ranked
+        }
+    out_path = os.path.join(out_dir, f"{player}.json")
+    with open(out_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    os.replace(out_path + ".tmp", out_path)
+
+    return {"player": player, "out": out_path, "top": ranked[0] if ranked else None,
+            "still_missing": len(result["still_missing"]), "elapsed_ms": 1000.0 * (time.perf_counter() - start)}
+
+
+def run_fleet(paths, out_dir=None, workers=None, top_n=5):
+    """
+    Evaluate many players, each with their own workbook (decklist, collection
+    and wildcards). Workbooks are read on a process pool; the union of missing
+    cards is resolved and the pool sizes of their sets fetched once, in this
+    process, and written to a SharedCatalog; each player's needs, crafting plan
+    and ranking then run on the pool against it. One JSON result per player is
+    written to `out_dir`. Returns the per-player summaries.
+    """
+    start = time.perf_counter()
+    out_dir = out_dir or FLEET_OUTPUT_DIR
+    workers = FLEET_WORKERS if workers is None else workers
+    arena_sets = get_arena_sets()
+    workbooks = [p for p in find_decklists(paths) if p.lower().endswith((".xlsx", ".xlsm"))]
+    if not workbooks:
+        print("⚠️ No player workbooks found.")
+        return []
+    os.makedirs(out_dir, exist_ok=True)
+    catalog_path = os.path.join(out_dir, ".shared_catalog.sqlite")
+
+    pool, chunksize = None, 1
+    n_workers = min(workers or os.cpu_count() or 1, len(workbooks))
+    if n_workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        # Workers get this process's settings; a few players per task keeps the IPC overhead down
+        settings = {name: globals()[name] for name in configurable_settings()}
+        pool = ProcessPoolExecutor(max_workers=n_workers, initializer=apply_config, initargs=(settings,))
+        chunksize = max(1, len(workbooks) // (4 * n_workers))
+    mapper = (lambda func, *iterables: pool.map(func, *iterables, chunksize=chunksize)) if pool else map
+    try:
+        with profile_phase("load_inputs"):
+            inputs = list(mapper(_fleet_read, workbooks))
+        all_names = list(dict.fromkeys(name for inp in inputs for name, _ in inp.get("rows", ())))
+        print(f"🔍 Resolving {len(all_names)} distinct missing cards for {len(workbooks)} players...")
+        prints_by_name = resolve_arena_printings(all_names, arena_sets)
+        union_sets = dict.fromkeys(s for prints in prints_by_name.values() for s, _ in prints)
+        pool_sizes = compute_pool_sizes(union_sets)
+        SharedCatalog.write(catalog_path, prints_by_name, pool_sizes, arena_sets)
+
+        n = len(workbooks)
+        with profile_phase("players"):
+            summaries = list(mapper(_fleet_player, [catalog_path] * n, workbooks, fleet_player_names(workbooks),
+                                    inputs, [out_dir] * n, [top_n] * n))
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        if os.path.exists(catalog_path):
+            os.remove(catalog_path)
+
+    for s in summaries:
+        if "error" in s:
+            print(f"❌ {s['player']}: {s['error']}")
+        elif s["top"] is None:
+            print(f"🎉 {s['player']}: nothing missing for Arena boosters")
+        else:
+            set_code, ev = s["top"]
+            print(f"👤 {s['player']}: {arena_sets[set_code]} ({set_code.upper()}) total≈{100.0 * ev:.2f}%"
+                  f"  |  {s['still_missing']} cards still missing after crafting")
+    ok = sum(1 for s in summaries if "error" not in s)
+    print(f"\n💾 {ok} of {len(summaries)} player results written to {out_dir} "
+          f"in {time.perf_counter() - start:.1f}s")
+    return summaries
+
+
+# =======================
+# Server mode
+# =======================
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8765
+
+
+def _request_rows(value, sideboard=False):
+    """[(name, qty), ...] from a JSON request field: [[name, qty], ...], {name: qty} or MTGA text."""
+    if value is None:
+        return []
+    if isinstance(value, str):
+        sections = parse_mtga_text(value.splitlines())
+        return sections["Decklist"] + (sections["Sideboard"] if sideboard else [])
+    if isinstance(value, dict):
+        value = value.items()
+    return [(str(name).strip(), int(qty)) for name, qty in value]
+
+
+class RecommendationService:
+    """
+    Warm state for repeated recommendations: the Arena set list, the parsed
+    collection, resolved printings and pool sizes stay in memory, so a request
+    whose cards were seen before touches neither Scryfall nor the disk.
+    Cache fills are serialised by a lock; planning and ranking only read the
+    shared state, so requests are otherwise handled concurrently.
+    """
+
+    def __init__(self, collection_path=None):
+        self.collection_path = collection_path or COLLECTION_PATH or EXCEL_PATH
+        self.arena_sets = get_arena_sets()
+        self._fill_lock = threading.Lock()
+        self._owned_lock = threading.Lock()
+        self._owned = None
+        self._owned_mtime = None
+        self._prints = {}
+        self._pools = {}
+
+    def owned(self):
+        """The server's collection, re-read when its file changes."""
+        try:
+            mtime = os.stat(self.collection_path).st_mtime_ns
+        except OSError:
+            mtime = None
+        with self._owned_lock:
+            if self._owned is None or mtime != self._owned_mtime:
+                self._owned = load_owned(self.collection_path) if mtime is not None else {}
+                self._owned_mtime = mtime
+            return self._owned
+
+    def printings(self, names):
+        """Arena printings for `names`, resolving only the ones not seen before."""
+        todo = [n for n in dict.fromkeys(names) if n not in self._prints]
+        if todo:
+            with self._fill_lock:
+                # Another request may have resolved them while we waited
+                todo = [n for n in todo if n not in self._prints]
+                if todo:
+                    self._prints.update(resolve_arena_printings(todo, self.arena_sets))
+        return {n: self._prints[n] for n in names if n in self._prints}
+
+    def pool_sizes(self, set_codes):
+        """Pool sizes for `set_codes`, as a per-request copy of the shared cache."""
+        todo = [s for s in set_codes if s not in self._pools]
+        if todo:
+            with self._fill_lock:
+                todo = [s for s in todo if s not in self._pools]
+                if todo:
+                    self._pools.update(compute_pool_sizes(dict.fromkeys(todo)))
+        pool_sizes = defaultdict(lambda: {"rare": 0, "mythic": 0})
+        pool_sizes.update((s, self._pools[s]) for s in set_codes)
+        return pool_sizes
+
+    def recommend(self, request):
+        """
+        Rank sets and plan wildcards for one request:
+          {"decklist": [[name, qty], ...] | {name: qty} | "MTGA export text",
+           "owned": same formats (optional, defaults to the server's collection),
+           "rare_wildcards": int, "mythic_wildcards": int,
+           "top_k_protect": int, "top_n": int, "sideboard": bool}
+        """
+        start = time.perf_counter()
+        sideboard = bool(request.get("sideboard", SEARCH_SIDEBOARD))
+        deck_rows = _request_rows(request.get("decklist"), sideboard)
+        owned = dict(_request_rows(request["owned"])) if request.get("owned") is not None else self.owned()
+        rare_wildcards = int(request.get("rare_wildcards", RARE_WILDCARDS))
+        mythic_wildcards = int(request.get("mythic_wildcards", MYTHIC_WILDCARDS))
+        top_k_protect = int(request.get("top_k_protect", TOP_K_PROTECT))
+        top_n = request.get("top_n")
+
+        rows = missing_rows(deck_rows, owned)
+        prints_by_name = self.printings([name for name, _ in rows])
+        missing_by_card, printings_by_card, craft_rarity_by_card, need_names_by_set = needs_from_rows(
+            rows, prints_by_name, verbose=False
+        )
+        pool_sizes = self.pool_sizes(list(need_names_by_set))
+
+        missing_after, need_after, usage_log = wildcard_plan(
+            missing_by_card.copy(),
+            printings_by_card,
+            craft_rarity_by_card,
+            copy_needs(need_names_by_set),
+            pool_sizes,
+            rare_wildcards,
+            mythic_wildcards,
+            top_k_protect=top_k_protect
+        )
+        ranked = rank_sets(need_after, pool_sizes, self.arena_sets) if need_names_by_set else []
+        if top_n is not None:
+            ranked = ranked[:int(top_n)]
+
+        return {
+            "ranked": [{"set": s, "name": self.arena_sets.get(s, s), "ev": ev} for s, ev in ranked],
+            "usage_log": usage_log,
+            "crafting": compress_crafting_log_global(usage_log),
+            "still_missing": sorted(n for n, m in missing_after.items() if m > 0),
+            "unresolved": [n for n, _ in rows if n not in prints_by_name],
+            "corrected": {n: _NAME_CORRECTIONS[n][0] for n, _ in rows
+                          if n in prints_by_name and n in _NAME_CORRECTIONS},
+            "elapsed_ms": 1000.0 * (time.perf_counter() - start),
+        }
+
+    def status(self):
+        cache = get_http_cache()
+        return {
+            "collection": self.collection_path,
+            "cards": len(self._prints),
+            "sets": len(self._pools),
+            "http_cache": cache.stats() if cache is not None else None,
+        }
+
+
+def make_server(service, host=SERVER_HOST, port=SERVER_PORT):
+    """
+    Threaded HTTP/JSON front end for a RecommendationService:
+      POST /recommend  -> service.recommend(request body)
+      GET  /health     -> service.status()
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"      # keep-alive between requests
+        disable_nagle_algorithm = True     # headers and body go out as separate writes
+
+        def _reply(self, status, body):
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._reply(200, service.status())
+            else:
+                self._reply(404, {"error": f"unknown endpoint {self.path}"})
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            body = self.rfile.read(length)
+            if self.path != "/recommend":
+                self._reply(404, {"error": f"unknown endpoint {self.path}"})
+                return
+            try:
+                request = json.loads(body or b"{}")
+                if not isinstance(request, dict):
+                    raise ValueError("request body must be a JSON object")
+                self._reply(200, service.recommend(request))
+            except (ValueError, TypeError, KeyError) as e:
+                self._reply(400, {"error": str(e)})
+            except Exception as e:
+                # A bug or a failed lookup must not drop the connection without a reply
+                import traceback
+                print(f"⚠️ /recommend failed: {type(e).__name__}: {e}")
+                traceback.print_exc()
+                self._reply(500, {"error": f"internal error: {type(e).__name__}"})
+
+        def log_message(self, format, *args):
+            pass  # one line per request would dominate the warm path
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    return server
+
 
+def serve(host=SERVER_HOST, port=SERVER_PORT, collection_path=None):
+    load_catalog(CATALOG_PATH, BULK_DATA_PATH)
+    service = RecommendationService(collection_path)
+    owned = service.owned()
+    print(f"📥 Collection loaded: {len(owned)} cards from {service.collection_path}")
+    server = make_server(service, host, port)
+    print(f"🚀 Serving recommendations on http://{host}:{server.server_address[1]}/recommend (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+# =======================
+# Main
+# =======================
+def main():
+    with profile_phase("load_catalog"):
+        load_catalog(CATALOG_PATH, BULK_DATA_PATH)
+    # Inputs, needs, pools, plan and ranking; only what changed since the last run is recomputed
+    run = IncrementalRun()
+    arena_sets = run.arena_sets
+    # The budget planner and the exact optimizer weigh every set, so they need every pool size
+    result = run.evaluate(top_k=None if PACK_BUDGET > 0 or WILDCARD_OPTIMIZER else RANK_TOP_K)
+    if not result["first_run"]:
+        print(f"♻️  Since the last run: {describe_changes(result)}")
+    if result["skipped_sets"]:
+        print(f"🔭 Ranking the top {RANK_TOP_K} sets only: pool sizes of {len(result['skipped_sets'])} "
+              f"sets that can't reach it were not fetched")
+    elif RANK_TOP_K > 0 and result["need_names_by_set"] and result.get("top_k") is None:
+        print("ℹ️  Ranking every set: crafting wildcards, --pack-budget and --exact need every pool size")
+
+    need_names_by_set = result["need_names_by_set"]
     if not need_names_by_set:
         print("🎉 No missing rares/mythics detected for Arena boosters in this deck.")
         return
 
-    # Pools
-    pool_sizes = compute_pool_sizes(need_names_by_set)
+    pool_sizes = result["pool_sizes"]
+    printings_by_card = result["printings_by_card"]
+    craft_rarity_by_card = result["craft_rarity_by_card"]
 
     # If you want to know what is best without considering wildcard usage, uncomment these lines
 
@@ -589,42 +4273,333 @@ def main():
     # print_recommendations(ranked_before, need_names_by_set, pool_sizes, arena_sets,
     #                       "Recommended sets to open (before crafting)")
 
-    # Wildcard plan (preserve EV in top sets)
-    missing_after, need_after, usage_log = wildcard_plan(
-        missing_by_card.copy(),
-        printings_by_card,
-        craft_rarity_by_card,
-        {s: {"rare": set(need_names_by_set[s]["rare"]),
-             "mythic": set(need_names_by_set[s]["mythic"])}
-         for s in need_names_by_set},
-        pool_sizes,
-        RARE_WILDCARDS,
-        MYTHIC_WILDCARDS,
-        top_k_protect=3
+    # Wildcard plan (preserve EV in top sets) and ranking after it
+    missing_after, need_after, usage_log = result["missing_after"], result["need_after"], result["usage_log"]
+    ranked_after = result["ranked"]
+
+    if WILDCARD_OPTIMIZER:
+        with profile_phase("exact_plan"):
+            report = optimal_wildcard_plan(
+                result["missing_by_card"], printings_by_card, craft_rarity_by_card, need_names_by_set,
+                pool_sizes, arena_sets, RARE_WILDCARDS, MYTHIC_WILDCARDS, need_after,
+            )
+        if report is not None:
+            print_optimizer_report(report, arena_sets)
+            if report["plan"] is not None:
+                missing_after, need_after, usage_log = report["plan"]
+                ranked_after = rank_sets(need_after, pool_sizes, arena_sets)
+
+    with profile_phase("report"):
+        print_recommendations(ranked_after, need_after, pool_sizes, arena_sets,
+                          "Recommended sets to open (after crafting plan)", missing_after)
+
+        # Crafting log
+        print("\n🎯 Suggested wildcard usage order (aiming not to eliminate targets in top sets):")
+        compressed_log = compress_crafting_log_global(usage_log)
+        if compressed_log:
+            for line in compressed_log:
+                print(" ", line)
+        else:
+            print(" - No wildcard crafting suggested or no candidates available with given wildcards.")
+
+        # Any cards still missing (by name)
+        still_missing = sorted([n for n, m in missing_after.items() if m > 0])
+        if still_missing:
+            print("\n🧩 Cards still missing after crafting plan (by name):")
+            print(", ".join(still_missing))
+
+    if PACK_BUDGET > 0:
+        with profile_phase("budget_plan"):
+            print_budget_plan(optimize_pack_budget(need_after, pool_sizes, arena_sets, budget_packs=PACK_BUDGET,
+                                                   missing_by_card=missing_after), arena_sets)
+
+    if EXPECTED_PACKS and still_missing:
+        print("\n📐 Expected packs to finish the deck (closed form):")
+        for set_code, _ in ranked_after[:SIMULATE_TOP_SETS]:
+            with profile_phase("expected_packs"):
+                result = expected_packs_to_completion(set_code, missing_after, printings_by_card,
+                                                      craft_rarity_by_card, pool_sizes)
+            print_expected_packs(result, arena_sets)
+
+    if SIMULATE_TRIALS > 0 and still_missing:
+        print(f"\n🎲 Simulated packs to finish the deck ({SIMULATE_TRIALS} trials per set):")
+        for set_code, _ in ranked_after[:SIMULATE_TOP_SETS]:
+            with profile_phase("simulation"):
+                result = simulate_packs_to_completion(
+                    set_code, missing_after, printings_by_card, craft_rarity_by_card, pool_sizes,
+                    n_trials=SIMULATE_TRIALS, seed=SIMULATION_SEED, max_packs=SIMULATION_MAX_PACKS,
+                    workers=SIMULATION_WORKERS, batch_size=SIMULATION_BATCH,
+                )
+            print_simulation(result, arena_sets)
+
+    cache = get_http_cache()
+    if cache is not None:
+        cache.flush()
+        st = cache.stats()
+        print(f"\n🗄️  Scryfall cache: {st['hits']} hits, {st['misses']} misses "
+              f"({100.0 * st['hit_rate']:.0f}% hit rate, {st['evictions']} evicted)")
+
+
+# =======================
+# Command line
+# =======================
+# Settings file read before the command line flags (any Config global, lower or upper case)
+DEFAULT_CONFIG_PATH = "best_pack.json"
+
+# Recomputed from the other settings, never set directly
+_DERIVED_SETTINGS = {"GOLDEN_EXPECTED_RARES", "GOLDEN_MYTHIC_RATE_PER_SLOT", "STD_ROTATION_PRIORITY"}
+
+
+def configurable_settings():
+    """Names of the module settings a config file or --set can change."""
+    return sorted(
+        name for name, value in globals().items()
+        if name.isupper() and not name.startswith("_") and name not in _DERIVED_SETTINGS
+        and name != "DEFAULT_CONFIG_PATH"
+        and (value is None or isinstance(value, (bool, int, float, str, list, dict, set)))
     )
 
-    # Rank after crafting plan
-    ranked_after = rank_sets(need_after, pool_sizes, arena_sets)
-    print_recommendations(ranked_after, need_after, pool_sizes, arena_sets,
-                      "Recommended sets to open (after crafting plan)", missing_after)
 
-    # Crafting log
-    print("\n🎯 Suggested wildcard usage order (aiming not to eliminate targets in top sets):")
-    compressed_log = compress_crafting_log_global(usage_log)
-    if compressed_log:
-        for line in compressed_log:
-            print(" ", line)
-    else:
-        print(" - No wildcard crafting suggested or no candidates available with given wildcards.")
+def apply_config(settings):
+    """
+    Override module settings from a {name: value} mapping (e.g. a parsed config file).
+    Unknown names raise ValueError; derived settings are recomputed afterwards.
+    """
+    g = globals()
+    allowed = set(configurable_settings())
+    for key, value in settings.items():
+        name = str(key).upper()
+        if name not in allowed:
+            raise ValueError(f"Unknown setting '{key}'")
+        if isinstance(g[name], set) and isinstance(value, list):
+            value = set(value)
+        g[name] = value
+
+    g["GOLDEN_EXPECTED_RARES"] = GOLDEN_PACK_SLOTS_TOTAL - GOLDEN_EXPECTED_MYTHICS
+    g["GOLDEN_MYTHIC_RATE_PER_SLOT"] = GOLDEN_EXPECTED_MYTHICS / GOLDEN_PACK_SLOTS_TOTAL
+    g["STD_ROTATION_PRIORITY"] = {code: i for i, code in enumerate(STANDARD_OR_ALCHEMY_LEGAL_SETS)}
+
+
+def load_config_file(path):
+    with open(path, encoding="utf-8") as f:
+        settings = json.load(f)
+    if not isinstance(settings, dict):
+        raise ValueError(f"{path}: expected a JSON object of settings")
+    return settings
+
+
+def _setting_arg(text):
+    """KEY=VALUE, the value parsed as JSON when possible (so 5, true, null and [..] work)."""
+    key, sep, raw = text.partition("=")
+    if not sep or not key:
+        import argparse
+        raise argparse.ArgumentTypeError(f"expected KEY=VALUE, got '{text}'")
+    try:
+        return key.strip(), json.loads(raw)
+    except ValueError:
+        return key.strip(), raw
+
+
+def build_arg_parser():
+    import argparse
+
+    # Shared options, accepted before or after the command. SUPPRESS keeps a
+    # subcommand's unset flags from overwriting the ones given before it.
+    common = argparse.ArgumentParser(add_help=False, argument_default=argparse.SUPPRESS)
+    common.add_argument("--config", metavar="FILE",
+                        help=f"JSON settings file (default: {DEFAULT_CONFIG_PATH} when present)")
+    common.add_argument("--set", dest="settings", metavar="KEY=VALUE", type=_setting_arg, action="append",
+                        help="override any setting, e.g. --set golden_packs_per_std_pack=0.125")
+    common.add_argument("--excel", dest="EXCEL_PATH", metavar="FILE", help="workbook with Decklist/Have sheets")
+    common.add_argument("--deck", dest="DECKLIST_PATH", metavar="FILE", help="decklist file (.xlsx, .csv, .txt)")
+    common.add_argument("--collection", dest="COLLECTION_PATH", metavar="FILE",
+                        help="collection file (.xlsx, .csv, .txt or Arena's Player.log)")
+    common.add_argument("-r", "--rare-wildcards", dest="RARE_WILDCARDS", type=int, metavar="N",
+                        help=f"rare wildcards you have (default {RARE_WILDCARDS})")
+    common.add_argument("-m", "--mythic-wildcards", dest="MYTHIC_WILDCARDS", type=int, metavar="N",
+                        help=f"mythic wildcards you have (default {MYTHIC_WILDCARDS})")
+    common.add_argument("--rank-top", dest="RANK_TOP_K", type=int, metavar="K",
+                        help="rank only the best K sets, skipping pool queries for sets that can't reach them")
+    common.add_argument("--protect", dest="TOP_K_PROTECT", type=int, metavar="K",
+                        help="number of top sets whose EV the wildcard plan protects")
+    common.add_argument("--exact", dest="WILDCARD_OPTIMIZER", action="store_true",
+                        help="replace the greedy crafting plan with the allocation that maximizes the best set's EV")
+    common.add_argument("--latest-set", dest="LATEST_STANDARD_SET", metavar="CODE",
+                        help="latest Standard set (gets the dedicated golden pack slots)")
+    common.add_argument("--sideboard", dest="SEARCH_SIDEBOARD", action="store_true", help="include the sideboard")
+    common.add_argument("--pack-budget", dest="PACK_BUDGET", type=int, metavar="N",
+                        help="also plan which N packs to buy")
+    common.add_argument("--expected-packs", dest="EXPECTED_PACKS", action="store_true",
+                        help="also compute the expected packs to finish the deck for the top sets (closed form)")
+    common.add_argument("--simulate", dest="SIMULATE_TRIALS", type=int, metavar="TRIALS",
+                        help="also simulate packs-to-completion for the top sets")
+    common.add_argument("--seed", dest="SIMULATION_SEED", type=int, metavar="N", help="simulation seed")
+    common.add_argument("--no-http-cache", dest="HTTP_CACHE_PATH", action="store_const", const=None,
+                        help="don't read or write the Scryfall response cache")
+    common.add_argument("--profile", dest="PROFILE_PATH", metavar="FILE.json",
+                        help="write per-phase timings and Scryfall request accounting as JSON")
+    cassette = common.add_mutually_exclusive_group()
+    cassette.add_argument("--record", dest="CASSETTE_RECORD_PATH", metavar="FILE.json.gz",
+                          help="record every Scryfall request and response of the run to a cassette")
+    cassette.add_argument("--replay", dest="CASSETTE_REPLAY_PATH", metavar="FILE.json.gz",
+                          help="answer Scryfall requests from a recorded cassette (offline, no sleeps)")
+
+    parser = argparse.ArgumentParser(
+        prog="best_pack.py", parents=[common],
+        description="Rank MTG Arena booster sets by expected missing rares/mythics for a decklist.",
+    )
+    commands = parser.add_subparsers(dest="command", metavar="COMMAND")
+
+    commands.add_parser("run", parents=[common], help="rank sets and plan wildcards (default)")
 
+    p = commands.add_parser("watch", parents=[common], help="re-rank whenever the decklist or collection is saved")
+    p.add_argument("--interval", dest="WATCH_INTERVAL", type=float, metavar="SECONDS",
+                   help=f"how often the input files are checked (default {WATCH_INTERVAL})")
 
+    p = commands.add_parser("sweep", parents=[common], help="top set and EV over a grid of wildcard counts")
+    p.add_argument("--rare", default="0:60", metavar="GRID", help="rare wildcard counts, e.g. 0:60, 0:60:5 or 5,10,20")
+    p.add_argument("--mythic", default="0:25", metavar="GRID", help="mythic wildcard counts (default 0:25)")
+    p.add_argument("--golden", metavar="LIST", help="GOLDEN_PACKS_PER_STD_PACK values, e.g. 0.05,0.1,0.125")
+    p.add_argument("--top-k", metavar="LIST", help="top_k_protect values, e.g. 1,3,5")
+    p.add_argument("--workers", dest="SWEEP_WORKERS", type=int, metavar="N", help="process pool size")
+    p.add_argument("--out", metavar="FILE.csv", help="also write every grid point as CSV")
 
-    # Any cards still missing (by name)
-    still_missing = sorted([n for n, m in missing_after.items() if m > 0])
-    if still_missing:
-        print("\n🧩 Cards still missing after crafting plan (by name):")
-        print(", ".join(still_missing))
+    p = commands.add_parser("batch", parents=[common], help="evaluate many decklists against one collection")
+    p.add_argument("decks", nargs="+", help="decklist files or directories")
+    p.add_argument("--priority", action="append", default=[], metavar="DECK=WEIGHT",
+                   help="weight of a deck in the aggregate ranking (default 1)")
+    p.add_argument("--top", type=int, default=5, metavar="N", help="sets shown per deck")
+
+    p = commands.add_parser("fleet", parents=[common], help="evaluate many players, one workbook each")
+    p.add_argument("workbooks", nargs="+", help="player workbooks (.xlsx) or directories of them")
+    p.add_argument("--out", dest="FLEET_OUTPUT_DIR", metavar="DIR",
+                   help=f"where the per-player JSON results go (default {FLEET_OUTPUT_DIR})")
+    p.add_argument("--workers", dest="FLEET_WORKERS", type=int, metavar="N", help="process pool size")
+    p.add_argument("--top", type=int, default=5, metavar="N", help="sets kept per player")
+
+    p = commands.add_parser("serve", parents=[common], help="local HTTP/JSON recommendation server")
+    p.add_argument("collection_file", nargs="?", help="collection to serve (default: --collection / Have sheet)")
+    p.add_argument("--host", dest="SERVER_HOST", default=argparse.SUPPRESS)
+    p.add_argument("--port", dest="SERVER_PORT", type=int, default=argparse.SUPPRESS)
+
+    p = commands.add_parser("import-log", parents=[common], help="read the collection from Arena's Player.log")
+    p.add_argument("log", nargs="?", help="Player.log path (default: Arena's install location)")
+    p.add_argument("--out", metavar="FILE.csv", help="write the collection as a Name,Qty CSV")
+
+    p = commands.add_parser("ingest", parents=[common], help="build the offline card catalog from bulk data")
+    p.add_argument("bulk_file", nargs="?", help=f"Scryfall bulk JSON (default: {BULK_DATA_PATH})")
+    p.add_argument("--download", action="store_true", help="download the bulk file first")
+
+    return parser
+
+
+def cli(argv=None):
+    """
+    Parse the command line, apply settings (defaults < config file < --set < flags)
+    and run the command. Heavy modules (numpy, requests, openpyxl) are only
+    imported by the code paths that use them.
+    """
+    args = build_arg_parser().parse_args(argv)
+    opts = vars(args)
+
+    config_path = opts.pop("config", None)
+    if config_path is None and os.path.exists(DEFAULT_CONFIG_PATH):
+        config_path = DEFAULT_CONFIG_PATH
+    try:
+        settings = load_config_file(config_path) if config_path else {}
+        settings.update(opts.pop("settings", []))
+        settings.update((k, v) for k, v in opts.items() if k.isupper())
+        apply_config(settings)
+    except (OSError, ValueError) as e:
+        raise SystemExit(f"❌ {e}")
+
+    command = opts.get("command") or "run"
+    if (CASSETTE_RECORD_PATH or CASSETTE_REPLAY_PATH) and command != "ingest":
+        start_cassette()
+    if PROFILE_PATH:
+        enable_profile()
+    try:
+        run_command(command, opts)
+    except CassetteMiss as e:
+        raise SystemExit(f"❌ Replay failed, {e}")
+    finally:
+        if isinstance(_TRANSPORT, RecordingTransport):
+            n = _TRANSPORT.save()
+            print(f"\n📼 {n} Scryfall requests recorded to {_TRANSPORT.path}")
+        if PROFILE_PATH:
+            profile = write_profile(PROFILE_PATH)
+            print(f"\n📈 Run profile written to {PROFILE_PATH} "
+                  f"({profile['total_seconds']:.2f}s, {profile['http']['requests']} Scryfall requests)")
+
+
+def run_command(command, opts):
+    if command == "run":
+        main()
+    elif command == "watch":
+        watch_inputs(interval=WATCH_INTERVAL)
+    elif command == "sweep":
+        load_catalog(CATALOG_PATH, BULK_DATA_PATH)
+        rows = sweep_what_if(
+            parse_grid(opts["rare"]), parse_grid(opts["mythic"]),
+            parse_grid(opts["golden"], float) if opts.get("golden") else None,
+            parse_grid(opts["top_k"]) if opts.get("top_k") else None,
+        )
+        print_sweep(rows)
+        if opts.get("out"):
+            write_sweep_csv(rows, opts["out"])
+            print(f"💾 {len(rows)} grid points written to {opts['out']}")
+    elif command == "batch":
+        priorities = {}
+        for item in opts["priority"]:
+            deck, _, weight = item.partition("=")
+            priorities[deck] = float(weight or 1)
+        load_catalog(CATALOG_PATH, BULK_DATA_PATH)
+        run_batch(opts["decks"], load_owned(), priorities,
+                  rare_wildcards=RARE_WILDCARDS, mythic_wildcards=MYTHIC_WILDCARDS, top_n=opts["top"])
+    elif command == "fleet":
+        load_catalog(CATALOG_PATH, BULK_DATA_PATH)
+        run_fleet(opts["workbooks"], top_n=opts["top"])
+    elif command == "serve":
+        serve(SERVER_HOST, SERVER_PORT, opts.get("collection_file"))
+    elif command == "import-log":
+        load_catalog(CATALOG_PATH, BULK_DATA_PATH)
+        owned, wildcards, unknown = import_player_log(opts.get("log"))
+        print(f"📥 {sum(owned.values())} cards ({len(owned)} names) in the logged collection")
+        if wildcards:
+            print(f"🃏 Wildcards: {wildcards.get('rare', '?')} rare, {wildcards.get('mythic', '?')} mythic")
+        if unknown:
+            print(f"⚠️ {len(unknown)} Arena card ids could not be named")
+        if opts.get("out"):
+            import csv
+            with open(opts["out"], "w", newline="", encoding="utf-8") as f:
+                w = csv.writer(f)
+                w.writerow(["Name", "Qty"])
+                w.writerows(sorted(owned.items()))
+            print(f"💾 Written to {opts['out']}")
+    elif command == "ingest":
+        bulk_file = opts.get("bulk_file") or BULK_DATA_PATH
+        if opts.get("download"):
+            try:
+                downloaded = download_bulk_data(bulk_file)
+            except Exception as e:
+                downloaded = None
+                print(f"❌ {e}")
+            if not downloaded:
+                raise SystemExit("❌ Could not download the Scryfall bulk data; the existing catalog was kept")
+        if not os.path.exists(bulk_file):
+            raise SystemExit(f"❌ Bulk file not found: {bulk_file}")
+        # Built next to the old catalog, which is only replaced once the new one has loaded
+        tmp = CATALOG_PATH + ".new"
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        try:
+            load_catalog(tmp, bulk_file)
+        except Exception as e:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise SystemExit(f"❌ Could not build the catalog from {bulk_file}: {e}; the existing catalog was kept")
+        os.replace(tmp, CATALOG_PATH)
 
 
 if __name__ == "__main__":
-    main()
+    cli()